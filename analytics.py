@@ -0,0 +1,216 @@
+"""
+Sprint Analytics
+
+Slices the tickets exported by `extract.py --export` by any combination of
+sprint, status, assignee, issue type and epic, totalling their story points.
+
+Exports are columnar: one typed column per field. With pyarrow installed
+(`pip install pyarrow`) they are written as Parquet or Arrow files and
+filtered and grouped with Arrow's compute kernels. Without it they fall back to
+a plain CSV file, and the group-by is a per-row Python loop: each row's key
+values form a tuple, and the tickets and story points are totalled per tuple.
+That is slower than Arrow, but still only reads the few columns asked for and
+never walks any JSON again.
+
+Usage:
+    python analytics.py FILE [--by COLUMN [COLUMN ...]] [--where COLUMN=VALUE ...]
+
+Example:
+    python extract.py --board 69 --from 2026-01-01 --export tickets.parquet
+    python analytics.py tickets.parquet --by assignee status
+    python analytics.py tickets.parquet --by epic --where status=Done
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+from itertools import compress
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.csv
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Exported columns and their types
+SCHEMA = {
+    "sprint_id": str,
+    "key": str,
+    "issue_type": str,
+    "status": str,
+    "assignee": str,
+    "epic": str,
+    "story_points": float,
+}
+VALUE_COLUMN = "story_points"
+ARROW_FORMATS = (".parquet", ".arrow", ".feather")
+
+def _arrow_schema():
+    return pyarrow.schema([
+        (name, pyarrow.float64() if kind is float else pyarrow.string())
+        for name, kind in SCHEMA.items()
+    ])
+
+def to_table(rows):
+    """Turn ticket dicts into a columnar table (a pyarrow Table, or a dict of columns)."""
+    columns = {}
+    for name, kind in SCHEMA.items():
+        if kind is float:
+            columns[name] = array("d", (float(row.get(name) or 0) for row in rows))
+        else:
+            columns[name] = [str(row.get(name) or "") for row in rows]
+    if pyarrow is not None:
+        return pyarrow.table(columns, schema=_arrow_schema())
+    return columns
+
+def num_rows(table):
+    if isinstance(table, dict):
+        return len(table[VALUE_COLUMN])
+    return table.num_rows
+
+def write_table(table, path):
+    """Write a table to path and return the path actually written.
+
+    .parquet, .arrow and .feather need pyarrow; without it the table is written
+    as CSV next to the requested path instead.
+    """
+    base, ext = os.path.splitext(path)
+    if ext.lower() in ARROW_FORMATS and pyarrow is None:
+        path = base + ".csv"
+        print(f"pyarrow is not installed, writing CSV to {path} instead", file=sys.stderr)
+    elif ext.lower() == ".parquet":
+        pyarrow.parquet.write_table(table, path)
+        return path
+    elif ext.lower() in ARROW_FORMATS:
+        pyarrow.feather.write_feather(table, path)
+        return path
+
+    if pyarrow is not None:
+        pyarrow.csv.write_csv(table, path)
+        return path
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SCHEMA)
+        columns = [
+            [f"{value:g}" for value in table[name]] if kind is float else table[name]
+            for name, kind in SCHEMA.items()
+        ]
+        writer.writerows(zip(*columns))
+    return path
+
+def read_table(path, columns=None):
+    """Read a table written by write_table, optionally only some of its columns."""
+    columns = list(columns or SCHEMA)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ARROW_FORMATS:
+        if pyarrow is None:
+            raise RuntimeError(f"Reading {ext} files needs pyarrow (pip install pyarrow)")
+        if ext == ".parquet":
+            return pyarrow.parquet.read_table(path, columns=columns)
+        return pyarrow.feather.read_table(path, columns=columns)
+
+    if pyarrow is not None:
+        options = pyarrow.csv.ConvertOptions(column_types=_arrow_schema(), include_columns=columns)
+        return pyarrow.csv.read_csv(path, convert_options=options)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    table = {}
+    for name in columns:
+        position = header.index(name)
+        values = [row[position] for row in rows]
+        table[name] = array("d", map(float, values)) if SCHEMA[name] is float else values
+    return table
+
+def filter_rows(table, conditions):
+    """Keep the rows where every (column, value) condition holds."""
+    for name, value in conditions:
+        if name not in SCHEMA:
+            raise ValueError(f"Unknown column '{name}'")
+        if SCHEMA[name] is float:
+            value = float(value)
+        if isinstance(table, dict):
+            mask = [cell == value for cell in table[name]]
+            table = {
+                column: array("d", compress(values, mask)) if SCHEMA[column] is float else list(compress(values, mask))
+                for column, values in table.items()
+            }
+        else:
+            table = table.filter(pyarrow.compute.equal(table[name], value))
+    return table
+
+def group_by(table, keys):
+    """Count tickets and sum story points per distinct combination of the key columns.
+
+    Returns (key values tuple, tickets, story points) rows, most story points first.
+    """
+    for name in keys:
+        if name not in SCHEMA:
+            raise ValueError(f"Unknown column '{name}'")
+
+    if not isinstance(table, dict):
+        grouped = table.group_by(keys).aggregate([(VALUE_COLUMN, "count"), (VALUE_COLUMN, "sum")])
+        columns = grouped.to_pydict()
+        results = [
+            (tuple(columns[name][i] for name in keys), count, points)
+            for i, (count, points) in enumerate(zip(columns[f"{VALUE_COLUMN}_count"], columns[f"{VALUE_COLUMN}_sum"]))
+        ]
+        return sorted(results, key=lambda result: -result[2])
+
+    # One tuple of key values per row; tuples never overflow however many groups there are
+    counts = Counter()
+    sums = defaultdict(float)
+    for key, points in zip(zip(*(table[name] for name in keys)), table[VALUE_COLUMN]):
+        counts[key] += 1
+        sums[key] += points
+
+    results = [(key, count, sums[key]) for key, count in counts.items()]
+    return sorted(results, key=lambda result: -result[2])
+
+def print_groups(keys, results):
+    widths = [max([len(name)] + [len(str(key[i])) for key, _, _ in results]) for i, name in enumerate(keys)]
+    print("  ".join(f"{name:<{width}}" for name, width in zip(keys, widths)) + f"{'tickets':>10}{'story points':>14}")
+    for key, count, points in results:
+        print("  ".join(f"{value or '-':<{width}}" for value, width in zip(key, widths)) + f"{count:>10}{points:>14g}")
+
+def parse_condition(value):
+    """argparse type for COLUMN=VALUE filters."""
+    name, sep, wanted = value.partition("=")
+    if not sep or name not in SCHEMA:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=VALUE with COLUMN one of {', '.join(SCHEMA)}")
+    return name, wanted
+
+def main():
+    parser = argparse.ArgumentParser(description='Group exported sprint tickets and total their story points.')
+    parser.add_argument('file', help='File written by extract.py --export (.parquet, .arrow or .csv)')
+    parser.add_argument('--by', nargs='+', default=['status'], choices=list(SCHEMA)[:-1], metavar='COLUMN',
+                        help=f'Columns to group by (default status): {", ".join(list(SCHEMA)[:-1])}')
+    parser.add_argument('--where', nargs='+', type=parse_condition, default=[], metavar='COLUMN=VALUE',
+                        help='Only count tickets where every given column has the given value')
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        table = read_table(args.file, set(args.by) | {name for name, _ in args.where} | {VALUE_COLUMN})
+        loaded = time.perf_counter()
+        table = filter_rows(table, args.where)
+        results = group_by(table, args.by)
+        finished = time.perf_counter()
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print_groups(args.by, results)
+    print(f"\n{num_rows(table)} tickets in {len(results)} groups "
+          f"(read in {loaded - started:.3f}s, grouped in {finished - loaded:.3f}s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
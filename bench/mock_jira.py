@@ -0,0 +1,680 @@
+"""
+Mock Jira Server
+
+A local stand-in for the parts of the Jira Cloud REST API the scripts use, with
+a synthetic dataset and configurable latency and throttling. It exists so the
+scripts can be benchmarked offline (see run_bench.py).
+
+Served endpoints:
+    GET  /rest/agile/1.0/sprint/{id}, /sprint/{id}/issue
+    GET  /rest/agile/1.0/board/{id}, /board/{id}/configuration, /board/{id}/sprint
+    GET  /rest/api/2/issue/{key}            PUT /rest/api/2/issue/{key}
+    GET  /rest/api/2/issue/{key}/changelog  POST /rest/api/2/issue/{key}/transitions
+    POST /rest/api/2/issue, /rest/api/2/issue/bulk, /rest/api/2/issueLink
+    GET  /rest/api/2/issueLinkType
+    POST /rest/api/2/search                 (the JQL subset the scripts send)
+
+Sprints are two weeks long and the last one is halfway through. Each issue's
+changelog is made up on first request to match its current status and story
+points, with its status changes falling inside its sprint; later PUTs and
+transitions are appended to it.
+
+Control endpoints:
+    GET  /__stats   request count and bytes in/out, per endpoint template
+    POST /__reset   regenerate the dataset and clear the stats
+
+Usage:
+    python bench/mock_jira.py [--port 8080] [--issues 2000] [--latency 0.05] [--rate-limit 50]
+
+Then point the scripts at it:
+    JIRA_BASE_URL=http://127.0.0.1:8080 python extract.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+SOURCE_PROJECT = "SRC"
+TARGET_PROJECT = "DEV"
+BOARD_ID = 69
+FIRST_SPRINT_ID = 750
+CURRENT_USER = "bench-user"
+
+STATUSES = {
+    "10001": "To Do",
+    "3": "In Progress",
+    "10002": "Done",
+}
+
+# Link type name -> (inward, outward) description; JQL's issueLinkType matches the descriptions
+LINK_TYPES = {
+    "Relates": ("relates to", "relates to"),
+    "Mirrors": ("is mirrored by", "mirrors"),
+    "Blocks": ("is blocked by", "blocks"),
+}
+
+# Jira Cloud caps search pages at 100 issues
+MAX_PAGE_SIZE = 100
+
+WORDS = (
+    "sprint board ticket mirror due date release deploy review backend frontend "
+    "api cache queue worker report export import sync link epic story bug fix"
+).split()
+
+def jira_timestamp(ts):
+    """Format a Unix timestamp the way Jira does."""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+class Dataset:
+    """Synthetic issues, links and sprints, regenerated deterministically from a seed."""
+
+    def __init__(self, issues=2000, subtasks=3, links=2, epics=20, sprints=1,
+                 description_words=200, seed=1):
+        self.options = dict(issues=issues, subtasks=subtasks, links=links, epics=epics,
+                            sprints=sprints, description_words=description_words, seed=seed)
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            options = self.options
+            self.random = random.Random(options["seed"])
+            self.issues = {}
+            self.sprint_of = {}
+            self.created_at = {}
+            self.updated_at = {}
+            self.histories = {}
+            self.next_number = {SOURCE_PROJECT: 1, TARGET_PROJECT: 1}
+            self.now = time.time()
+
+            epic_keys = [
+                self._add_issue(SOURCE_PROJECT, "Epic", points=None)
+                for _ in range(options["epics"])
+            ]
+            story_keys = []
+            for i in range(options["issues"]):
+                sprint_id = FIRST_SPRINT_ID + i % max(1, options["sprints"])
+                parent = self.random.choice(epic_keys) if epic_keys and self.random.random() < 0.7 else None
+                key = self._add_issue(SOURCE_PROJECT, "Story", parent=parent, sprint_id=sprint_id)
+                story_keys.append(key)
+                for _ in range(self.random.randint(0, options["subtasks"])):
+                    subtask_key = self._add_issue(SOURCE_PROJECT, "Sub-task", parent=key, sprint_id=sprint_id)
+                    self.issues[key]["fields"]["subtasks"].append(self._issue_ref(subtask_key))
+
+            # Dense "Relates" graph between stories
+            for key in story_keys:
+                for _ in range(self.random.randint(0, 2 * options["links"])):
+                    other = self.random.choice(story_keys)
+                    if other != key:
+                        self.add_link(key, other, touch=False)
+
+    def _issue_ref(self, key):
+        issue = self.issues[key]
+        return {
+            "id": issue["id"],
+            "key": key,
+            "self": issue["self"],
+            "fields": {
+                "summary": issue["fields"]["summary"],
+                "status": issue["fields"]["status"],
+                "issuetype": issue["fields"]["issuetype"],
+            },
+        }
+
+    def _sentence(self, words):
+        return " ".join(self.random.choice(WORDS) for _ in range(words))
+
+    def _status(self, status_id):
+        return {
+            "self": f"https://mock.atlassian.net/rest/api/2/status/{status_id}",
+            "id": status_id,
+            "name": STATUSES[status_id],
+            "statusCategory": {"id": 2, "key": "new", "name": STATUSES[status_id]},
+        }
+
+    def _user(self, account_id):
+        return {
+            "self": f"https://mock.atlassian.net/rest/api/2/user?accountId={account_id}",
+            "accountId": account_id,
+            "displayName": account_id.replace("-", " ").title(),
+            "avatarUrls": {size: f"https://avatar.example/{account_id}/{size}.png"
+                           for size in ("48x48", "24x24", "16x16", "32x32")},
+            "active": True,
+            "timeZone": "UTC",
+        }
+
+    def _add_issue(self, project, issue_type, parent=None, sprint_id=None, points=0, fields=None):
+        number = self.next_number[project]
+        self.next_number[project] += 1
+        key = f"{project}-{number}"
+        issue_id = str(10000 + len(self.issues))
+        updated = self.now - self.random.uniform(3600, 30 * 86400)
+        created = updated - self.random.uniform(0, 30 * 86400)
+        if points == 0:
+            points = self.random.choice([None, 1, 2, 3, 5, 8])
+        has_due_date = self.random.random() < 0.5
+        issue = {
+            "id": issue_id,
+            "key": key,
+            "self": f"https://mock.atlassian.net/rest/api/2/issue/{issue_id}",
+            "fields": {
+                "summary": self._sentence(8),
+                "description": self._sentence(self.random.randint(1, 2 * self.options["description_words"])),
+                "status": self._status(self.random.choice(list(STATUSES))),
+                "issuetype": {"name": issue_type, "subtask": issue_type == "Sub-task"},
+                "priority": {"name": self.random.choice(["Low", "Medium", "High"])},
+                "project": {"key": project},
+                "assignee": self._user(self.random.choice([CURRENT_USER, "other-user"])),
+                "reporter": self._user("other-user"),
+                "created": jira_timestamp(created),
+                "updated": jira_timestamp(updated),
+                "duedate": (datetime.now() + timedelta(days=self.random.randint(1, 60))).date().isoformat()
+                           if has_due_date else None,
+                "customfield_10016": points,
+                "subtasks": [],
+                "issuelinks": [],
+                "labels": [],
+                "attachment": [],
+                "comment": {"comments": [
+                    {"author": self._user("other-user"), "body": self._sentence(40)}
+                    for _ in range(self.random.randint(0, 3))
+                ]},
+            },
+        }
+        if parent:
+            issue["fields"]["parent"] = self._issue_ref(parent)
+        if fields:
+            issue["fields"].update(fields)
+        self.issues[key] = issue
+        self.created_at[key] = created
+        self.updated_at[key] = updated
+        if sprint_id:
+            self.sprint_of[key] = sprint_id
+        return key
+
+    def sprint(self, sprint_id):
+        """Return the sprint as the agile API does; the last sprint is the active one."""
+        count = max(1, self.options["sprints"])
+        index = sprint_id - FIRST_SPRINT_ID
+        if not 0 <= index < count:
+            raise KeyError(f"sprint {sprint_id}")
+        begin = self.now - 7 * 86400 - 14 * 86400 * (count - 1 - index)
+        return {
+            "id": sprint_id,
+            "name": f"Sprint {index + 1}",
+            "state": "closed" if index < count - 1 else "active",
+            "startDate": jira_timestamp(begin),
+            "endDate": jira_timestamp(begin + 14 * 86400),
+        }
+
+    def changelog(self, key):
+        """Return the issue's history, oldest first, making it up on first use."""
+        with self.lock:
+            if key not in self.histories:
+                self.histories[key] = self._make_history(key)
+            return self.histories[key]
+
+    def _make_history(self, key):
+        """Status changes leading to the current status, plus estimate changes and noise.
+
+        Uses its own random generator so the rest of the dataset doesn't depend
+        on which changelogs were requested.
+        """
+        rng = random.Random(f"{self.options['seed']}:{key}")
+        fields = self.issues[key]["fields"]
+        start, end = self.created_at[key], self.updated_at[key]
+        if key in self.sprint_of:
+            sprint = self.sprint(self.sprint_of[key])
+            sprint_start, sprint_end = self._timestamp(sprint["startDate"]), self._timestamp(sprint["endDate"])
+            end = min(max(end, sprint_start + 86400), sprint_end, self.now)
+            start = min(max(start, sprint_start), end)
+
+        changes = []
+        order = list(STATUSES)
+        path = order[:order.index(fields["status"]["id"]) + 1]
+        for old, new in zip(path, path[1:]):
+            changes.append([self._status_item(old, new)])
+        points = fields.get("customfield_10016")
+        if points is not None and rng.random() < 0.3:
+            changes.insert(0, [self._change_item("Story Points", "customfield_10016", rng.choice([1, 2, 3, 5, 8]), points)])
+        for _ in range(rng.randint(0, 4)):
+            changes.insert(rng.randint(0, len(changes)), [
+                {"field": "Rank", "fieldtype": "custom", "fieldId": "customfield_10019",
+                 "from": "", "fromString": "", "to": "", "toString": "Ranked higher"}])
+        times = sorted(rng.uniform(start, end) for _ in changes)
+        history = []
+        for created, items in zip(times, changes):
+            history.append(self._history_entry(key, history, created, items))
+        return history
+
+    def _history_entry(self, key, history, created, items):
+        return {
+            "id": str(int(self.issues[key]["id"]) * 1000 + len(history)),
+            "author": self._user("other-user"),
+            "created": jira_timestamp(created),
+            "items": items,
+        }
+
+    def _status_item(self, old, new):
+        return {"field": "status", "fieldtype": "jira", "fieldId": "status",
+                "from": old, "fromString": STATUSES[old], "to": new, "toString": STATUSES[new]}
+
+    def _change_item(self, field, field_id, old, new):
+        return {"field": field, "fieldtype": "custom" if field_id.startswith("customfield_") else "jira",
+                "fieldId": field_id, "from": None, "fromString": None if old is None else str(old),
+                "to": None, "toString": None if new is None else str(new)}
+
+    @staticmethod
+    def _timestamp(value):
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+
+    def update_fields(self, key, fields):
+        """Apply a PUT, recording the changed fields in the issue's history."""
+        with self.lock:
+            history = self.changelog(key)
+            current = self.issues[key]["fields"]
+            items = [self._change_item(name, name, current.get(name), value)
+                     for name, value in fields.items() if current.get(name) != value]
+            current.update(fields)
+            self.touch(key)
+            if items:
+                history.append(self._history_entry(key, history, time.time(), items))
+
+    def transition(self, key, status_id):
+        """Move the issue to another status, recording it in the issue's history."""
+        if status_id not in STATUSES:
+            raise ValueError(f"Unknown transition {status_id}")
+        with self.lock:
+            history = self.changelog(key)
+            fields = self.issues[key]["fields"]
+            if fields["status"]["id"] != status_id:
+                history.append(self._history_entry(key, history, time.time(),
+                                                   [self._status_item(fields["status"]["id"], status_id)]))
+                fields["status"] = self._status(status_id)
+            self.touch(key)
+
+    def touch(self, key):
+        now = time.time()
+        self.updated_at[key] = now
+        self.issues[key]["fields"]["updated"] = jira_timestamp(now)
+
+    def add_link(self, inward_key, outward_key, link_type="Relates", touch=True):
+        with self.lock:
+            link_id = str(self.random.randint(10000, 99999))
+            inward, outward = LINK_TYPES.get(link_type, (link_type.lower(), link_type.lower()))
+            type_data = {"name": link_type, "inward": inward, "outward": outward}
+            self.issues[inward_key]["fields"]["issuelinks"].append(
+                {"id": link_id, "type": type_data, "outwardIssue": self._issue_ref(outward_key)})
+            self.issues[outward_key]["fields"]["issuelinks"].append(
+                {"id": link_id, "type": type_data, "inwardIssue": self._issue_ref(inward_key)})
+            if touch:
+                self.touch(inward_key)
+                self.touch(outward_key)
+
+    def create_issue(self, fields):
+        with self.lock:
+            project = fields["project"]["key"]
+            self.next_number.setdefault(project, 1)
+            extra = {k: v for k, v in fields.items() if k not in ("project", "issuetype")}
+            key = self._add_issue(project, fields.get("issuetype", {}).get("name", "Task"), points=None, fields=extra)
+            self.touch(key)
+            return self.issues[key]
+
+    def project(self, issue, fields):
+        """Return the issue with only the requested fields, as Jira does."""
+        if not fields or "*all" in fields or "*navigable" in fields:
+            return issue
+        projected = {name: issue["fields"][name] for name in fields if name in issue["fields"]}
+        return {"id": issue["id"], "key": issue["key"], "self": issue["self"], "fields": projected}
+
+    def search(self, jql):
+        """Evaluate the AND-joined JQL subset used by the scripts."""
+        jql = re.split(r"\s+ORDER\s+BY\s+", jql, flags=re.IGNORECASE)[0].strip()
+        clauses = [clause.strip() for clause in re.split(r"\s+AND\s+", jql, flags=re.IGNORECASE) if clause.strip()]
+        with self.lock:
+            keys = list(self.issues)
+            for clause in clauses:
+                keys = [key for key in keys if self._matches(key, clause)]
+            return [self.issues[key] for key in keys]
+
+    def _matches(self, key, clause):
+        fields = self.issues[key]["fields"]
+        match = re.fullmatch(r"(key|id|parent|status|project|issueLinkType)\s+in\s+\((.*)\)", clause, re.IGNORECASE)
+        if match:
+            values = {value.strip().strip('"') for value in match.group(2).split(",")}
+            name = match.group(1).lower()
+            if name == "key":
+                return key in values
+            if name == "id":
+                return self.issues[key]["id"] in values
+            if name == "parent":
+                return fields.get("parent", {}).get("key") in values
+            if name == "project":
+                return fields["project"]["key"] in values
+            if name == "issuelinktype":
+                return any(link["type"]["inward"] in values or link["type"]["outward"] in values
+                           for link in fields.get("issuelinks", []))
+            return fields["status"]["id"] in values or fields["status"]["name"] in values
+        match = re.fullmatch(r"(key|project|sprint|parent)\s*=\s*\"?([\w-]+)\"?", clause, re.IGNORECASE)
+        if match:
+            name, value = match.group(1).lower(), match.group(2)
+            if name == "key":
+                return key == value
+            if name == "project":
+                return fields["project"]["key"] == value
+            if name == "parent":
+                return fields.get("parent", {}).get("key") == value
+            return str(self.sprint_of.get(key)) == value
+        match = re.fullmatch(r"updated\s*>=\s*-(\d+)m", clause, re.IGNORECASE)
+        if match:
+            return self.updated_at[key] >= time.time() - int(match.group(1)) * 60
+        if re.fullmatch(r"assignee\s*=\s*currentUser\(\)", clause, re.IGNORECASE):
+            return (fields.get("assignee") or {}).get("accountId") == CURRENT_USER
+        raise ValueError(f"Unsupported JQL clause: {clause}")
+
+class Stats:
+    """Request counters per endpoint template."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+    def record(self, template, status, bytes_in, bytes_out):
+        with self.lock:
+            entry = self.endpoints.setdefault(
+                template, {"requests": 0, "bytes_in": 0, "bytes_out": 0, "statuses": {}})
+            entry["requests"] += 1
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = json.loads(json.dumps(self.endpoints))
+        return {
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "bytes_in": sum(e["bytes_in"] for e in endpoints.values()),
+            "bytes_out": sum(e["bytes_out"] for e in endpoints.values()),
+            "throttled": sum(e["statuses"].get("429", 0) for e in endpoints.values()),
+            "endpoints": endpoints,
+        }
+
+class Throttle:
+    """Token bucket deciding which requests get a 429."""
+
+    def __init__(self, rate, ratio_429, seed=1):
+        self.rate = rate
+        self.ratio_429 = ratio_429
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.ratio_429 and self.random.random() < self.ratio_429:
+                return False
+            if not self.rate:
+                return True
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+def endpoint_template(method, path):
+    # Keep the API version; only the numbers after it are IDs
+    prefix = re.match(r"/rest/(?:api/\d+|agile/\d+\.\d+)", path)
+    prefix = prefix.group() if prefix else ""
+    path = path[len(prefix):]
+    path = re.sub(r"/[A-Z][A-Z0-9]*-\d+(?=/|$)", "/{key}", path)
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    return f"{method} {prefix}{path}"
+
+class MockJiraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real thing
+    # Headers and body go out in separate writes; with Nagle on, the body waits
+    # for the client's delayed ACK and every response picks up ~40 ms
+    disable_nagle_algorithm = True
+    server_version = "MockJira/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method):
+        server = self.server
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        if url.path.startswith("/__"):
+            status, payload = self._control(method, url.path)
+            self._send(status, payload)
+            return
+
+        if server.latency:
+            time.sleep(server.latency * server.jitter.uniform(0.5, 1.5))
+
+        template = endpoint_template(method, url.path)
+        if not server.throttle.allow():
+            sent = self._send(429, {"errorMessages": ["Rate limit exceeded"]}, {"Retry-After": "1"})
+            server.stats.record(template, 429, length, sent)
+            return
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            status, payload = self._route(method, url.path, parse_qs(url.query), body)
+        except ValueError as e:
+            status, payload = 400, {"errorMessages": [str(e)]}
+        except KeyError as e:
+            status, payload = 404, {"errorMessages": [f"Not found: {e}"]}
+        except Exception as e:
+            status, payload = 500, {"errorMessages": [repr(e)]}
+        sent = self._send(status, payload)
+        server.stats.record(template, status, length, sent)
+
+    def _send(self, status, payload, headers=None):
+        data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def _control(self, method, path):
+        if path == "/__stats" and method == "GET":
+            return 200, self.server.stats.snapshot()
+        if path == "/__reset" and method == "POST":
+            self.server.dataset.reset()
+            self.server.stats.reset()
+            return 200, {"issues": len(self.server.dataset.issues)}
+        return 404, {"errorMessages": ["Unknown control endpoint"]}
+
+    def _route(self, method, path, query, body):
+        data = self.server.dataset
+        fields = query.get("fields", [""])[0].split(",") if "fields" in query else None
+
+        match = re.fullmatch(r"/rest/agile/1\.0/sprint/(\d+)", path)
+        if match and method == "GET":
+            return 200, data.sprint(int(match.group(1)))
+
+        match = re.fullmatch(r"/rest/agile/1\.0/sprint/(\d+)/issue", path)
+        if match and method == "GET":
+            sprint_id = int(match.group(1))
+            with data.lock:
+                issues = [issue for key, issue in data.issues.items() if data.sprint_of.get(key) == sprint_id]
+            return 200, self._page(issues, query, fields, cap=50)
+
+        match = re.fullmatch(r"/rest/agile/1\.0/board/(\d+)(/configuration|/sprint)?", path)
+        if match and method == "GET":
+            if int(match.group(1)) != BOARD_ID:
+                raise KeyError(f"board {match.group(1)}")
+            return 200, self._board(match.group(2), query)
+
+        match = re.fullmatch(r"/rest/api/2/issue/([A-Z][A-Z0-9]*-\d+)", path)
+        if match:
+            key = match.group(1)
+            if method == "GET":
+                return 200, data.project(data.issues[key], fields)
+            if method == "PUT":
+                data.update_fields(key, body.get("fields", {}))
+                return 204, None
+
+        match = re.fullmatch(r"/rest/api/2/issue/([A-Z][A-Z0-9]*-\d+)/changelog", path)
+        if match and method == "GET":
+            with data.lock:
+                history = list(data.changelog(match.group(1)))
+            start_at = int(query.get("startAt", ["0"])[0])
+            max_results = min(int(query.get("maxResults", ["100"])[0]), MAX_PAGE_SIZE)
+            values = history[start_at:start_at + max_results]
+            return 200, {"startAt": start_at, "maxResults": max_results, "total": len(history),
+                         "isLast": start_at + len(values) >= len(history), "values": values}
+
+        match = re.fullmatch(r"/rest/api/2/issue/([A-Z][A-Z0-9]*-\d+)/transitions", path)
+        if match and method == "POST":
+            data.transition(match.group(1), str(body["transition"]["id"]))
+            return 204, None
+
+        if path == "/rest/api/2/issue" and method == "POST":
+            issue = data.create_issue(body["fields"])
+            return 201, {"id": issue["id"], "key": issue["key"], "self": issue["self"]}
+
+        if path == "/rest/api/2/issue/bulk" and method == "POST":
+            created = [data.create_issue(update["fields"]) for update in body.get("issueUpdates", [])]
+            return 201, {
+                "issues": [{"id": i["id"], "key": i["key"], "self": i["self"]} for i in created],
+                "errors": [],
+            }
+
+        if path == "/rest/api/2/issueLinkType" and method == "GET":
+            return 200, {"issueLinkTypes": [
+                {"id": str(10000 + i), "name": name, "inward": inward, "outward": outward}
+                for i, (name, (inward, outward)) in enumerate(LINK_TYPES.items())
+            ]}
+
+        if path == "/rest/api/2/issueLink" and method == "POST":
+            data.add_link(body["inwardIssue"]["key"], body["outwardIssue"]["key"], body["type"]["name"])
+            return 201, None
+
+        if path == "/rest/api/2/search" and method in ("GET", "POST"):
+            if method == "GET":
+                body = {
+                    "jql": query.get("jql", [""])[0],
+                    "startAt": query.get("startAt", ["0"])[0],
+                    "maxResults": query.get("maxResults", ["50"])[0],
+                    "fields": fields,
+                }
+            issues = data.search(body.get("jql", ""))
+            search_query = {"startAt": [str(body.get("startAt", 0))], "maxResults": [str(body.get("maxResults", 50))]}
+            return 200, self._page(issues, search_query, body.get("fields"), cap=MAX_PAGE_SIZE)
+
+        raise KeyError(f"{method} {path}")
+
+    def _page(self, issues, query, fields, cap):
+        start_at = int(query.get("startAt", ["0"])[0])
+        max_results = min(int(query.get("maxResults", [str(cap)])[0]), cap)
+        data = self.server.dataset
+        with data.lock:
+            page = [data.project(issue, fields) for issue in issues[start_at:start_at + max_results]]
+        return {"startAt": start_at, "maxResults": max_results, "total": len(issues), "issues": page}
+
+    def _board(self, suffix, query):
+        if suffix == "/configuration":
+            return {
+                "id": BOARD_ID,
+                "location": {"projectKey": SOURCE_PROJECT},
+                "columnConfig": {"columns": [
+                    {"name": name, "statuses": [{"id": status_id}]}
+                    for status_id, name in STATUSES.items()
+                ]},
+            }
+        if suffix == "/sprint":
+            data = self.server.dataset
+            sprints = [data.sprint(FIRST_SPRINT_ID + i) for i in range(max(1, data.options["sprints"]))]
+            start_at = int(query.get("startAt", ["0"])[0])
+            max_results = int(query.get("maxResults", ["50"])[0])
+            page = sprints[start_at:start_at + max_results]
+            return {"startAt": start_at, "maxResults": max_results,
+                    "isLast": start_at + len(page) >= len(sprints), "values": page}
+        return {"id": BOARD_ID, "name": "Mock board", "location": {"projectKey": SOURCE_PROJECT}}
+
+class MockJiraServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset, latency=0.0, rate_limit=0.0, ratio_429=0.0):
+        super().__init__(address, MockJiraHandler)
+        self.dataset = dataset
+        self.stats = Stats()
+        self.latency = latency
+        self.jitter = random.Random(dataset.options["seed"])
+        self.throttle = Throttle(rate_limit, ratio_429, dataset.options["seed"])
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_in_thread(dataset, host="127.0.0.1", port=0, **options):
+    """Start a server in a background thread and return it."""
+    server = MockJiraServer((host, port), dataset, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_arguments(parser):
+    """Dataset and fault-injection options shared with run_bench.py."""
+    parser.add_argument('--issues', type=int, default=2000, help='Stories in the dataset (default 2000)')
+    parser.add_argument('--subtasks', type=int, default=3, help='Maximum subtasks per story (default 3)')
+    parser.add_argument('--links', type=int, default=2, help='Average Relates links per story (default 2)')
+    parser.add_argument('--epics', type=int, default=20, help='Epics the stories belong to (default 20)')
+    parser.add_argument('--sprints', type=int, default=1, help='Sprints the stories are spread over (default 1)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the dataset (default 1)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Average seconds added to each request')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Requests per second before answering 429')
+    parser.add_argument('--ratio-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+
+def dataset_from_args(args):
+    return Dataset(issues=args.issues, subtasks=args.subtasks, links=args.links,
+                   epics=args.epics, sprints=args.sprints, seed=args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local mock Jira server with a synthetic dataset.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    dataset = dataset_from_args(args)
+    server = MockJiraServer((args.host, args.port), dataset, latency=args.latency,
+                            rate_limit=args.rate_limit, ratio_429=args.ratio_429)
+    print(f"Mock Jira with {len(dataset.issues)} issues listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Event Replayer
+
+Exercises webhook.py without a live Jira by sending it webhook events, either
+replayed from a file (as written by `webhook.py --record`) to a running
+receiver, or generated against the mock Jira server (mock_jira.py).
+
+In generate mode the replayer starts the mock and a receiver pointed at it,
+then makes changes to a small set of "hot" stories in the mock dataset (new or
+cleared due dates, new links) and sends the events Jira would send for each.
+Changes come in bursts, so most issues get several events. Once the receiver has
+processed everything, the replayer reports what it did and how many requests
+it made. It then compares that with a cron-style `sync_due_dates.py --bulk`
+over every story, which also checks the receiver's work: the dataset starts
+out in sync, so the cron run should find no due date left to update.
+
+Usage:
+    python bench/replay_events.py FILE --receiver URL [--secret SECRET] [--delay SECONDS]
+    python bench/replay_events.py --generate N [--hot N] [--mirror] [--issues 2000] [--latency 0.05]
+
+Example:
+    python bench/replay_events.py --generate 500 --hot 40
+    python webhook.py --record events.ndjson   # later: python bench/replay_events.py events.ndjson --receiver http://127.0.0.1:8765
+"""
+
+import argparse
+import copy
+import hashlib
+import hmac
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+import mock_jira
+from run_bench import REPO_DIR, control
+
+def send_event(receiver_url, event, secret=None):
+    body = json.dumps(event).encode()
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Hub-Signature"] = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(receiver_url, data=body, headers=headers, method="POST")
+    with urllib.request.urlopen(request) as response:
+        response.read()
+
+def receiver_status(receiver_url):
+    with urllib.request.urlopen(f"{receiver_url}/status") as response:
+        return json.loads(response.read())
+
+def wait_until_idle(receiver_url, events, timeout=300):
+    """Wait until the receiver has taken every event sent and processed every issue."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = receiver_status(receiver_url)
+        if status["events"] >= events and not status["pending"] and not status["busy"]:
+            return status
+        time.sleep(0.1)
+    raise RuntimeError("Receiver did not finish in time")
+
+def issue_updated(issue, field, old, new):
+    return {
+        "timestamp": int(time.time() * 1000),
+        "webhookEvent": "jira:issue_updated",
+        "issue": copy.deepcopy(issue),
+        "changelog": {"items": [{"field": field, "from": old, "fromString": old, "to": new, "toString": new}]},
+    }
+
+def generate_events(dataset, count, hot, rng):
+    """Change hot stories in the dataset and yield the events Jira would send for each change."""
+    with dataset.lock:
+        stories = [key for key, issue in dataset.issues.items() if issue["fields"]["issuetype"]["name"] == "Story"]
+    hot_keys = rng.sample(stories, min(hot, len(stories)))
+    sent = 0
+    while sent < count:
+        key = rng.choice(hot_keys)
+        # An issue usually gets a few edits in a row
+        for _ in range(min(rng.randint(1, 4), count - sent)):
+            with dataset.lock:
+                issue = dataset.issues[key]
+                if rng.random() < 0.8:
+                    old = issue["fields"].get("duedate")
+                    new = None if rng.random() < 0.25 else (date.today() + timedelta(days=rng.randint(1, 90))).isoformat()
+                    issue["fields"]["duedate"] = new
+                    dataset.touch(key)
+                    events = [issue_updated(issue, "duedate", old, new)]
+                else:
+                    other = rng.choice(stories)
+                    if other == key:
+                        continue
+                    dataset.add_link(key, other)
+                    other_issue = dataset.issues[other]
+                    # Jira reports a new link once per issue and once as a link event
+                    events = [
+                        issue_updated(issue, "Link", None, other),
+                        issue_updated(other_issue, "Link", None, key),
+                        {
+                            "timestamp": int(time.time() * 1000),
+                            "webhookEvent": "issuelink_created",
+                            "issueLink": {
+                                "sourceIssueId": int(issue["id"]),
+                                "destinationIssueId": int(other_issue["id"]),
+                                "issueLinkType": {"name": "Relates"},
+                            },
+                        },
+                    ]
+            for event in events:
+                yield event
+            sent += 1
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def jira_environment(server, workdir):
+    env = dict(os.environ)
+    env.update({
+        "JIRA_BASE_URL": server.base_url,
+        "JIRA_DOMAIN": "mock.atlassian.net",
+        "JIRA_EMAIL": "bench@example.com",
+        "JIRA_API_TOKEN": "bench",
+        "JIRA_CACHE_PATH": os.path.join(workdir, "issues.sqlite"),
+        "JIRA_DAEMON": "0",
+    })
+    return env
+
+def run_cron(env, keys):
+    """Run sync_due_dates.py --bulk over the keys, with an empty issue cache."""
+    if os.path.exists(env["JIRA_CACHE_PATH"]):
+        os.remove(env["JIRA_CACHE_PATH"])
+    subprocess.run([sys.executable, "sync_due_dates.py", "--bulk"] + keys, cwd=REPO_DIR, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+def print_requests(label, stats):
+    endpoints = ", ".join(f"{name} {data['requests']}" for name, data in stats["endpoints"].items())
+    print(f"{label}: {stats['requests']} requests ({endpoints})")
+
+def run_generated(args):
+    """Replay generated changes to a receiver and report; returns the dataset and the measurements."""
+    dataset = mock_jira.dataset_from_args(args)
+    server = mock_jira.start_in_thread(dataset, latency=args.latency,
+                                       rate_limit=args.rate_limit, ratio_429=args.ratio_429)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = jira_environment(server, workdir)
+        # Start from a dataset whose due dates are in sync; a due date set by one cron
+        # run can make the next one update the tickets linked to that ticket in turn
+        stories = [key for key, issue in dataset.issues.items() if issue["fields"]["issuetype"]["name"] == "Story"]
+        while True:
+            server.stats.reset()
+            run_cron(env, stories)
+            if not any(name.startswith("PUT") for name in control(server, "/__stats")["endpoints"]):
+                break
+        server.stats.reset()
+
+        port = free_port()
+        command = [sys.executable, "webhook.py", "--port", str(port),
+                   "--debounce", str(args.debounce), "--max-wait", str(args.max_wait)]
+        if args.mirror:
+            command += ["--mirror-to", mock_jira.TARGET_PROJECT, "--mirror-from", mock_jira.SOURCE_PROJECT]
+        log_path = os.path.join(workdir, "webhook.log")
+        with open(log_path, "w") as log:
+            receiver = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=log, stderr=log)
+        receiver_url = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(50):
+                try:
+                    receiver_status(receiver_url)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+            started = time.perf_counter()
+            events = 0
+            issues = set()
+            for event in generate_events(dataset, args.generate, args.hot, rng):
+                send_event(receiver_url, event)
+                events += 1
+                if "issue" in event:
+                    issues.add(event["issue"]["key"])
+                time.sleep(args.delay)
+            status = wait_until_idle(receiver_url, events)
+            elapsed = time.perf_counter() - started
+            stats = control(server, "/__stats")
+        finally:
+            receiver.send_signal(signal.SIGINT)
+            receiver.wait()
+        if args.verbose:
+            with open(log_path) as log:
+                sys.stderr.write(log.read())
+
+        print(f"Sent {events} events for {args.generate} changes to {len(issues)} issues in {elapsed:.1f}s")
+        print(f"Receiver: {status['batches']} batches, {status['issues']} issues processed, "
+              f"{status['due_date_updates']} due date updates, {status['mirrors_created']} mirrors created, "
+              f"{status['mirrors_updated']} mirrors updated, {status['echoes']} echoes ignored")
+        print_requests("Jira requests by the receiver", stats)
+
+        # Polling every story from cron afterwards reads everything again, and should find nothing left to do
+        server.stats.reset()
+        run_cron(env, stories)
+        cron_stats = control(server, "/__stats")
+        print_requests(f"Cron-style sync_due_dates.py --bulk over {len(stories)} stories", cron_stats)
+    server.shutdown()
+    server.server_close()
+    return {"dataset": dataset, "status": status, "requests": stats, "cron_requests": cron_stats}
+
+def run_file(args):
+    with open(args.file) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    for event in events:
+        send_event(args.receiver, event, args.secret)
+        time.sleep(args.delay)
+    status = wait_until_idle(args.receiver, len(events))
+    print(f"Replayed {len(events)} events: {json.dumps(status)}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Replay or generate Jira webhook events for webhook.py.')
+    parser.add_argument('file', nargs='?', help='NDJSON file of events to replay (e.g. from webhook.py --record)')
+    parser.add_argument('--receiver', help='URL of a running webhook.py to replay the file to')
+    parser.add_argument('--secret', help='Sign the replayed events with this webhook secret')
+    parser.add_argument('--delay', type=float, default=0.005, help='Seconds between events (default 0.005)')
+    parser.add_argument('--generate', type=int, metavar='N',
+                        help='Generate N changes against a local mock Jira instead of replaying a file')
+    parser.add_argument('--hot', type=int, default=40, help='Stories the generated changes are spread over (default 40)')
+    parser.add_argument('--mirror', action='store_true', help='Run the receiver with mirroring enabled')
+    parser.add_argument('--debounce', type=float, default=0.5, help='Receiver debounce in seconds (default 0.5)')
+    parser.add_argument('--max-wait', type=float, default=5.0, help='Receiver max wait in seconds (default 5)')
+    parser.add_argument('--verbose', action='store_true', help="Print the receiver's log")
+    mock_jira.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.generate and not (args.file and args.receiver):
+        parser.error('give either FILE with --receiver, or --generate N')
+    return args
+
+def main():
+    args = parse_args()
+    if args.generate:
+        run_generated(args)
+    else:
+        run_file(args)
+
+if __name__ == "__main__":
+    main()
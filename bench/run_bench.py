@@ -0,0 +1,150 @@
+"""
+Benchmark Harness
+
+Runs the scripts against the local mock Jira server (mock_jira.py) and
+records wall time, request count and bytes transferred for each scenario.
+Every scenario starts from a freshly generated dataset and empty local caches,
+so results are comparable between runs and between commits.
+
+Usage:
+    python bench/run_bench.py [--issues 2000] [--latency 0.05] [--rate-limit 50]
+                              [--only extract my_todos ...] [--json results.json]
+                              [--baseline results.json [--tolerance 0.2]]
+
+With --baseline, the run fails (exit code 1) when a scenario needs more
+requests or bytes, or takes longer, than the baseline allows.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import mock_jira
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall time varies more than request counts, so it gets extra slack
+TIME_TOLERANCE_FACTOR = 2
+
+def scenarios(args):
+    """Return (name, argv) pairs for every benchmarked command."""
+    first = args.epics + 1
+    keys = [f"{mock_jira.SOURCE_PROJECT}-{first + i}" for i in range(args.tickets)]
+    return [
+        ("extract", ["extract.py", "--sprint", str(mock_jira.FIRST_SPRINT_ID)]),
+        ("my_todos", ["my_todos.py", str(mock_jira.BOARD_ID)]),
+        ("burndown", ["burndown.py", "--sprint", str(mock_jira.FIRST_SPRINT_ID)]),
+        ("show_description", ["show_description.py", keys[0]]),
+        ("create_mirror", ["create_mirror.py", "-b", mock_jira.TARGET_PROJECT] + keys),
+        ("create_mirror_bulk", ["create_mirror.py", "-b", mock_jira.TARGET_PROJECT, "--bulk"] + keys),
+        ("sync_due_dates", ["sync_due_dates.py"] + keys),
+        ("sync_due_dates_bulk", ["sync_due_dates.py", "--bulk"] + keys),
+    ]
+
+def control(server, path, method="GET"):
+    request = urllib.request.Request(f"{server.base_url}{path}", method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def run_scenario(server, argv, workdir):
+    """Run one script against a fresh dataset and return its measurements."""
+    control(server, "/__reset", "POST")
+    env = dict(os.environ)
+    env.update({
+        "JIRA_BASE_URL": server.base_url,
+        "JIRA_DOMAIN": "mock.atlassian.net",
+        "JIRA_EMAIL": "bench@example.com",
+        "JIRA_API_TOKEN": "bench",
+        "JIRA_CACHE_PATH": os.path.join(workdir, "issues.sqlite"),
+        "JIRA_BOARD_CACHE_PATH": os.path.join(workdir, "boards.sqlite"),
+        "JIRA_SPRINT_STORE_PATH": os.path.join(workdir, "sprints.sqlite"),
+        "JIRA_CHANGELOG_STORE_PATH": os.path.join(workdir, "changelogs.sqlite"),
+    })
+    for name in ("issues.sqlite", "boards.sqlite", "sprints.sqlite", "changelogs.sqlite"):
+        path = os.path.join(workdir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable] + argv, cwd=REPO_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    wall_time = time.perf_counter() - start
+    stats = control(server, "/__stats")
+    return {
+        "wall_time": round(wall_time, 3),
+        "requests": stats["requests"],
+        "bytes_in": stats["bytes_in"],
+        "bytes_out": stats["bytes_out"],
+        "throttled": stats["throttled"],
+        "exit_code": process.returncode,
+        "endpoints": stats["endpoints"],
+    }
+
+def find_regressions(results, baseline, tolerance):
+    """Compare results with a baseline run, returning human-readable regressions."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        for metric, allowed in (("requests", tolerance), ("bytes_out", tolerance),
+                                ("wall_time", tolerance * TIME_TOLERANCE_FACTOR)):
+            if before[metric] and result[metric] > before[metric] * (1 + allowed):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]}")
+    return regressions
+
+def print_table(results):
+    print(f"{'scenario':<22}{'wall s':>9}{'requests':>10}{'KB sent':>10}{'KB recv':>10}{'429s':>6}{'exit':>6}")
+    print("-" * 73)
+    for name, r in results.items():
+        print(f"{name:<22}{r['wall_time']:>9.2f}{r['requests']:>10}{r['bytes_in'] / 1024:>10.1f}"
+              f"{r['bytes_out'] / 1024:>10.1f}{r['throttled']:>6}{r['exit_code']:>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scripts against a local mock Jira server.')
+    mock_jira.add_arguments(parser)
+    parser.add_argument('--tickets', type=int, default=100,
+                        help='Tickets passed to the multi-ticket scripts (default 100)')
+    parser.add_argument('--only', nargs='+', help='Only run these scenarios')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Fail if results regress against this earlier --json file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative increase over the baseline (default 0.2)')
+    args = parser.parse_args()
+
+    dataset = mock_jira.dataset_from_args(args)
+    server = mock_jira.start_in_thread(dataset, latency=args.latency,
+                                       rate_limit=args.rate_limit, ratio_429=args.ratio_429)
+    print(f"Mock Jira with {len(dataset.issues)} issues on {server.base_url}", file=sys.stderr)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, argv in scenarios(args):
+            if args.only and name not in args.only:
+                continue
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = run_scenario(server, argv, workdir)
+    server.shutdown()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
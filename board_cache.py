@@ -0,0 +1,86 @@
+"""
+Board Cache
+
+Board metadata (project key and the board's columns with the statuses mapped
+to each) rarely changes, so it is resolved from Jira once and then kept in a
+small SQLite cache for a day.
+
+Settings (environment or .env):
+    JIRA_BOARD_CACHE_PATH  SQLite file (default ~/.cache/jira-extractor/boards.sqlite)
+    JIRA_BOARD_CACHE_TTL   seconds before board metadata is fetched again (default 86400)
+"""
+
+import json
+import os
+import sqlite3
+import time
+import jira_client
+from jira_client import AGILE_API_URL
+
+BOARD_CACHE_PATH = os.path.expanduser(os.getenv("JIRA_BOARD_CACHE_PATH", "~/.cache/jira-extractor/boards.sqlite"))
+BOARD_CACHE_TTL = float(os.getenv("JIRA_BOARD_CACHE_TTL", str(24 * 3600)))
+
+def _connect():
+    os.makedirs(os.path.dirname(BOARD_CACHE_PATH), exist_ok=True)
+    db = sqlite3.connect(BOARD_CACHE_PATH)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS boards ("
+        " board_id TEXT PRIMARY KEY,"
+        " fetched_at REAL NOT NULL,"
+        " data TEXT NOT NULL)"
+    )
+    return db
+
+def fetch_board_metadata(board_id):
+    """Resolve a board's project key and column/status mapping from Jira."""
+    project_key = None
+
+    # The project key is usually in the location or the first project
+    board_url = f"{AGILE_API_URL}/board/{board_id}"
+    response = jira_client.get(board_url)
+    if response.status_code == 200:
+        board_data = response.json()
+        if 'location' in board_data and 'projectKey' in board_data['location']:
+            project_key = board_data['location']['projectKey']
+        elif 'projects' in board_data and len(board_data['projects']) > 0:
+            project_key = board_data['projects'][0]['key']
+
+    # The configuration holds the columns, and is the fallback for the project key
+    config_url = f"{AGILE_API_URL}/board/{board_id}/configuration"
+    response = jira_client.get(config_url)
+    columns = []
+    if response.status_code == 200:
+        config = response.json()
+        if not project_key and 'location' in config and 'projectKey' in config['location']:
+            project_key = config['location']['projectKey']
+        for column in config.get('columnConfig', {}).get('columns', []):
+            columns.append({
+                'name': column['name'],
+                'status_ids': [status['id'] for status in column.get('statuses', [])]
+            })
+
+    if not project_key:
+        print(f"Failed to fetch board info. Status code: {response.status_code}")
+        print(f"Error: {response.text}")
+        return None
+    return {'project_key': project_key, 'columns': columns}
+
+def get_board_metadata(board_id):
+    """Return cached board metadata, fetching it when missing or older than the TTL."""
+    board_id = str(board_id)
+    db = _connect()
+    try:
+        row = db.execute("SELECT fetched_at, data FROM boards WHERE board_id = ?", (board_id,)).fetchone()
+        if row and time.time() - row[0] < BOARD_CACHE_TTL:
+            return json.loads(row[1])
+
+        metadata = fetch_board_metadata(board_id)
+        if metadata:
+            db.execute(
+                "INSERT OR REPLACE INTO boards (board_id, fetched_at, data) VALUES (?, ?, ?)",
+                (board_id, time.time(), json.dumps(metadata))
+            )
+            db.commit()
+        return metadata
+    finally:
+        db.close()
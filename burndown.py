@@ -0,0 +1,248 @@
+"""
+Burndown Script
+
+Prints a sprint's daily burndown (story points still open at the end of each
+day) and how long its tickets spent in each status, worked out from the
+issues' changelogs rather than from a snapshot of their current status.
+
+Changelogs are kept in a local store (changelog_store.py) with a cursor per
+issue. Each run lists the sprint's issues, with their `updated` timestamps,
+in one paged search. It then asks for the changelog of only those issues that
+changed since the last run, and only from their cursor on, so just the new
+history entries are downloaded. These requests run in parallel and are saved
+in batches, so an interrupted run keeps what it has already fetched. A rerun
+on an unchanged sprint costs only the search.
+
+Tickets are counted as in extract.py: subtasks in place of their parents. A
+ticket's status and story points at any moment are replayed from its
+changelog, starting from the values before its first recorded change.
+
+Usage:
+    python burndown.py [--sprint SPRINT_ID] [--workers N] [--done STATUS ...] [--full]
+
+Example:
+    python burndown.py --sprint 750
+    python burndown.py --sprint 750 --done Done Closed
+"""
+
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
+import argparse
+import bisect
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import changelog_store
+import instrumentation
+import jira_client
+from jira_client import AGILE_API_URL, ISSUE_API_URL
+
+SPRINT_ID = "750"  # Replace with your sprint ID
+
+# Fields requested for the sprint's issues
+BURNDOWN_FIELDS = ["status", "customfield_10016", "created", "updated", "subtasks"]
+
+# Changelog items that carry a ticket's story points (see changelog_store.TRACKED_FIELDS)
+STORY_POINT_FIELDS = {"customfield_10016", "Story Points"}
+
+# Statuses in which a ticket's story points count as burned down
+DONE_STATUSES = ["Done", "Closed", "Resolved"]
+
+CHANGELOG_PAGE_SIZE = 100
+FETCH_WORKERS = 8
+# Issues whose new history is saved per store commit
+WRITE_BATCH_SIZE = 50
+
+DAY = 86400
+
+def parse_time(value):
+    """Parse a Jira timestamp ("2026-10-03T09:30:00.000+0000" or "...Z") into a Unix timestamp."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+
+def get_sprint(sprint_id):
+    url = f"{AGILE_API_URL}/sprint/{sprint_id}"
+    response = jira_client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"Failed to retrieve sprint {sprint_id}. Status code: {response.status_code}\n"
+            f"Error message: {response.text}"
+        )
+    return response.json()
+
+def fetch_new_history(issue_key, start_at):
+    """Fetch the issue's history entries from start_at on, or None if Jira wouldn't give them."""
+    url = f"{ISSUE_API_URL}/{issue_key}/changelog"
+    histories = []
+    while True:
+        params = {"startAt": start_at + len(histories), "maxResults": CHANGELOG_PAGE_SIZE}
+        response = jira_client.get(url, params=params)
+        if response.status_code != 200:
+            print(f"Failed to fetch the changelog of {issue_key}. Status code: {response.status_code}")
+            return None
+        page = response.json()
+        values = page.get("values", [])
+        histories.extend(values)
+        if page.get("isLast", True) or not values:
+            return histories
+
+def sync_changelogs(db, issues, workers=FETCH_WORKERS):
+    """Bring the stored history of the issues up to date; return (issues fetched, new entries)."""
+    cursors = changelog_store.get_cursors(db, [issue["key"] for issue in issues])
+    stale = [
+        (issue["key"], issue["fields"]["updated"], cursors.get(issue["key"], (0, None))[0])
+        for issue in issues
+        if cursors.get(issue["key"], (0, None))[1] != issue["fields"]["updated"]
+    ]
+    new_entries = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        fetched = executor.map(daemon.propagate(lambda item: fetch_new_history(item[0], item[2])), stale)
+        for count, ((key, updated, start_at), histories) in enumerate(zip(stale, fetched), 1):
+            if histories is not None:
+                changelog_store.add_history(db, key, start_at, histories, updated)
+                new_entries += len(histories)
+            if count % WRITE_BATCH_SIZE == 0:
+                db.commit()
+    db.commit()
+    return len(stale), new_entries
+
+def story_points(value):
+    """Story points from a field value or a changelog string; None when unset."""
+    if value in (None, ""):
+        return None
+    return float(value)
+
+class Timeline:
+    """A ticket's status and story points over time, replayed from its changelog."""
+
+    def __init__(self, issue, events):
+        fields = issue["fields"]
+        self.key = issue["key"]
+        self.created = parse_time(fields["created"])
+        status_changes = [(parse_time(created), old, new) for created, field, old, new in events if field == "status"]
+        point_changes = [(parse_time(created), old, new) for created, field, old, new in events
+                         if field in STORY_POINT_FIELDS]
+        self.status_times = [changed for changed, _, _ in status_changes]
+        self.statuses = ([status_changes[0][1]] if status_changes else [fields["status"]["name"]]) + \
+                        [new for _, _, new in status_changes]
+        self.point_times = [changed for changed, _, _ in point_changes]
+        self.points = ([story_points(point_changes[0][1])] if point_changes
+                       else [story_points(fields.get("customfield_10016"))]) + \
+                      [story_points(new) for _, _, new in point_changes]
+
+    def status_at(self, moment):
+        return self.statuses[bisect.bisect_right(self.status_times, moment)]
+
+    def points_at(self, moment):
+        return self.points[bisect.bisect_right(self.point_times, moment)]
+
+    def status_periods(self, until):
+        """Yield (status, seconds) for every stay in a status up to `until`."""
+        starts = [self.created] + self.status_times
+        ends = self.status_times + [until]
+        for status, start, end in zip(self.statuses, starts, ends):
+            if end > start:
+                yield status, end - start
+
+def burndown(timelines, start, end, done_statuses):
+    """Return (date, scope, done, remaining) story point totals at the end of each day of the sprint."""
+    rows = []
+    day = datetime.fromtimestamp(start, timezone.utc).date()
+    last_day = datetime.fromtimestamp(end, timezone.utc).date()
+    while day <= last_day:
+        cutoff = min(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() + DAY, end)
+        scope = done = 0.0
+        for timeline in timelines:
+            if timeline.created > cutoff:
+                continue  # Not created yet
+            points = timeline.points_at(cutoff)
+            if not points:
+                continue
+            scope += points
+            if timeline.status_at(cutoff) in done_statuses:
+                done += points
+        rows.append((day.isoformat(), scope, done, scope - done))
+        day += timedelta(days=1)
+    return rows
+
+def time_in_status(timelines, until):
+    """Return {status: (average days, tickets)} for every status the tickets were in."""
+    totals = defaultdict(float)
+    tickets = defaultdict(set)
+    for timeline in timelines:
+        for status, seconds in timeline.status_periods(until):
+            totals[status] += seconds
+            tickets[status].add(timeline.key)
+    return {status: (totals[status] / len(tickets[status]) / DAY, len(tickets[status])) for status in totals}
+
+def cycle_times(timelines, done_statuses):
+    """Days from each done ticket's first status change to its last move into a done status."""
+    days = []
+    for timeline in timelines:
+        if timeline.statuses[-1] not in done_statuses or not timeline.status_times:
+            continue
+        finished = max(changed for changed, status in zip(timeline.status_times, timeline.statuses[1:])
+                       if status in done_statuses)
+        days.append((finished - timeline.status_times[0]) / DAY)
+    return days
+
+def print_report(sprint, timelines, done_statuses):
+    now = time.time()
+    start = parse_time(sprint["startDate"])
+    end = min(parse_time(sprint.get("completeDate") or sprint["endDate"]), now)
+
+    print(f"\nBurndown of {sprint.get('name', sprint['id'])} ({len(timelines)} tickets):")
+    print(f"{'Date':<12}{'Scope':>10}{'Done':>10}{'Remaining':>11}")
+    for day, scope, done, remaining in burndown(timelines, start, end, done_statuses):
+        print(f"{day:<12}{scope:>10.1f}{done:>10.1f}{remaining:>11.1f}")
+
+    print("\nTime in Status (average days per ticket):")
+    for status, (days, tickets) in sorted(time_in_status(timelines, now).items(), key=lambda item: -item[1][1]):
+        print(f"- {status}: {days:.1f} days ({tickets} tickets)")
+
+    days = cycle_times(timelines, done_statuses)
+    if days:
+        print(f"\nCycle time: {statistics.mean(days):.1f} days on average, "
+              f"{statistics.median(days):.1f} median ({len(days)} done tickets)")
+
+def report_burndown(sprint_id, workers=FETCH_WORKERS, done_statuses=DONE_STATUSES, full=False):
+    sprint = get_sprint(sprint_id)
+    issues = [issue for page in jira_client.iter_search(f"sprint = {sprint_id}", BURNDOWN_FIELDS) for issue in page]
+    # Subtasks are counted instead of their parents, as in extract.py
+    tickets = list({issue["key"]: issue for issue in issues if not issue["fields"].get("subtasks")}.values())
+
+    db = changelog_store.connect()
+    try:
+        if full:
+            changelog_store.forget(db, [issue["key"] for issue in tickets])
+        fetched, new_entries = sync_changelogs(db, tickets, workers)
+        print(f"Fetched {new_entries} new history entries for {fetched} of {len(tickets)} tickets.")
+        events = changelog_store.get_events(db, [issue["key"] for issue in tickets])
+    finally:
+        db.close()
+
+    timelines = [Timeline(issue, events.get(issue["key"], [])) for issue in tickets]
+    print_report(sprint, timelines, set(done_statuses))
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a sprint's burndown and time in status from the changelogs.")
+    parser.add_argument('-s', '--sprint', default=SPRINT_ID, help=f'Sprint ID (default {SPRINT_ID})')
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS,
+                        help=f'Changelogs fetched in parallel (default {FETCH_WORKERS})')
+    parser.add_argument('--done', nargs='+', default=DONE_STATUSES, metavar='STATUS',
+                        help=f'Statuses that count as done (default {" ".join(DONE_STATUSES)})')
+    parser.add_argument('--full', action='store_true',
+                        help="Fetch the tickets' changelogs from the start again instead of only new entries")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup(args)
+
+    try:
+        report_burndown(args.sprint, args.workers, args.done, args.full)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Changelog Store
+
+Local SQLite copy of the issue history burndown.py works from. For every issue
+it keeps the tracked changelog items fetched so far and a cursor: how many
+history entries have been read (the startAt of the next changelog request)
+and the issue's `updated` timestamp at the time, so unchanged issues needn't
+be asked for their changelog at all.
+
+Only the items of TRACKED_FIELDS are stored; after changing it, run
+burndown.py once with --full to fetch the older history again.
+
+Settings (environment or .env):
+    JIRA_CHANGELOG_STORE_PATH  SQLite file (default ~/.cache/jira-extractor/changelogs.sqlite)
+"""
+
+import os
+import sqlite3
+from collections import defaultdict
+
+STORE_PATH = os.path.expanduser(os.getenv("JIRA_CHANGELOG_STORE_PATH", "~/.cache/jira-extractor/changelogs.sqlite"))
+
+# Changelog items kept, by field ID (or field name on servers that don't send one)
+TRACKED_FIELDS = {"status", "customfield_10016", "Story Points"}
+
+# Keys per IN (...) lookup, below SQLite's variable limit
+LOOKUP_BATCH_SIZE = 500
+
+def connect():
+    """Open the store, creating its tables on first use."""
+    os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+    db = sqlite3.connect(STORE_PATH)
+    db.executescript(
+        "CREATE TABLE IF NOT EXISTS cursors ("
+        " issue_key TEXT PRIMARY KEY,"
+        " start_at INTEGER NOT NULL,"  # History entries read so far
+        " updated TEXT);"  # The issue's `updated` when they were read
+        "CREATE TABLE IF NOT EXISTS events ("
+        " issue_key TEXT NOT NULL,"
+        " position INTEGER NOT NULL,"  # Index of the history entry in the issue's changelog
+        " created TEXT NOT NULL,"
+        " field TEXT NOT NULL,"
+        " from_string TEXT,"
+        " to_string TEXT,"
+        " PRIMARY KEY (issue_key, position, field));"
+    )
+    return db
+
+def _batches(keys):
+    keys = list(keys)
+    for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        chunk = keys[i:i + LOOKUP_BATCH_SIZE]
+        yield chunk, ", ".join("?" * len(chunk))
+
+def get_cursors(db, issue_keys):
+    """Return {issue key: (start_at, updated)} for the issues with stored history."""
+    cursors = {}
+    for chunk, placeholders in _batches(issue_keys):
+        rows = db.execute(
+            f"SELECT issue_key, start_at, updated FROM cursors WHERE issue_key IN ({placeholders})", chunk
+        )
+        for key, start_at, updated in rows:
+            cursors[key] = (start_at, updated)
+    return cursors
+
+def add_history(db, issue_key, start_at, histories, updated):
+    """Store the history entries read from start_at on and move the issue's cursor past them."""
+    db.executemany(
+        "INSERT OR REPLACE INTO events (issue_key, position, created, field, from_string, to_string)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (issue_key, start_at + offset, history["created"], field, item.get("fromString"), item.get("toString"))
+            for offset, history in enumerate(histories)
+            for item in history.get("items", [])
+            for field in [item.get("fieldId") or item.get("field")]
+            if field in TRACKED_FIELDS
+        ]
+    )
+    db.execute(
+        "INSERT OR REPLACE INTO cursors (issue_key, start_at, updated) VALUES (?, ?, ?)",
+        (issue_key, start_at + len(histories), updated)
+    )
+
+def forget(db, issue_keys):
+    """Drop the stored history of the issues, so it is fetched again from the start."""
+    for chunk, placeholders in _batches(issue_keys):
+        db.execute(f"DELETE FROM events WHERE issue_key IN ({placeholders})", chunk)
+        db.execute(f"DELETE FROM cursors WHERE issue_key IN ({placeholders})", chunk)
+    db.commit()
+
+def get_events(db, issue_keys):
+    """Return {issue key: [(created, field, from_string, to_string), ...]}, oldest first."""
+    events = defaultdict(list)
+    for chunk, placeholders in _batches(issue_keys):
+        rows = db.execute(
+            "SELECT issue_key, created, field, from_string, to_string FROM events"
+            f" WHERE issue_key IN ({placeholders}) ORDER BY issue_key, position",
+            chunk
+        )
+        for key, created, field, from_string, to_string in rows:
+            events[key].append((created, field, from_string, to_string))
+    return events
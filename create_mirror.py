@@ -11,66 +11,146 @@ Features:
 - Prevents duplicate mirrors
 - Can handle multiple tickets at once
 - Optional labels can be added to mirror tickets
+- Several tickets processed at the same time with -j/--concurrency (see
+  ticket_engine.py), each one's steps still in order
+- Bulk mode for whole boards: one search for all sources, mirrors created
+  through /issue/bulk in batches and links created concurrently
+- NDJSON mode (--ndjson): reads issue records from stdin as they arrive, skips
+  fetching sources whose record already has the needed fields, and writes a
+  record for every mirror it creates to stdout (progress goes to stderr)
+- Resumable runs (--journal FILE): planned and completed creates and links
+  are recorded in FILE, and rerunning the command with it picks up where it
+  stopped without fetching or creating anything twice (see journal.py);
+  --plan only prints the planned changes
+- Mirror index (--index): finds existing mirrors from one paged search over
+  the target board's issues with mirror links instead of checking every
+  ticket's links, and only fetches the tickets that still need a mirror
 
 Usage:
-    python create_mirror.py -b TARGET_BOARD [-l LABEL1 [LABEL2 ...]] TICKET-123 [TICKET-456 TICKET-789 ...]
+    python create_mirror.py -b TARGET_BOARD [-l LABEL1 [LABEL2 ...]] [--bulk | -j N] [--index] [--journal FILE] [--plan] TICKET-123 [TICKET-456 TICKET-789 ...]
 
 Example:
     python create_mirror.py -b EXMP EXMP-152
     python create_mirror.py -b DEV -l mirror automated EXMP-152 EXMP-153 EXMP-154
+    python create_mirror.py -b DEV -j 8 EXMP-152 EXMP-153 EXMP-154
+    python create_mirror.py -b DEV --journal mirror.jsonl EXMP-152 EXMP-153 EXMP-154
+    python my_todos.py 69 | xargs python create_mirror.py -b EXMP --bulk
+    python my_todos.py 69 --ndjson | python create_mirror.py -b EXMP --ndjson
 """
 
-import requests
-from requests.auth import HTTPBasicAuth
-from dotenv import load_dotenv
-import os
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
 import sys
 import json
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+import jira_client
+from jira_client import ISSUE_API_URL, ISSUE_LINK_URL, ISSUE_LINK_TYPE_URL
+import issue_cache
+import issue_stream
+import journal
+import ticket_engine
+from issue_cache import get_issue, get_issues
 
-# Load environment variables from .env file
-load_dotenv()
+ISSUE_BULK_URL = f"{ISSUE_API_URL}/bulk"
 
-# Jira API details
-JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
-ISSUE_API_URL = f"https://{JIRA_DOMAIN}/rest/api/2/issue"
-ISSUE_LINK_URL = f"https://{JIRA_DOMAIN}/rest/api/2/issueLink"
+# The only source fields a mirror needs
+MIRROR_FIELDS = ["summary", "description", "duedate", "issuelinks"]
 
-# Headers
-HEADERS = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
+# Source fields an existing mirror is kept in step with (see webhook.py),
+# which are also all a mirror is created from
+MIRRORED_FIELDS = ["summary", "description", "duedate"]
 
-AUTH = HTTPBasicAuth(os.getenv('JIRA_EMAIL'), os.getenv("JIRA_API_TOKEN"))
+# Link types that connect a ticket to its mirror
+MIRROR_LINK_TYPES = ['Relates', 'Mirrors']
 
-def get_issue_details(issue_key):
-    """Fetch detailed information for an issue by its key."""
-    url = f"{ISSUE_API_URL}/{issue_key}"
-    response = requests.get(url, headers=HEADERS, auth=AUTH)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch details for issue {issue_key}. Status code: {response.status_code}")
-        return None
+# Jira accepts at most 50 issues per bulk create request
+BULK_BATCH_SIZE = 50
+LINK_WORKERS = 8
 
-def check_existing_links(issue_key, target_board):
-    """Check if the issue already has a mirror link."""
-    issue = get_issue_details(issue_key)
-    if not issue:
-        return False
-    
+def find_existing_mirror(issue, target_board):
+    """Return the key of the issue's mirror in the target board, if it has one."""
     links = issue.get('fields', {}).get('issuelinks', [])
     for link in links:
-        if link.get('type', {}).get('name') in ['Relates', 'Mirrors']:
+        if link.get('type', {}).get('name') in MIRROR_LINK_TYPES:
             linked_issue = link.get('outwardIssue') or link.get('inwardIssue')
             if linked_issue and linked_issue.get('key', '').startswith(f'{target_board}-'):
-                print(f"Mirror link already exists: {linked_issue['key']}")
-                return True
+                return linked_issue['key']
+    return None
+
+class MirrorIndex:
+    """Source key -> mirror key for a whole target board.
+
+    Built on first use from one paged search over the board's issues with a
+    mirror link, the other end of each mirror link being its source. Mirrors
+    linked during the run are added as they are linked.
+    """
+
+    def __init__(self, target_board):
+        self.target_board = target_board
+        self.mirrors = None
+        self._lock = threading.Lock()
+
+    def _jql(self):
+        """JQL for the board's issues with a mirror link (or all of them, if the link types can't be read)."""
+        response = jira_client.get(ISSUE_LINK_TYPE_URL)
+        if response.status_code == 200:
+            # JQL filters links by their descriptions ("relates to"), not by type name
+            descriptions = sorted({
+                description
+                for link_type in response.json().get('issueLinkTypes', [])
+                if link_type.get('name') in MIRROR_LINK_TYPES
+                for description in (link_type.get('inward'), link_type.get('outward')) if description
+            })
+            if descriptions:
+                return f"project = {self.target_board} AND issueLinkType in ({', '.join(map(json.dumps, descriptions))})"
+        print(f"Could not read the issue link types (status code {response.status_code}); "
+              f"indexing every issue in {self.target_board}", file=sys.stderr)
+        return f"project = {self.target_board}"
+
+    def _load(self):
+        print(f"Indexing existing mirrors in {self.target_board}...", file=sys.stderr)
+        mirrors = {}
+        for issues in jira_client.iter_search(self._jql(), ["issuelinks"]):
+            for issue in issues:
+                for link in issue['fields'].get('issuelinks', []):
+                    if link.get('type', {}).get('name') in MIRROR_LINK_TYPES:
+                        linked_issue = link.get('outwardIssue') or link.get('inwardIssue')
+                        if linked_issue:
+                            mirrors.setdefault(linked_issue['key'], issue['key'])
+        return mirrors
+
+    def get(self, source_key):
+        """Return the key of the source's mirror in the board, if it has one."""
+        with self._lock:
+            if self.mirrors is None:
+                self.mirrors = self._load()
+            return self.mirrors.get(source_key)
+
+    def add(self, source_key, mirror_key):
+        with self._lock:
+            if self.mirrors is not None:
+                self.mirrors.setdefault(source_key, mirror_key)
+
+def check_existing_links(issue_key, target_board, index=None):
+    """Check if the issue already has a mirror link, in the index if there is one."""
+    if index:
+        mirror_key = index.get(issue_key)
+    else:
+        issue = get_issue(issue_key, MIRROR_FIELDS)
+        if not issue:
+            return False
+        mirror_key = find_existing_mirror(issue, target_board)
+    if mirror_key:
+        print(f"Mirror link already exists: {mirror_key}", file=sys.stderr)
+        return True
     return False
 
-def create_mirror_issue(source_issue, project_key, labels=None):
-    """Create a mirror issue in the target project."""
+def build_mirror_payload(source_issue, project_key, labels=None):
+    """Build the create-issue payload for a mirror of the source issue."""
     fields = source_issue['fields']
     
     # Prepare the payload for the new issue
@@ -90,21 +170,37 @@ def create_mirror_issue(source_issue, project_key, labels=None):
     # Add labels if provided
     if labels:
         payload["fields"]["labels"] = labels
-    
-    response = requests.post(
-        ISSUE_API_URL,
-        headers=HEADERS,
-        auth=AUTH,
-        json=payload
-    )
+    return payload
+
+def create_mirror_issue(source_issue, project_key, labels=None):
+    """Create a mirror issue in the target project."""
+    payload = build_mirror_payload(source_issue, project_key, labels)
+    response = jira_client.post(ISSUE_API_URL, json=payload)
     
     if response.status_code == 201:
         return response.json()
     else:
-        print(f"Failed to create mirror issue. Status code: {response.status_code}")
-        print(f"Error: {response.text}")
+        print(f"Failed to create mirror issue. Status code: {response.status_code}", file=sys.stderr)
+        print(f"Error: {response.text}", file=sys.stderr)
         return None
 
+def update_mirror_issue(mirror_key, source_issue):
+    """Copy the source's title, description and due date to its existing mirror.
+
+    Returns the fields that were set, or None if the update failed.
+    """
+    fields = {name: source_issue['fields'].get(name) for name in MIRRORED_FIELDS}
+    fields['description'] = fields['description'] or ''
+    response = jira_client.put(f"{ISSUE_API_URL}/{mirror_key}", json={"fields": fields})
+
+    if response.status_code == 204:
+        issue_cache.invalidate(mirror_key)
+        print(f"Updated mirror issue {mirror_key}", file=sys.stderr)
+        return fields
+    print(f"Failed to update mirror issue {mirror_key}. Status code: {response.status_code}", file=sys.stderr)
+    print(f"Error: {response.text}", file=sys.stderr)
+    return None
+
 def create_issue_link(source_key, target_key):
     """Create a link between two issues."""
     payload = {
@@ -119,75 +215,287 @@ def create_issue_link(source_key, target_key):
         }
     }
     
-    response = requests.post(
-        ISSUE_LINK_URL,
-        headers=HEADERS,
-        auth=AUTH,
-        json=payload
-    )
+    response = jira_client.post(ISSUE_LINK_URL, json=payload)
     
     if response.status_code == 201:
         return True
     else:
-        print(f"Failed to create issue link. Status code: {response.status_code}")
-        print(f"Error: {response.text}")
+        print(f"Failed to create issue link. Status code: {response.status_code}", file=sys.stderr)
+        print(f"Error: {response.text}", file=sys.stderr)
         return False
 
-def process_ticket(source_key, target_board, labels=None):
-    """Process a single ticket to create its mirror."""
-    print(f"\nProcessing ticket: {source_key}")
+def create_mirror_issues_bulk(payloads):
+    """Create mirrors through /issue/bulk from {source key: create-issue payload}.
+
+    Yields {source key: new mirror key} for every batch as soon as Jira has
+    answered it; sources whose mirror could not be created are left out.
+    """
+    source_keys = list(payloads)
+    for i in range(0, len(source_keys), BULK_BATCH_SIZE):
+        batch = source_keys[i:i + BULK_BATCH_SIZE]
+        payload = {
+            "issueUpdates": [payloads[key] for key in batch]
+        }
+        response = jira_client.post(ISSUE_BULK_URL, json=payload)
+        if response.status_code not in (200, 201, 400):
+            print(f"Failed to create mirror issues. Status code: {response.status_code}", file=sys.stderr)
+            print(f"Error: {response.text}", file=sys.stderr)
+            continue
+
+        # Jira reports failed elements by position; created issues come back in order
+        result = response.json()
+        failed = {}
+        for error in result.get('errors', []):
+            failed[error.get('failedElementNumber')] = error.get('elementErrors', {})
+        created = iter(result.get('issues', []))
+        mirror_keys = {}
+        for position, key in enumerate(batch):
+            if position in failed:
+                print(f"Failed to create mirror issue for {key}. Error: {json.dumps(failed[position])}", file=sys.stderr)
+                continue
+            mirror = next(created, None)
+            if mirror:
+                mirror_keys[key] = mirror['key']
+        yield mirror_keys
+
+def link_mirror(source_key, mirror_key, index=None):
+    """Link a freshly created mirror back to its source."""
+    if create_issue_link(source_key, mirror_key):
+        issue_cache.invalidate(source_key)
+        if index:
+            index.add(source_key, mirror_key)
+        print(f"Successfully created mirror ticket {mirror_key} and linked it to {source_key}", file=sys.stderr)
+        return True
+    print(f"Failed to create link between {source_key} and {mirror_key}", file=sys.stderr)
+    return False
+
+def plan_mirrors(source_keys, target_board, labels=None, index=None):
+    """Work out the creates and links that mirror the tickets, from one batched search.
+
+    With a MirrorIndex, only the tickets without a mirror are fetched.
+    """
+    source_keys = list(dict.fromkeys(source_keys))
+    existing = {}
+    if index:
+        existing = {key: mirror_key for key in source_keys for mirror_key in [index.get(key)] if mirror_key}
+        print(f"\nFetching {len(source_keys) - len(existing)} source tickets...", file=sys.stderr)
+        source_issues = get_issues([key for key in source_keys if key not in existing], MIRRORED_FIELDS)
+    else:
+        print(f"\nFetching {len(source_keys)} source tickets...", file=sys.stderr)
+        source_issues = get_issues(source_keys, MIRROR_FIELDS)
+
+    ops = []
+    for key in source_keys:
+        mirror_key = existing.get(key)
+        issue = source_issues.get(key)
+        if not mirror_key and not issue:
+            print(f"Failed to process {key}", file=sys.stderr)
+            continue
+        mirror_key = mirror_key or find_existing_mirror(issue, target_board)
+        if mirror_key:
+            print(f"{key}: mirror link already exists: {mirror_key}. Skipping creation.", file=sys.stderr)
+            continue
+        ops.append({"op": "create", "id": f"create {key}", "source": key,
+                    "payload": build_mirror_payload(issue, target_board, labels)})
+        ops.append({"op": "link", "id": f"link {key}", "source": key})
+    return ops
+
+def describe_op(op):
+    """One line of --plan output."""
+    if op["op"] == "create":
+        fields = op["payload"]["fields"]
+        return f"Create mirror of {op['source']} in {fields['project']['key']}: {fields['summary']}"
+    return f"Link {op['source']} to its mirror"
+
+def apply_plan(run_journal, target_board, workers=LINK_WORKERS, index=None):
+    """Send the planned creates and links that the journal doesn't have as done yet."""
+    creates = run_journal.pending("create")
+    print(f"Creating {len(creates)} mirror issues in {target_board}...", file=sys.stderr)
+    for mirror_keys in create_mirror_issues_bulk({op["source"]: op["payload"] for op in creates}):
+        run_journal.complete({f"create {key}": mirror_key for key, mirror_key in mirror_keys.items()})
+
+    # Mirrors created by an earlier, interrupted run are linked from the journal
+    links = {
+        op["source"]: run_journal.results[f"create {op['source']}"]
+        for op in run_journal.pending("link") if run_journal.is_done(f"create {op['source']}")
+    }
+    print(f"Creating {len(links)} links...", file=sys.stderr)
+
+    def link(source_key, mirror_key):
+        if link_mirror(source_key, mirror_key, index):
+            run_journal.complete({f"link {source_key}": mirror_key})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(daemon.propagate(link), links.keys(), links.values()))
+    if not run_journal.pending("create") and not run_journal.pending("link"):
+        run_journal.checkpoint(journal.FINISHED)
+
+def process_tickets_bulk(source_keys, target_board, labels=None, workers=LINK_WORKERS, run_journal=None,
+                         index=None):
+    """Mirror many tickets at once, returning (key, mirror key or None) pairs in input order.
+
+    With a journal, a plan recorded by an earlier run is used instead of
+    fetching the tickets again, and only its unfinished steps are sent.
+    """
+    run_journal = run_journal or journal.Journal()
+    if not run_journal.planned:
+        run_journal.plan(plan_mirrors(source_keys, target_board, labels, index))
+    if run_journal.finished:
+        print(f"Journal {run_journal.path} is already finished; nothing left to do.", file=sys.stderr)
+    else:
+        apply_plan(run_journal, target_board, workers, index)
+    return [(key, run_journal.results.get(f"link {key}")) for key in source_keys]
+
+def print_summary(results, stream=None):
+    """Print the per-ticket summary table."""
+    stream = stream or sys.stdout
+    print("\nSummary:", file=stream)
+    print("-" * 50, file=stream)
+    for key, success in results:
+        status = "✓ Success" if success else "✗ Skipped/Failed"
+        print(f"{key}: {status}", file=stream)
+
+def process_ticket(source_key, target_board, labels=None, index=None):
+    """Process a single ticket to create its mirror; returns the mirror's key, or None."""
+    # The same ticket given twice must not get two mirrors when run concurrently
+    with ticket_engine.key_lock(source_key):
+        return _process_ticket(source_key, target_board, labels, index)
+
+def _process_ticket(source_key, target_board, labels=None, index=None):
+    print(f"\nProcessing ticket: {source_key}", file=sys.stderr)
     
     # Check if mirror already exists
-    if check_existing_links(source_key, target_board):
-        print("Mirror ticket already exists. Skipping creation.")
-        return False
+    if check_existing_links(source_key, target_board, index):
+        print("Mirror ticket already exists. Skipping creation.", file=sys.stderr)
+        return None
     
     # Get source issue details
-    source_issue = get_issue_details(source_key)
+    # Served from the run-wide cache filled by check_existing_links, or fetched
+    # here with just the fields a mirror is created from when the index was used
+    source_issue = get_issue(source_key, MIRRORED_FIELDS if index else MIRROR_FIELDS)
     if not source_issue:
-        print(f"Failed to process {source_key}")
-        return False
+        print(f"Failed to process {source_key}", file=sys.stderr)
+        return None
     
     # Create mirror issue
-    print(f"Creating mirror issue for {source_key}...")
+    print(f"Creating mirror issue for {source_key}...", file=sys.stderr)
     mirror_issue = create_mirror_issue(source_issue, target_board, labels)
     if not mirror_issue:
-        print(f"Failed to process {source_key}")
-        return False
+        print(f"Failed to process {source_key}", file=sys.stderr)
+        return None
     
     mirror_key = mirror_issue['key']
-    print(f"Created mirror issue: {mirror_key}")
+    print(f"Created mirror issue: {mirror_key}", file=sys.stderr)
     
     # Create link between issues
-    print("Creating link between issues...")
+    print("Creating link between issues...", file=sys.stderr)
     if create_issue_link(source_key, mirror_key):
-        print(f"Successfully created mirror ticket {mirror_key} and linked it to {source_key}")
-        return True
+        # The source now has a new link; don't serve the old copy again
+        issue_cache.invalidate(source_key)
+        if index:
+            index.add(source_key, mirror_key)
+        print(f"Successfully created mirror ticket {mirror_key} and linked it to {source_key}", file=sys.stderr)
+        return mirror_key
     else:
-        print("Failed to create link between issues")
-        return False
+        print("Failed to create link between issues", file=sys.stderr)
+        return None
+
+def mirror_record(source_issue, mirror_key, target_board, labels=None):
+    """Return the NDJSON record of a new mirror, built from the fields it was created with."""
+    fields = build_mirror_payload(source_issue, target_board, labels)['fields']
+    return {'key': mirror_key, 'fields': {name: fields[name] for name in MIRROR_FIELDS if name in fields}}
+
+def process_stream(records, target_board, labels=None, bulk=False, workers=LINK_WORKERS, index=None):
+    """Mirror tickets as their records arrive on stdin, writing a record per new mirror.
+
+    In bulk mode the records are mirrored in batches of BULK_BATCH_SIZE, each
+    as soon as it fills up. Returns (key, mirror key or None) pairs.
+    """
+    results = []
+    batch = []
+
+    def flush():
+        keys = [record['key'] for record in batch]
+        # Served from the records themselves when they carry every field. With
+        # the index, tickets that already have a mirror aren't fetched at all
+        if index:
+            sources = get_issues([key for key in keys if not index.get(key)], MIRRORED_FIELDS)
+        else:
+            sources = get_issues(keys, MIRROR_FIELDS)
+        if bulk:
+            batch_results = process_tickets_bulk(keys, target_board, labels, workers, index=index)
+        else:
+            batch_results = [(key, process_ticket(key, target_board, labels, index)) for key in keys]
+        for key, mirror_key in batch_results:
+            if mirror_key:
+                issue_stream.write_issue(mirror_record(sources[key], mirror_key, target_board, labels))
+        results.extend(batch_results)
+        batch.clear()
+
+    for record in records:
+        batch.append(record)
+        if not bulk or len(batch) == BULK_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    return results
 
 def main():
     parser = argparse.ArgumentParser(description='Create mirror tickets in a specified board.')
     parser.add_argument('-b', '--board', required=True, help='Target board/project key (e.g., EXMP, DEV)')
     parser.add_argument('-l', '--labels', nargs='+', help='Optional labels to add to mirror tickets')
-    parser.add_argument('tickets', nargs='+', help='One or more ticket keys to mirror')
-    
+    parser.add_argument('--bulk', action='store_true',
+                        help='Prefetch all tickets in one search, create mirrors in batches and link them concurrently')
+    parser.add_argument('--workers', type=int, default=LINK_WORKERS,
+                        help=f'Concurrent link requests in bulk mode (default {LINK_WORKERS})')
+    ticket_engine.add_arguments(parser)
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Read issue records (or keys) from stdin and write a record for each new mirror to stdout')
+    journal.add_arguments(parser)
+    parser.add_argument('--index', action='store_true',
+                        help="Find existing mirrors from one search over the target board's mirror links "
+                             "instead of per ticket")
+    parser.add_argument('tickets', nargs='*', help='One or more ticket keys to mirror')
+
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
+    instrumentation.setup(args)
     target_board = args.board.upper()
     source_keys = [key.upper() for key in args.tickets]
+    if not source_keys and not args.ndjson:
+        parser.error('the following arguments are required: tickets')
+    if args.ndjson and (args.journal or args.plan):
+        parser.error('--journal and --plan need the full ticket list up front and cannot be used with --ndjson')
+    # Built on first lookup, so a resumed journal that is already planned never searches
+    index = MirrorIndex(target_board) if args.index else None
     
-    results = []
-    for key in source_keys:
-        success = process_ticket(key, target_board, args.labels)
-        results.append((key, success))
+    if args.ndjson:
+        records = [{'key': key} for key in source_keys] if source_keys else issue_stream.read_issues()
+        results = process_stream(records, target_board, args.labels, args.bulk, args.workers, index)
+        print_summary(results, sys.stderr)
+        return
+    elif args.journal or args.plan:
+        try:
+            run_journal = journal.open_journal(
+                args.journal, {"script": "create_mirror", "board": target_board, "labels": args.labels, "tickets": source_keys}
+            )
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.plan:
+            if not run_journal.planned:
+                run_journal.plan(plan_mirrors(source_keys, target_board, args.labels, index))
+            journal.print_plan(run_journal, describe_op)
+            return
+        results = process_tickets_bulk(source_keys, target_board, args.labels, args.workers, run_journal, index)
+    elif args.bulk:
+        results = process_tickets_bulk(source_keys, target_board, args.labels, args.workers, index=index)
+    else:
+        results = ticket_engine.run_tickets(
+            lambda key: process_ticket(key, target_board, args.labels, index), source_keys, args.concurrency
+        )
     
-    # Print summary
-    print("\nSummary:")
-    print("-" * 50)
-    for key, success in results:
-        status = "✓ Success" if success else "✗ Skipped/Failed"
-        print(f"{key}: {status}")
+    print_summary(results)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,483 @@
+"""
+Warm Daemon
+
+Chained commands such as `python my_todos.py 69 | xargs python create_mirror.py`
+pay for interpreter startup, importing requests, reading .env and new TLS
+handshakes on every step. With JIRA_DAEMON=1 the scripts instead forward their
+arguments to a long-lived local process listening on a Unix socket, which keeps
+the pooled session, the scheduler and the issue cache warm between commands.
+
+The first forwarded command starts the daemon in the background. The client
+streams its stdin to the daemon and the daemon streams the command's stdout,
+stderr and exit code back, so pipes and redirection behave as before. Every
+command runs in its own thread with its own argv and stdio, so commands in the
+same pipeline run concurrently. The command is tracked in a context variable;
+the scripts hand it on to their worker pools with daemon.propagate().
+
+Commands run in-process instead (with the same result) when the daemon cannot
+be reached, when the Jira settings or .env changed since the daemon started,
+or when a --profile flag is given, since a profile should measure one command.
+The same goes for settings whose report is printed by an atexit hook (such as
+JIRA_PROJECTION_REPORT): those hooks never run for a command the daemon serves.
+
+This module only uses the standard library so that forwarding stays cheap.
+
+Settings (environment or .env):
+    JIRA_DAEMON              set to 1 to forward the scripts to the daemon
+    JIRA_DAEMON_SOCKET       socket path (default ~/.cache/jira-extractor/daemon.sock)
+    JIRA_DAEMON_IDLE_TIMEOUT seconds without commands before the daemon exits (default 900)
+
+Usage:
+    python daemon.py {serve,stop,status}
+
+Example:
+    export JIRA_DAEMON=1
+    python my_todos.py 69 | xargs python create_mirror.py -b EXMP
+    python daemon.py stop
+"""
+
+import argparse
+import contextvars
+import importlib
+import io
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_FILE = os.path.join(REPO_DIR, ".env")
+
+# Scripts the daemon can run, by module name
+SCRIPTS = ["burndown", "create_mirror", "extract", "hierarchy", "my_todos", "show_description", "sync_due_dates"]
+
+# Settings reported from atexit hooks; commands run in-process while one is set
+AT_EXIT_SETTINGS = ["JIRA_PROJECTION_REPORT"]
+
+# Frame types; every frame is a type byte, a 4-byte length and the payload
+REQUEST = b"R"
+STDIN = b"I"  # An empty payload closes stdin
+STDOUT = b"O"
+STDERR = b"E"
+EXIT = b"X"
+ACCEPT = b"A"  # The daemon takes the command; the client starts sending stdin
+FALLBACK = b"F"  # The daemon declines; the client runs the command itself
+
+START_TIMEOUT = 10
+CHUNK_SIZE = 65536
+
+def _dotenv_value(name):
+    """Read one setting from the repository's .env without importing dotenv."""
+    try:
+        with open(ENV_FILE) as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and key.strip() == name:
+                    return value.strip().strip("'\"")
+    except OSError:
+        pass
+    return None
+
+def _setting(name, default=None):
+    value = os.getenv(name)
+    if value is None:
+        value = _dotenv_value(name)
+    return default if value is None else value
+
+SOCKET_PATH = os.path.expanduser(_setting("JIRA_DAEMON_SOCKET", "~/.cache/jira-extractor/daemon.sock"))
+IDLE_TIMEOUT = float(_setting("JIRA_DAEMON_IDLE_TIMEOUT", "900"))
+
+def _fingerprint():
+    """Identify the settings a daemon was started with: JIRA_* variables and the .env file."""
+    env = {k: v for k, v in os.environ.items() if k.startswith("JIRA_") and not k.startswith("JIRA_DAEMON")}
+    try:
+        env_mtime = os.stat(ENV_FILE).st_mtime
+    except OSError:
+        env_mtime = None
+    return {"env": env, "env_file": env_mtime}
+
+def send_frame(sock, kind, payload=b""):
+    sock.sendall(kind + struct.pack(">I", len(payload)) + payload)
+
+def _recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("Connection closed")
+        data += chunk
+    return data
+
+def recv_frame(sock):
+    header = _recv_exact(sock, 5)
+    (size,) = struct.unpack(">I", header[1:])
+    return header[:1], _recv_exact(sock, size)
+
+# ---------------------------------------------------------------------------
+# Client side
+
+def _connect():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def _start_daemon():
+    """Start the daemon in the background and wait for its socket."""
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve"],
+        cwd=REPO_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        sock = _connect()
+        if sock:
+            return sock
+        time.sleep(0.05)
+    return None
+
+def _pump_stdin(sock):
+    """Forward our stdin to the daemon until EOF."""
+    try:
+        if not sys.stdin.isatty():
+            while True:
+                chunk = os.read(sys.stdin.fileno(), CHUNK_SIZE)
+                if not chunk:
+                    break
+                send_frame(sock, STDIN, chunk)
+        send_frame(sock, STDIN)
+    except (OSError, ValueError):
+        pass  # The command finished (or stdin is closed) before we were done
+
+def forward(name, path):
+    """Run this script in the daemon when JIRA_DAEMON is set; exits with its code.
+
+    Called at the top of each script, before the heavy imports. Returns (so the
+    script runs normally) when the script was imported rather than run, when
+    the daemon is off, or when it cannot take the command.
+    """
+    if name != "__main__" or _setting("JIRA_DAEMON", "") in ("", "0"):
+        return
+    if any(arg.startswith("--profile") for arg in sys.argv[1:]):
+        return
+    if any(_setting(setting, "") not in ("", "0") for setting in AT_EXIT_SETTINGS):
+        return
+    script = os.path.splitext(os.path.basename(path))[0]
+    if script not in SCRIPTS:
+        return
+
+    sock = _connect() or _start_daemon()
+    if not sock:
+        return
+    with sock:
+        request = {"script": script, "argv": sys.argv[1:], "cwd": os.getcwd(), "settings": _fingerprint()}
+        try:
+            send_frame(sock, REQUEST, json.dumps(request).encode())
+            kind, _ = recv_frame(sock)
+        except (EOFError, OSError):
+            return
+        if kind != ACCEPT:
+            return
+        threading.Thread(target=_pump_stdin, args=(sock,), daemon=True).start()
+
+        try:
+            while True:
+                kind, payload = recv_frame(sock)
+                if kind == STDOUT:
+                    sys.stdout.buffer.write(payload)
+                    sys.stdout.buffer.flush()
+                elif kind == STDERR:
+                    sys.stderr.buffer.write(payload)
+                    sys.stderr.buffer.flush()
+                elif kind == EXIT:
+                    os._exit(json.loads(payload))  # Don't wait for the stdin thread
+        except EOFError:
+            print("Lost the connection to the daemon", file=sys.stderr)
+            os._exit(1)
+        except BrokenPipeError:
+            os._exit(1)
+
+# ---------------------------------------------------------------------------
+# Daemon side
+
+_command = contextvars.ContextVar("jira_command", default=None)
+
+def current_command():
+    """Return the state (streams, argv, ...) of the daemon command being served, or None.
+
+    A dict that modules may keep per-command state in. Worker threads only see
+    their command when their work was wrapped with propagate().
+    """
+    return _command.get()
+
+def propagate(fn):
+    """Wrap fn to run in a copy of the caller's context, for work handed to another thread.
+
+    In the daemon this keeps a command's worker threads on its stdio and state;
+    elsewhere it changes nothing.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+class _CommandStream:
+    """Stands in for sys.stdin/stdout/stderr, routing each command's threads to its stream."""
+
+    def __init__(self, name, default):
+        self._name = name
+        self._default = default
+
+    def _stream(self):
+        command = current_command()
+        return command[self._name] if command else self._default
+
+    def __getattr__(self, attr):
+        return getattr(self._stream(), attr)
+
+    # Special methods are looked up on the type, not through __getattr__
+    def __iter__(self):
+        return iter(self._stream())
+
+    def __next__(self):
+        return next(self._stream())
+
+class _CommandArgv(list):
+    """Stands in for sys.argv, so argparse sees each command's own arguments."""
+
+    def _current(self):
+        command = current_command()
+        return command["argv"] if command else list(list.__iter__(self))
+
+    def __getitem__(self, index):
+        return self._current()[index]
+
+    def __len__(self):
+        return len(self._current())
+
+    def __iter__(self):
+        return iter(self._current())
+
+class _FrameWriter(io.RawIOBase):
+    """A writable stream that sends everything written as frames of one type."""
+
+    def __init__(self, sock, kind, lock):
+        self._sock = sock
+        self._kind = kind
+        self._lock = lock
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        with self._lock:
+            send_frame(self._sock, self._kind, bytes(data))
+        return len(data)
+
+class _CwdGate:
+    """Lets commands from the same directory run together; others wait their turn.
+
+    The working directory is process-wide, so it can only change when no
+    command is running.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._cwd = os.getcwd()
+        self._users = 0
+
+    def enter(self, cwd):
+        with self._condition:
+            while self._users and cwd != self._cwd:
+                self._condition.wait()
+            if cwd != self._cwd:
+                os.chdir(cwd)
+                self._cwd = cwd
+            self._users += 1
+
+    def leave(self):
+        with self._condition:
+            self._users -= 1
+            self._condition.notify_all()
+
+class Daemon:
+    def __init__(self):
+        self.settings = _fingerprint()
+        self.cwd_gate = _CwdGate()
+        self.active = 0
+        self.last_used = time.time()
+        self.lock = threading.Lock()
+        self.listener = None
+
+    def install(self):
+        """Route stdio and argv per command, then load the scripts and their warm state."""
+        sys.stdin = _CommandStream("stdin", sys.stdin)
+        sys.stdout = _CommandStream("stdout", sys.stdout)
+        sys.stderr = _CommandStream("stderr", sys.stderr)
+        sys.argv = _CommandArgv(sys.argv)
+        for script in SCRIPTS:
+            importlib.import_module(script)
+
+    def run_command(self, sock, request):
+        """Run one script's main() with the client's argv and stdio; return its exit code."""
+        write_lock = threading.Lock()
+        stdout = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(sock, STDOUT, write_lock)),
+                                  encoding="utf-8", line_buffering=True)
+        stderr = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(sock, STDERR, write_lock)),
+                                  encoding="utf-8", line_buffering=True)
+        read_fd, write_fd = os.pipe()
+        stdin = open(read_fd, encoding="utf-8")
+        threading.Thread(target=self.feed_stdin, args=(sock, write_fd), daemon=True).start()
+
+        token = _command.set({
+            "stdin": stdin,
+            "stdout": stdout,
+            "stderr": stderr,
+            "argv": [request["script"] + ".py"] + request["argv"],
+            "issue_memo": {},  # The command's own issue_cache run memo
+        })
+        self.cwd_gate.enter(request["cwd"])
+        code = 0
+        try:
+            importlib.import_module(request["script"]).main()
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=stderr)
+                code = 1
+            else:
+                code = e.code or 0
+        except BrokenPipeError:
+            code = 1
+        except Exception:
+            traceback.print_exc(file=stderr)
+            code = 1
+        finally:
+            self.cwd_gate.leave()
+            for stream in (stdout, stderr):
+                try:
+                    stream.flush()
+                except OSError:
+                    pass
+            stdin.close()
+            _command.reset(token)
+        return code
+
+    def feed_stdin(self, sock, write_fd):
+        """Copy the client's stdin frames into the command's stdin pipe."""
+        with open(write_fd, "wb") as pipe:
+            try:
+                while True:
+                    kind, payload = recv_frame(sock)
+                    if kind != STDIN or not payload:
+                        break
+                    pipe.write(payload)
+                    pipe.flush()
+            except (EOFError, OSError):
+                pass
+
+    def handle(self, sock):
+        with self.lock:
+            self.active += 1
+        try:
+            kind, payload = recv_frame(sock)
+            request = json.loads(payload)
+            if request.get("command") == "stop":
+                send_frame(sock, EXIT, b"0")
+                self.listener.close()
+                os._exit(0)
+            if request.get("command") == "status":
+                status = {"pid": os.getpid(), "socket": SOCKET_PATH, "running_commands": self.active - 1,
+                          "idle_seconds": round(time.time() - self.last_used)}
+                send_frame(sock, STDOUT, (json.dumps(status, indent=2) + "\n").encode())
+                send_frame(sock, EXIT, b"0")
+                return
+            if request.get("settings") != self.settings or request.get("script") not in SCRIPTS:
+                send_frame(sock, FALLBACK)
+                return
+            send_frame(sock, ACCEPT)
+            code = self.run_command(sock, request)
+            send_frame(sock, EXIT, json.dumps(code).encode())
+        except (EOFError, OSError, ValueError):
+            pass  # The client went away
+        finally:
+            sock.close()
+            with self.lock:
+                self.active -= 1
+                self.last_used = time.time()
+
+    def watch_idle(self):
+        while True:
+            time.sleep(min(IDLE_TIMEOUT, 30))
+            with self.lock:
+                if not self.active and time.time() - self.last_used > IDLE_TIMEOUT:
+                    self.listener.close()
+                    os._exit(0)
+
+    def serve(self):
+        os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+        existing = _connect()
+        if existing:
+            existing.close()
+            return  # Another daemon is already serving
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)  # Left behind by a daemon that died
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Create the socket owner-only, so no other local user can connect to it
+        # before its mode is set (no command threads are running yet)
+        umask = os.umask(0o177)
+        try:
+            self.listener.bind(SOCKET_PATH)
+        finally:
+            os.umask(umask)
+        self.listener.listen(64)
+        threading.Thread(target=self.watch_idle, daemon=True).start()
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.handle, args=(sock,), daemon=True).start()
+
+def serve():
+    """Run the daemon in the foreground."""
+    # The scripts must run here, not be forwarded back to us
+    os.environ.pop("JIRA_DAEMON", None)
+    sys.path.insert(0, REPO_DIR)
+    daemon = Daemon()
+    daemon.install()
+    daemon.serve()
+
+def _control(command):
+    sock = _connect()
+    if not sock:
+        print("Daemon is not running")
+        return 1
+    with sock:
+        send_frame(sock, REQUEST, json.dumps({"command": command}).encode())
+        while True:
+            kind, payload = recv_frame(sock)
+            if kind == STDOUT:
+                sys.stdout.write(payload.decode())
+            elif kind == EXIT:
+                return json.loads(payload)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run or control the warm daemon used when JIRA_DAEMON=1.')
+    parser.add_argument('command', choices=['serve', 'stop', 'status'])
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve()
+    else:
+        sys.exit(_control(args.command))
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,493 @@
-import requests
-from requests.auth import HTTPBasicAuth
-from collections import defaultdict
-from dotenv import load_dotenv
-import os
+"""
+Extract Script
+
+Lists the tickets of a sprint (subtasks instead of their parents) and totals
+their story points by status.
+
+With --incremental, the sprint's tickets are kept in a local store
+(sprint_store.py). The first run extracts the whole sprint; later runs only
+fetch the issues updated since the previous run and compute the totals from
+the stored rows. Issues that left the sprint are found among the stored ones
+updated since then; the sprint's whole membership is only re-checked once a
+day, for issues deleted outright.
+
+Several sprints, or every sprint of one or more boards within a date range,
+can be rolled up in one run. They are extracted in parallel by a pool of
+workers sharing the client's connection pool, and their per-status story
+point totals are merged.
+
+With --hierarchy, the whole hierarchy below the sprint's top-level issues is
+walked (see hierarchy.py), so the children of child issues and the stories of
+an epic in the sprint are counted too, each level fetched in batched searches.
+As with subtasks, an issue's children are counted in its place, and the story
+points are also rolled up by epic.
+
+With --export, the tickets of every selected sprint are written to a columnar
+file (Parquet/Arrow with pyarrow installed, CSV otherwise) with their sprint,
+status, issue type, assignee, epic and story points, for slicing with
+analytics.py.
+
+Issues are read into compact records holding only the fields used here,
+built while each page is still streaming in (see issue_records.py), so large
+sprints and rollups don't keep Jira's full JSON trees in memory.
+
+Usage:
+    python extract.py [--sprint SPRINT_ID [SPRINT_ID ...]] [--incremental | --hierarchy]
+    python extract.py --board BOARD_ID [BOARD_ID ...] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
 
-# Load environment variables from .env file
-load_dotenv()
+Example:
+    python extract.py --sprint 750
+    python extract.py --sprint 750 --incremental
+    python extract.py --sprint 750 --hierarchy
+    python extract.py --sprint 750 751 752
+    python extract.py --board 69 90 --from 2026-07-01 --to 2026-09-30
+    python extract.py --board 69 --from 2026-01-01 --export tickets.parquet
+"""
 
-# Jira API details
-JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
-SPRINT_ID = "750"  # Replace with your board ID
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
+import argparse
+import time
+from datetime import date
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import hierarchy
+import instrumentation
+import jira_client
+from issue_records import IssueRecord
+from jira_client import AGILE_API_URL, POOL_SIZE, SEARCH_BATCH_SIZE, get_issues_by_keys
+import sprint_store
+
+SPRINT_ID = "750"  # Replace with your sprint ID
 MAX_RESULTS = 50
 
-# URLs
-SPRINT_ISSUES_URL = f"https://{JIRA_DOMAIN}/rest/agile/1.0/sprint/{SPRINT_ID}/issue?maxResults={MAX_RESULTS}"
-ISSUE_DETAILS_URL = f"https://{JIRA_DOMAIN}/rest/api/2/issue"
+# Fields requested from Jira; everything else is left out of the responses
+SUBTASK_FIELDS = ["summary", "status", "customfield_10016"]
+SPRINT_ISSUE_FIELDS = ["summary", "status", "customfield_10016", "subtasks", "parent"]
+# Extra fields for --export
+EXPORT_FIELDS = ["issuetype", "assignee"]
+
+# Extra minutes added to each delta query so clock skew can't drop an update
+SYNC_OVERLAP_MINUTES = 5
 
-# Headers
-HEADERS = {
-    "Accept": "application/json"
-}
+# Hours between full checks of a sprint's membership, which catch issues deleted from Jira
+FULL_SCAN_HOURS = 24
 
-AUTH = HTTPBasicAuth(os.getenv('JIRA_EMAIL'), os.getenv("JIRA_API_TOKEN"))
+# Sprints extracted at the same time in a rollup; capped by the connection pool
+SPRINT_WORKERS = 4
 
-def get_issue_details(issue_key):
-    """Fetch detailed information for an issue by its key."""
-    url = f"{ISSUE_DETAILS_URL}/{issue_key}"
-    response = requests.get(url, headers=HEADERS, auth=AUTH)
-    if response.status_code == 200:
-        return response.json()
+def get_sprint_page(sprint_id, start_at, fields=SPRINT_ISSUE_FIELDS):
+    """Fetch one page of sprint issues starting at the given offset."""
+    url = f"{AGILE_API_URL}/sprint/{sprint_id}/issue"
+    params = {
+        "startAt": start_at,
+        "maxResults": MAX_RESULTS,
+        "fields": ",".join(fields)
+    }
+    response = jira_client.get(url, params=params, stream=True)
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"Failed to retrieve issues. Status code: {response.status_code}\n"
+            f"Error message: {response.text}"
+        )
+    return jira_client.read_issue_page(response, IssueRecord.from_issue)
+
+def iter_sprint_pages(sprint_id, fields=SPRINT_ISSUE_FIELDS):
+    """Yield the sprint's issues page by page, following startAt/total.
+
+    The next page is requested in the background while the caller is still
+    working on the current one, so only two pages are ever held in memory.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        get_page = daemon.propagate(get_sprint_page)
+        pending = executor.submit(get_page, sprint_id, 0, fields)
+        while pending is not None:
+            page = pending.result()
+            issues = page.get("issues", [])
+            next_start = page.get("startAt", 0) + len(issues)
+            if issues and next_start < page.get("total", 0):
+                pending = executor.submit(get_page, sprint_id, next_start, fields)
+            else:
+                pending = None
+            yield issues
+
+def resolve_subtasks(issues, fields=SUBTASK_FIELDS):
+    """Fetch every subtask referenced by a page of issues in as few searches as possible."""
+    subtask_keys = [key for issue in issues for key in issue.subtask_keys]
+    if not subtask_keys:
+        return {}
+    return get_issues_by_keys(subtask_keys, fields, IssueRecord.from_issue)
+
+def ticket_row(record, epic):
+    """The row for one final ticket; issue type and assignee are only set when fetched (see EXPORT_FIELDS)."""
+    return {
+        "key": record.key,
+        "summary": record.summary,
+        "status": record.status,
+        "story_points": record.story_points,
+        "epic": epic,
+        "issue_type": record.issue_type,
+        "assignee": record.assignee,
+    }
+
+def process_issue(issue, subtask_details_by_key):
+    """Yield the final tickets for a sprint issue: its subtasks, or the issue itself."""
+    # Check if there are subtasks
+    if issue.subtask_keys:
+        for subtask_key in issue.subtask_keys:
+            subtask_details = subtask_details_by_key.get(subtask_key)
+            if subtask_details:
+                # Subtasks belong to the epic of their parent
+                yield ticket_row(subtask_details, issue.epic_key)
     else:
-        print(f"Failed to fetch details for issue {issue_key}. Status code: {response.status_code}")
-        return None
-
-try:
-    # Fetch issues in the sprint
-    response = requests.get(
-        SPRINT_ISSUES_URL,
-        headers=HEADERS,
-        auth=AUTH
-    )
-
-    if response.status_code == 200:
-        issues = response.json()
-        print("Issues retrieved successfully!")
-        
-        final_tickets = []
-        story_points_by_status = defaultdict(float)  # Initialize defaultdict for story points aggregation
-
-        for issue in issues.get("issues", []):
-            # Get normal ticket information
-            story_points = issue["fields"].get("customfield_10016", 0)  # Adjust field ID for story points
-            status = issue["fields"]["status"]["name"]
-
-            # Check if there are subtasks
-            subtasks = issue["fields"].get("subtasks", [])
-            if subtasks:
-                for subtask in subtasks:
-                    # Fetch detailed information for the subtask
-                    subtask_details = get_issue_details(subtask["key"])
-                    if subtask_details:
-                        subtask_points = subtask_details["fields"].get("customfield_10016", 0)
-                        subtask_status = subtask_details["fields"]["status"]["name"]
-                        if subtask_points:
-                            story_points_by_status[subtask_status] += subtask_points
-
-                        # Add subtasks to final tickets
-                        final_tickets.append({
-                            "key": subtask["key"],
-                            "summary": subtask_details["fields"]["summary"]
-                        })
+        # Add the normal ticket to final tickets
+        yield ticket_row(issue, issue.epic_key)
+
+def collect_hierarchy_tickets(sprint_id):
+    """Return the final tickets at every depth below the sprint's top-level issues.
+
+    Each ticket belongs to the epic of its top-level issue (or is in that epic,
+    when the top-level issue is an epic itself).
+    """
+    issues = [
+        issue
+        for page in jira_client.iter_search(f"sprint = {sprint_id}", hierarchy.HIERARCHY_FIELDS)
+        for issue in page
+    ]
+    sprint_keys = {issue["key"] for issue in issues}
+    # Subtasks and child issues in the sprint are reached from their parents
+    roots = [issue for issue in issues if (issue["fields"].get("parent") or {}).get("key") not in sprint_keys]
+    nodes, root_keys = hierarchy.walk_below(roots)
+
+    tickets = []
+    for root_key in root_keys:
+        root = IssueRecord.from_issue(nodes[root_key]["issue"])
+        epic = root.key if root.issue_type == "Epic" else root.epic_key
+        pending = [root_key]
+        while pending:
+            key = pending.pop()
+            children = nodes[key]["children"]
+            if children:
+                pending.extend(reversed(children))
             else:
-                # Add story points for the normal ticket
-                if story_points:
-                    story_points_by_status[status] += story_points
+                tickets.append(ticket_row(IssueRecord.from_issue(nodes[key]["issue"]), epic))
+    return tickets
+
+def print_story_points(story_points_by_status):
+    """Print the total story points by status."""
+    print("\nStory Points by Status:")
+    for status, total_points in story_points_by_status.items():
+        print(f"- {status}: {total_points} story points")
+
+def print_story_points_by_epic(tickets):
+    """Print the story points of the tickets rolled up by epic."""
+    story_points_by_epic = defaultdict(float)
+    for ticket in tickets:
+        story_points_by_epic[ticket["epic"] or "No epic"] += ticket["story_points"] or 0
+    print("\nStory Points by Epic:")
+    for epic, total_points in story_points_by_epic.items():
+        print(f"- {epic}: {total_points} story points")
+
+def extract_sprint_hierarchy(sprint_id):
+    """Print the final tickets of the sprint's whole hierarchy, then the story point totals."""
+    tickets = collect_hierarchy_tickets(sprint_id)
+    story_points_by_status = defaultdict(float)
+    print(f"Walked the hierarchy: {len(tickets)} tickets")
+    print("Tickets:")
+    for ticket in tickets:
+        if ticket["story_points"]:
+            story_points_by_status[ticket["status"]] += ticket["story_points"]
+        print(f"- {ticket['key']}: {ticket['summary']}")
+
+    print_story_points(story_points_by_status)
+    print_story_points_by_epic(tickets)
+
+def extract_sprint(sprint_id):
+    """Print the sprint's tickets as they arrive, then the story point totals."""
+    story_points_by_status = defaultdict(float)  # Initialize defaultdict for story points aggregation
+
+    for page_number, issues in enumerate(iter_sprint_pages(sprint_id)):
+        if page_number == 0:
+            print("Issues retrieved successfully!")
+            # Print the processed tickets as each page arrives
+            print("Tickets and Subtasks:")
+
+        subtask_details_by_key = resolve_subtasks(issues)
+        for issue in issues:
+            for ticket in process_issue(issue, subtask_details_by_key):
+                if ticket["story_points"]:
+                    story_points_by_status[ticket["status"]] += ticket["story_points"]
+                print(f"- {ticket['key']}: {ticket['summary']}")
+
+    print_story_points(story_points_by_status)
 
-                # Add the normal ticket to final tickets
-                final_tickets.append({
-                    "key": issue["key"],
-                    "summary": issue["fields"]["summary"]
-                })
+def updated_since(since):
+    """JQL clause for issues updated since the given Unix timestamp."""
+    # A relative JQL date avoids any dependency on the Jira user's time zone
+    minutes = int((time.time() - since) // 60) + SYNC_OVERLAP_MINUTES
+    return f"updated >= -{minutes}m"
+
+def iter_changed_pages(sprint_id, since):
+    """Yield pages of sprint issues updated since the given Unix timestamp."""
+    jql = f"sprint = {sprint_id} AND {updated_since(since)}"
+    yield from jira_client.iter_search(jql, SPRINT_ISSUE_FIELDS, convert=IssueRecord.from_issue)
+
+def search_keys(keys, jql):
+    """Return which of the keys match the JQL, in batched key searches."""
+    keys = sorted(keys)
+    found = set()
+    for i in range(0, len(keys), SEARCH_BATCH_SIZE):
+        chunk = keys[i:i + SEARCH_BATCH_SIZE]
+        query = f"key in ({', '.join(chunk)}) AND {jql}"
+        for issues in jira_client.iter_search(query, ["key"], convert=IssueRecord.from_issue):
+            found.update(issue.key for issue in issues)
+    return found
+
+def find_removed_issues(db, sprint_id, candidates, since):
+    """Return the stored sprint issues among the candidates that have left the sprint.
+
+    Moving an issue out of a sprint updates it, so only the candidates updated
+    since the last sync are looked up. Issues deleted from Jira can't be found
+    that way, so every FULL_SCAN_HOURS the sprint's whole membership is checked.
+    """
+    last_full_scan = sprint_store.get_last_full_scan(db, sprint_id)
+    if last_full_scan is None or time.time() - last_full_scan >= FULL_SCAN_HOURS * 3600:
+        started = time.time()
+        current_keys = {
+            issue.key
+            for issues in jira_client.iter_search(f"sprint = {sprint_id}", ["key"], convert=IssueRecord.from_issue)
+            for issue in issues
+        }
+        sprint_store.set_last_full_scan(db, sprint_id, started)
+        return candidates - current_keys
+
+    changed = search_keys(candidates, updated_since(since))
+    if not changed:
+        return set()
+    # Issues updated after the delta query ran may still be in the sprint
+    return changed - search_keys(changed, f"sprint = {sprint_id}")
+
+def sync_sprint(db, sprint_id):
+    """Bring the stored copy of the sprint up to date, returning the number of issues refreshed."""
+    last_sync = sprint_store.get_last_sync(db, sprint_id)
+    started = time.time()
+    if last_sync is None:
+        print(f"No local copy of sprint {sprint_id} yet, extracting all issues...")
+        pages = iter_sprint_pages(sprint_id)
+    else:
+        pages = iter_changed_pages(sprint_id, last_sync)
+
+    stored_keys = sprint_store.stored_issue_keys(db, sprint_id)
+    seen_keys = set()
+    refreshed = 0
+    for issues in pages:
+        # A changed subtask also changes the rows derived from its parent
+        page_keys = {issue.key for issue in issues}
+        seen_keys |= page_keys
+        parent_keys = {issue.parent_key for issue in issues if issue.parent_key}
+        parent_keys = (parent_keys & stored_keys) - page_keys
+        if parent_keys:
+            parents = get_issues_by_keys(parent_keys, SPRINT_ISSUE_FIELDS, IssueRecord.from_issue)
+            issues = issues + list(parents.values())
+
+        subtask_details_by_key = resolve_subtasks(issues)
+        for issue in issues:
+            tickets = list(process_issue(issue, subtask_details_by_key))
+            sprint_store.replace_tickets(db, sprint_id, issue.key, tickets)
+        refreshed += len(issues)
+
+    if last_sync is None:
+        sprint_store.set_last_full_scan(db, sprint_id, started)
+    else:
+        # Issues moved out of the sprint no longer match the delta query
+        removed = find_removed_issues(db, sprint_id, stored_keys - seen_keys, last_sync)
+        if removed:
+            sprint_store.remove_issues(db, sprint_id, removed)
+            print(f"Removed {len(removed)} issues that left the sprint")
+
+    sprint_store.set_last_sync(db, sprint_id, started)
+    return refreshed
+
+def extract_sprint_incremental(sprint_id):
+    """Sync the local copy of the sprint and report from the stored rows."""
+    db = sprint_store.connect()
+    try:
+        refreshed = sync_sprint(db, sprint_id)
+        print(f"Refreshed {refreshed} issues.")
 
-        # Print the processed tickets
         print("Tickets and Subtasks:")
-        for ticket in final_tickets:
+        for ticket in sprint_store.get_tickets(db, sprint_id):
             print(f"- {ticket['key']}: {ticket['summary']}")
 
-        # Print the total story points by status
-        print("\nStory Points by Status:")
-        for status, total_points in story_points_by_status.items():
-            print(f"- {status}: {total_points} story points")
+        print_story_points(sprint_store.story_points_by_status(db, sprint_id))
+    finally:
+        db.close()
 
-    else:
-        print(f"Failed to retrieve issues. Status code: {response.status_code}")
-        print(f"Error message: {response.text}")
+def iter_board_sprints(board_id):
+    """Yield every sprint of a board, following the agile API's pagination."""
+    url = f"{AGILE_API_URL}/board/{board_id}/sprint"
+    start_at = 0
+    while True:
+        response = jira_client.get(url, params={"startAt": start_at, "maxResults": MAX_RESULTS})
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to retrieve sprints for board {board_id}. Status code: {response.status_code}\n"
+                f"Error message: {response.text}"
+            )
+        page = response.json()
+        sprints = page.get("values", [])
+        yield from sprints
+        start_at += len(sprints)
+        if page.get("isLast", True) or not sprints:
+            return
+
+def find_sprints(board_ids, date_from=None, date_to=None):
+    """Return the IDs of the boards' sprints that overlap the given date range."""
+    sprint_ids = []
+    for board_id in board_ids:
+        for sprint in iter_board_sprints(board_id):
+            # ISO timestamps compare correctly as strings at day granularity
+            start = (sprint.get("startDate") or "")[:10]
+            end = (sprint.get("completeDate") or sprint.get("endDate") or "")[:10]
+            if not start:
+                continue  # Future sprints that haven't been planned yet
+            if date_to and start > date_to:
+                continue
+            if date_from and end and end < date_from:
+                continue
+            sprint_ids.append(str(sprint["id"]))
+    return list(dict.fromkeys(sprint_ids))
+
+def collect_sprint_totals(sprint_id, incremental=False, walk_hierarchy=False):
+    """Return (ticket count, story points by status) for one sprint without printing tickets."""
+    if walk_hierarchy:
+        tickets = collect_hierarchy_tickets(sprint_id)
+        story_points_by_status = defaultdict(float)
+        for ticket in tickets:
+            if ticket["story_points"]:
+                story_points_by_status[ticket["status"]] += ticket["story_points"]
+        return len(tickets), story_points_by_status
+    if incremental:
+        db = sprint_store.connect()
+        try:
+            sync_sprint(db, sprint_id)
+            return len(sprint_store.get_tickets(db, sprint_id)), sprint_store.story_points_by_status(db, sprint_id)
+        finally:
+            db.close()
+
+    ticket_count = 0
+    story_points_by_status = defaultdict(float)
+    for issues in iter_sprint_pages(sprint_id):
+        subtask_details_by_key = resolve_subtasks(issues)
+        for issue in issues:
+            for ticket in process_issue(issue, subtask_details_by_key):
+                ticket_count += 1
+                if ticket["story_points"]:
+                    story_points_by_status[ticket["status"]] += ticket["story_points"]
+    return ticket_count, story_points_by_status
+
+def extract_sprints(sprint_ids, incremental=False, workers=SPRINT_WORKERS, walk_hierarchy=False):
+    """Extract several sprints in parallel and print their merged story point totals."""
+    # Each sprint also prefetches its next page, so leave room in the pool for that
+    workers = max(1, min(workers, len(sprint_ids), POOL_SIZE // 2))
+    print(f"Extracting {len(sprint_ids)} sprints with {workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(daemon.propagate(
+            lambda sprint_id: collect_sprint_totals(sprint_id, incremental, walk_hierarchy)
+        ), sprint_ids))
+
+    merged = defaultdict(float)
+    print("\nTickets by Sprint:")
+    for sprint_id, (ticket_count, story_points_by_status) in zip(sprint_ids, results):
+        total_points = sum(story_points_by_status.values())
+        print(f"- Sprint {sprint_id}: {ticket_count} tickets, {total_points} story points")
+        for status, points in story_points_by_status.items():
+            merged[status] += points
+
+    print_story_points(merged)
+
+def collect_sprint_rows(sprint_id):
+    """Return the sprint's tickets with the extra details the export needs."""
+    rows = []
+    for issues in iter_sprint_pages(sprint_id, SPRINT_ISSUE_FIELDS + EXPORT_FIELDS):
+        subtask_details_by_key = resolve_subtasks(issues, SUBTASK_FIELDS + EXPORT_FIELDS)
+        for issue in issues:
+            for ticket in process_issue(issue, subtask_details_by_key):
+                ticket["sprint_id"] = sprint_id
+                rows.append(ticket)
+    return rows
+
+def export_sprints(sprint_ids, path, workers=SPRINT_WORKERS):
+    """Write the tickets of the sprints to a columnar file and print their story point totals."""
+    import analytics  # Only exports need it (and the pyarrow import it tries)
+    workers = max(1, min(workers, len(sprint_ids), POOL_SIZE // 2))
+    print(f"Exporting {len(sprint_ids)} sprints with {workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = [row for sprint_rows in executor.map(daemon.propagate(collect_sprint_rows), sprint_ids) for row in sprint_rows]
+
+    table = analytics.to_table(rows)
+    path = analytics.write_table(table, path)
+    print(f"Wrote {len(rows)} tickets to {path}")
+    print_story_points({key[0]: points for key, _, points in analytics.group_by(table, ["status"])})
+
+def iso_date(value):
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+def main():
+    parser = argparse.ArgumentParser(description='List sprint tickets and total their story points by status.')
+    parser.add_argument('-s', '--sprint', nargs='+', default=[SPRINT_ID],
+                        help=f'One or more sprint IDs (default {SPRINT_ID})')
+    parser.add_argument('-b', '--board', nargs='+',
+                        help='Roll up every sprint of these boards instead of listing sprint IDs')
+    parser.add_argument('--from', dest='date_from', type=iso_date, help='With --board, skip sprints that ended before this date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=iso_date, help='With --board, skip sprints that started after this date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=SPRINT_WORKERS,
+                        help=f'Sprints extracted in parallel in a rollup (default {SPRINT_WORKERS})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep a local copy of the sprint and only fetch issues updated since the last run')
+    parser.add_argument('--hierarchy', action='store_true',
+                        help="Count the tickets at every depth below the sprint's issues, and total them by epic")
+    parser.add_argument('--export', metavar='FILE',
+                        help='Write the tickets to FILE (.parquet or .arrow with pyarrow, else .csv) for analytics.py')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if args.export and args.incremental:
+        parser.error('--export always fetches the sprints in full and cannot be combined with --incremental')
+    if args.hierarchy and (args.export or args.incremental):
+        parser.error('--hierarchy cannot be combined with --export or --incremental')
+    if (args.date_from or args.date_to) and not args.board:
+        parser.error('--from and --to select sprints by date and need --board')
+    instrumentation.setup(args)
+
+    try:
+        if args.board:
+            sprint_ids = find_sprints(args.board, args.date_from, args.date_to)
+            if not sprint_ids:
+                print("No sprints found for the given boards and dates.")
+                return
+            if args.export:
+                export_sprints(sprint_ids, args.export, args.workers)
+            else:
+                extract_sprints(sprint_ids, args.incremental, args.workers, args.hierarchy)
+        elif args.export:
+            export_sprints(list(dict.fromkeys(args.sprint)), args.export, args.workers)
+        elif len(args.sprint) > 1:
+            extract_sprints(list(dict.fromkeys(args.sprint)), args.incremental, args.workers, args.hierarchy)
+        elif args.hierarchy:
+            extract_sprint_hierarchy(args.sprint[0])
+        elif args.incremental:
+            extract_sprint_incremental(args.sprint[0])
+        else:
+            extract_sprint(args.sprint[0])
+    except Exception as e:
+        print(f"An error occurred: {e}")
 
-except Exception as e:
-    print(f"An error occurred: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Hierarchy Script
+
+Walks the whole issue hierarchy below the given tickets (epic -> story ->
+subtask, or any deeper parent/child chain) and prints it as a tree with story
+points rolled up to every level.
+
+The walk is breadth-first: the roots are fetched in one batched search, then
+every level's children in `parent in (...)` searches covering up to 50 parents
+each, run concurrently. Round trips therefore grow with the depth of the tree,
+not with its number of issues. Every issue is visited once, even if it is
+reached through several roots.
+
+A parent's rolled-up story points are the sum of its children's, like
+extract.py counts subtasks in place of their parent; issues without children
+count their own points.
+
+`extract.py --hierarchy` uses the same walk below a sprint's top-level issues.
+
+Usage:
+    python hierarchy.py TICKET-123 [TICKET-456 ...] [--depth N]
+
+Example:
+    python hierarchy.py EXMP-10
+    python hierarchy.py EXMP-10 EXMP-11 --depth 1
+"""
+
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+import jira_client
+from jira_client import SEARCH_BATCH_SIZE, get_issues_by_keys
+
+HIERARCHY_FIELDS = ["summary", "status", "issuetype", "customfield_10016", "parent"]
+
+# Child searches of one level sent at the same time
+LEVEL_WORKERS = 4
+
+def fetch_children(parent_keys):
+    """Return every child issue of the given parents, in one search (plus its pages)."""
+    jql = f"parent in ({', '.join(parent_keys)}) ORDER BY key"
+    return [issue for issues in jira_client.iter_search(jql, HIERARCHY_FIELDS) for issue in issues]
+
+def walk(root_keys, max_depth=None):
+    """Fetch the hierarchy below the roots, one batched level at a time.
+
+    Returns (nodes, roots): nodes maps each visited key to
+    {"issue": ..., "children": [keys], "depth": n}, roots lists the root keys
+    that were found, in input order.
+    """
+    root_keys = list(dict.fromkeys(key.upper() for key in root_keys))
+    found = get_issues_by_keys(root_keys, HIERARCHY_FIELDS)
+    return walk_below([found[key] for key in root_keys if key in found], max_depth)
+
+def walk_below(root_issues, max_depth=None):
+    """Like walk(), for root issues that were already fetched with HIERARCHY_FIELDS."""
+    roots = [issue["key"] for issue in root_issues]
+    nodes = {issue["key"]: {"issue": issue, "children": [], "depth": 0} for issue in root_issues}
+
+    level = roots
+    depth = 0
+    while level and (max_depth is None or depth < max_depth):
+        depth += 1
+        chunks = [level[i:i + SEARCH_BATCH_SIZE] for i in range(0, len(level), SEARCH_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=LEVEL_WORKERS) as executor:
+            children = [issue for chunk in executor.map(daemon.propagate(fetch_children), chunks) for issue in chunk]
+
+        next_level = []
+        for child in children:
+            parent_key = (child["fields"].get("parent") or {}).get("key")
+            if child["key"] in nodes or parent_key not in nodes:
+                continue  # Already reached through another root
+            nodes[child["key"]] = {"issue": child, "children": [], "depth": depth}
+            nodes[parent_key]["children"].append(child["key"])
+            next_level.append(child["key"])
+        level = next_level
+    return nodes, roots
+
+def roll_up(nodes):
+    """Return {key: rolled-up story points} for every node, computed bottom-up."""
+    totals = {}
+    # Deepest nodes first, so every child is done before its parent
+    for key in sorted(nodes, key=lambda key: -nodes[key]["depth"]):
+        node = nodes[key]
+        if node["children"]:
+            totals[key] = sum(totals[child] for child in node["children"])
+        else:
+            totals[key] = node["issue"]["fields"].get("customfield_10016") or 0
+    return totals
+
+def print_tree(nodes, roots, totals):
+    """Print the hierarchy depth-first, indented by level."""
+    def print_node(key, indent):
+        fields = nodes[key]["issue"]["fields"]
+        issue_type = (fields.get("issuetype") or {}).get("name", "")
+        status = (fields.get("status") or {}).get("name", "")
+        print(f"{'  ' * indent}- {key} [{issue_type}, {status}]: {fields.get('summary')} ({totals[key]:g} story points)")
+        for child in nodes[key]["children"]:
+            print_node(child, indent + 1)
+
+    for root in roots:
+        print_node(root, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the issue hierarchy below tickets with rolled-up story points.')
+    parser.add_argument('tickets', nargs='+', help='Root ticket keys, e.g. epics')
+    parser.add_argument('--depth', type=int, help='Stop after this many levels below the roots')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup(args)
+
+    try:
+        nodes, roots = walk(args.tickets, args.depth)
+    except RuntimeError as e:
+        print(e)
+        return
+    if not roots:
+        print("None of the given tickets were found.")
+        return
+
+    totals = roll_up(nodes)
+    print_tree(nodes, roots, totals)
+    levels = max(node["depth"] for node in nodes.values()) + 1
+    print(f"\n{len(nodes)} issues on {levels} levels, "
+          f"{sum(totals[root] for root in roots):g} story points in total")
+
+if __name__ == "__main__":
+    main()
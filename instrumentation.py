@@ -0,0 +1,197 @@
+"""
+Request Instrumentation
+
+Records every HTTP call made through jira_client when profiling is enabled:
+endpoint template (issue keys and IDs replaced by placeholders), status,
+latency, retries and bytes sent/received. At exit the scripts can print a
+per-endpoint summary table, write it as JSON, and write a trace file in the
+Chrome trace event format, which chrome://tracing or https://ui.perfetto.dev
+show as a timeline with one lane per thread.
+
+Every script accepts the same flags (see add_arguments):
+    --profile             print the per-endpoint summary to stderr at exit
+    --profile-json FILE   write the summary as JSON
+    --profile-trace FILE  write a timeline trace of every request
+"""
+
+import atexit
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_enabled = False
+_endpoints = {}
+_trace = []
+_started = time.perf_counter()
+
+# The API version in front of a path is kept; only the numbers after it are IDs
+_API_PREFIX = re.compile(r"/rest/(?:api/\d+|agile/\d+\.\d+)")
+
+def endpoint_template(method, url):
+    """Turn a request URL into an endpoint template such as 'GET /rest/api/2/issue/{key}'."""
+    path = urlsplit(url).path
+    prefix = _API_PREFIX.match(path)
+    prefix = prefix.group() if prefix else ""
+    path = path[len(prefix):]
+    path = re.sub(r"/[A-Z][A-Z0-9_]*-\d+(?=/|$)", "/{key}", path)
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    return f"{method} {prefix}{path}"
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+def record(method, url, response, started, stream=False):
+    """Record one request attempt; a no-op unless profiling is enabled."""
+    if not _enabled:
+        return
+    finished = time.perf_counter()
+    latency = finished - started
+
+    # urllib3 retries (connection errors, 5xx) happen inside the adapter
+    retries = 0
+    raw_retries = getattr(response.raw, "retries", None)
+    if raw_retries is not None:
+        retries = len(raw_retries.history)
+    if response.status_code == 429:
+        retries += 1  # The scheduler sends this request again
+
+    bytes_out = _body_size(response.request.body)
+    # A streamed body hasn't been read yet (and may be chunked); see record_body()
+    bytes_in = 0 if stream else len(response.content)
+
+    template = endpoint_template(method, url)
+    with _lock:
+        entry = _endpoints.setdefault(template, {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "latencies": [],
+            "statuses": {},
+        })
+        entry["calls"] += 1
+        entry["errors"] += response.status_code >= 400
+        entry["retries"] += retries
+        entry["bytes_in"] += bytes_in
+        entry["bytes_out"] += bytes_out
+        entry["latencies"].append(latency)
+        status = str(response.status_code)
+        entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+        event = {
+            "name": template,
+            "cat": "http",
+            "ph": "X",
+            "ts": round((started - _started) * 1e6),
+            "dur": round(latency * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"status": response.status_code, "bytes_in": bytes_in, "bytes_out": bytes_out},
+        }
+        _trace.append(event)
+    if stream:
+        response._profile = (entry, event)
+
+def record_body(response, size):
+    """Count the bytes of a streamed response body once the caller has read them."""
+    profile = getattr(response, "_profile", None)
+    if profile is None:
+        return
+    entry, event = profile
+    with _lock:
+        entry["bytes_in"] += size
+        event["args"]["bytes_in"] += size
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summary():
+    """Return the per-endpoint summary as a JSON-serialisable dict."""
+    with _lock:
+        endpoints = {}
+        for template, entry in sorted(_endpoints.items()):
+            latencies = entry["latencies"]
+            counts = [0] * (len(LATENCY_BUCKETS) + 1)
+            for latency in latencies:
+                counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+            endpoints[template] = {
+                "calls": entry["calls"],
+                "errors": entry["errors"],
+                "retries": entry["retries"],
+                "statuses": entry["statuses"],
+                "bytes_in": entry["bytes_in"],
+                "bytes_out": entry["bytes_out"],
+                "latency_total": round(sum(latencies), 4),
+                "latency_p50": round(_percentile(latencies, 0.5), 4),
+                "latency_p95": round(_percentile(latencies, 0.95), 4),
+                "latency_max": round(max(latencies), 4),
+                "latency_histogram": dict(zip(labels, counts)),
+            }
+    return {"wall_time": round(time.perf_counter() - _started, 4), "endpoints": endpoints}
+
+def print_summary(data, stream=sys.stderr):
+    """Print the summary as a table, slowest endpoints (by total time) first."""
+    print(f"\nRequest profile ({data['wall_time']:.2f}s wall time):", file=stream)
+    header = f"{'endpoint':<48}{'calls':>7}{'errors':>7}{'retries':>8}{'total s':>9}{'p50 ms':>8}{'p95 ms':>8}{'KB out':>9}{'KB in':>9}"
+    print(header, file=stream)
+    print("-" * len(header), file=stream)
+    rows = sorted(data["endpoints"].items(), key=lambda item: -item[1]["latency_total"])
+    for template, e in rows:
+        print(f"{template[:47]:<48}{e['calls']:>7}{e['errors']:>7}{e['retries']:>8}{e['latency_total']:>9.2f}"
+              f"{e['latency_p50'] * 1000:>8.0f}{e['latency_p95'] * 1000:>8.0f}"
+              f"{e['bytes_out'] / 1024:>9.1f}{e['bytes_in'] / 1024:>9.1f}", file=stream)
+
+def write_trace(path):
+    """Write the recorded requests as a Chrome trace event file."""
+    with _lock:
+        events = list(_trace)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+def enable(show=True, json_path=None, trace_path=None):
+    """Start recording and report at exit."""
+    global _enabled
+    _enabled = True
+
+    def report():
+        data = summary()
+        if show:
+            print_summary(data)
+        if json_path:
+            with open(json_path, "w") as f:
+                json.dump(data, f, indent=2)
+        if trace_path:
+            write_trace(trace_path)
+
+    atexit.register(report)
+
+def add_arguments(parser):
+    """Add the --profile flags to a script's argument parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Print a per-endpoint request profile to stderr at exit')
+    parser.add_argument('--profile-json', metavar='FILE', help='Write the request profile as JSON')
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help='Write a Chrome trace event file of every request (chrome://tracing, Perfetto)')
+
+def setup(args):
+    """Enable profiling if any of the --profile flags was given."""
+    if args.profile or args.profile_json or args.profile_trace:
+        enable(show=args.profile, json_path=args.profile_json, trace_path=args.profile_trace)
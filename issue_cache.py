@@ -0,0 +1,285 @@
+"""
+Issue Cache
+
+Local SQLite cache of issue JSON keyed by issue key, shared by the scripts that
+read whole issues (create_mirror.py, sync_due_dates.py, show_description.py).
+
+Entries younger than JIRA_CACHE_TTL are served straight from disk. Older
+entries are revalidated with one lightweight search that only asks for the
+`updated` field; unchanged issues are then served locally and only the ones
+that actually changed are downloaded again. Within a single run every issue is
+fetched at most once, even when several code paths (or threads) ask for it.
+Records piped in from another script (see issue_stream.py) join that run memo.
+In the daemon every command has a run memo of its own, so concurrent commands
+neither see nor clear each other's issues.
+
+Callers say which fields they need. Only those fields (plus `updated`, for
+revalidation) are downloaded, and a cached entry is reused as long as it
+already holds every field asked for.
+
+Settings (environment or .env):
+    JIRA_CACHE_PATH         SQLite file (default ~/.cache/jira-extractor/issues.sqlite)
+    JIRA_CACHE_TTL          seconds an entry is trusted without revalidation (default 60)
+    JIRA_CACHE_MAX_AGE      seconds after which an entry is evicted (default 7 days)
+    JIRA_CACHE_MAX_ENTRIES  maximum number of cached issues (default 5000)
+    JIRA_CACHE_DISABLE      set to 1 to keep the cache in memory for this run only
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import daemon
+from jira_client import get_issue_details, get_issues_by_keys
+
+CACHE_PATH = os.path.expanduser(os.getenv("JIRA_CACHE_PATH", "~/.cache/jira-extractor/issues.sqlite"))
+CACHE_TTL = float(os.getenv("JIRA_CACHE_TTL", "60"))
+CACHE_MAX_AGE = float(os.getenv("JIRA_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("JIRA_CACHE_MAX_ENTRIES", "5000"))
+CACHE_ENABLED = os.getenv("JIRA_CACHE_DISABLE", "") in ("", "0")
+
+ALL_FIELDS = "*all"
+
+# Bump when the table layout changes; older caches are simply dropped
+SCHEMA_VERSION = 1
+
+_memo = {}  # Issue key -> (field set, issue) fetched or revalidated during this run
+_in_flight = {}  # Issue key -> (Event set once the fetching thread is done, its result)
+_lock = threading.Lock()
+_db = None
+
+def _connect():
+    """Open the cache database, creating it on first use."""
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        _db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        if _db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            _db.execute("DROP TABLE IF EXISTS issues")
+            _db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS issues ("
+            " key TEXT PRIMARY KEY,"
+            " fields TEXT NOT NULL,"
+            " updated TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        _db.commit()
+    return _db
+
+def _field_set(fields):
+    """Normalise a field list to a frozenset; None means every field."""
+    if not fields or ALL_FIELDS in fields:
+        return frozenset([ALL_FIELDS])
+    return frozenset(fields) | {"updated"}
+
+def _covers(cached_fields, wanted_fields):
+    return ALL_FIELDS in cached_fields or wanted_fields <= cached_fields
+
+def _load(issue_keys):
+    """Return {key: (field set, issue, updated, fetched_at)} for the cached keys."""
+    if not CACHE_ENABLED or not issue_keys:
+        return {}
+    with _lock:
+        db = _connect()
+        rows = []
+        for i in range(0, len(issue_keys), 500):
+            chunk = issue_keys[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows += db.execute(
+                f"SELECT key, fields, updated, fetched_at, data FROM issues WHERE key IN ({placeholders})",
+                chunk
+            ).fetchall()
+    return {
+        key: (frozenset(fields.split(",")), json.loads(data), updated, fetched_at)
+        for key, fields, updated, fetched_at, data in rows
+    }
+
+def _store(issues, field_set):
+    """Write freshly downloaded issues to the cache and evict old entries."""
+    if not CACHE_ENABLED or not issues:
+        return
+    now = time.time()
+    with _lock:
+        db = _connect()
+        db.executemany(
+            "INSERT OR REPLACE INTO issues (key, fields, updated, fetched_at, accessed_at, data)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (issue["key"], ",".join(sorted(field_set)), issue.get("fields", {}).get("updated"),
+                 now, now, json.dumps(issue))
+                for issue in issues
+            ]
+        )
+        _evict(db, now)
+        db.commit()
+
+def _touch(issue_keys, revalidated=False):
+    """Record that cached entries were used (and optionally confirmed fresh)."""
+    if not CACHE_ENABLED or not issue_keys:
+        return
+    now = time.time()
+    column = "fetched_at = ?, accessed_at = ?" if revalidated else "accessed_at = ?"
+    params = (now, now) if revalidated else (now,)
+    with _lock:
+        db = _connect()
+        db.executemany(f"UPDATE issues SET {column} WHERE key = ?", [params + (key,) for key in issue_keys])
+        db.commit()
+
+def _evict(db, now):
+    """Drop expired entries and trim the cache to CACHE_MAX_ENTRIES, least recently used first."""
+    db.execute("DELETE FROM issues WHERE fetched_at < ?", (now - CACHE_MAX_AGE,))
+    db.execute(
+        "DELETE FROM issues WHERE key NOT IN (SELECT key FROM issues ORDER BY accessed_at DESC LIMIT ?)",
+        (CACHE_MAX_ENTRIES,)
+    )
+
+def _run_memo():
+    """Return the memo of the current run: the daemon command's own, or the module's."""
+    command = daemon.current_command()
+    return _memo if command is None else command.setdefault("issue_memo", {})
+
+def invalidate(issue_key):
+    """Forget an issue after we changed it, so the next read goes back to Jira."""
+    with _lock:
+        _run_memo().pop(issue_key, None)
+        if CACHE_ENABLED:
+            db = _connect()
+            db.execute("DELETE FROM issues WHERE key = ?", (issue_key,))
+            db.commit()
+
+def remember(issues):
+    """Add issue records obtained elsewhere (e.g. piped in from another script) to the run memo.
+
+    A record is served for any request whose fields it holds; records without
+    fields are ignored.
+    """
+    with _lock:
+        memo = _run_memo()
+        for issue in issues:
+            fields = issue.get("fields")
+            if not fields:
+                continue
+            field_set = frozenset(fields)
+            known = memo.get(issue["key"])
+            if not known or not _covers(known[0], field_set):
+                memo[issue["key"]] = (field_set, issue)
+
+def forget_run():
+    """Forget the issues remembered during this run, e.g. between webhook batches."""
+    with _lock:
+        _run_memo().clear()
+
+def _download(issue_keys, field_set):
+    """Fetch issues from Jira: one GET for a single key, batched searches otherwise."""
+    fields = sorted(field_set)
+    if len(issue_keys) == 1:
+        issue = get_issue_details(issue_keys[0], None if ALL_FIELDS in field_set else fields)
+        return [issue] if issue else []
+    return list(get_issues_by_keys(issue_keys, fields).values())
+
+def _resolve(issue_keys, field_set):
+    """Serve keys from disk when they are still current, downloading the rest.
+
+    Returns {key: (field set, issue)}.
+    """
+    cached = _load(issue_keys)
+    now = time.time()
+    found = {}
+    fresh, stale = [], []
+    widen = {}  # Keys cached with too few fields -> the fields they already had
+    for key, (cached_fields, issue, updated, fetched_at) in cached.items():
+        if not _covers(cached_fields, field_set):
+            widen[key] = cached_fields
+        elif now - fetched_at < CACHE_TTL:
+            found[key] = (cached_fields, issue)
+            fresh.append(key)
+        else:
+            stale.append(key)
+    _touch(fresh)
+
+    if stale:
+        # Revalidate stale entries by comparing only their `updated` timestamps
+        current = get_issues_by_keys(stale, ["updated"])
+        unchanged = [
+            key for key in stale
+            if key in current and current[key]["fields"].get("updated") == cached[key][2]
+        ]
+        for key in unchanged:
+            found[key] = cached[key][:2]
+        _touch(unchanged, revalidated=True)
+
+    # Download what's missing, keeping any fields a cached entry already had
+    # so the entry keeps serving its earlier callers too
+    groups = {}
+    for key in issue_keys:
+        if key not in found:
+            groups.setdefault(_field_set(field_set | widen.get(key, frozenset())), []).append(key)
+    for group_fields, keys in groups.items():
+        downloaded = _download(keys, group_fields)
+        _store(downloaded, group_fields)
+        for issue in downloaded:
+            found[issue["key"]] = (group_fields, issue)
+    return found
+
+def get_issues(issue_keys, fields=None):
+    """Return {key: issue} for the given keys, using the cache wherever possible.
+
+    `fields` lists the fields the caller reads; None asks for all of them.
+    """
+    field_set = _field_set(fields)
+    # `updated` is only fetched for revalidating the disk cache; a remembered
+    # record needn't have it unless the caller reads it
+    memo_fields = field_set if fields and "updated" in fields else field_set - {"updated"}
+    issue_keys = list(dict.fromkeys(issue_keys))
+    result = {}
+    waiting = []
+    owned = []
+    with _lock:
+        memo = _run_memo()
+        for key in issue_keys:
+            if key in memo and _covers(memo[key][0], memo_fields):
+                result[key] = memo[key][1]
+            elif key in _in_flight:
+                waiting.append((key, _in_flight[key]))
+            else:
+                _in_flight[key] = (threading.Event(), {})
+                owned.append(key)
+
+    if owned:
+        found = {}
+        try:
+            found = _resolve(owned, field_set)
+        finally:
+            with _lock:
+                for key in owned:
+                    done, shared = _in_flight.pop(key)
+                    if key in found:
+                        memo[key] = shared["entry"] = found[key]
+                    done.set()
+        for key, (_, issue) in found.items():
+            result[key] = issue
+
+    # Another thread (possibly of another daemon command) is already fetching
+    # these keys; wait for its result
+    retry = []
+    for key, (done, shared) in waiting:
+        done.wait()
+        entry = shared.get("entry")
+        if entry and _covers(entry[0], field_set):
+            with _lock:
+                memo[key] = entry
+            result[key] = entry[1]
+        elif entry:
+            retry.append(key)
+    if retry:
+        # The other thread fetched fewer fields than we need
+        result.update(get_issues(retry, fields))
+    return result
+
+def get_issue(issue_key, fields=None):
+    """Return a single issue (or None), using the cache wherever possible."""
+    return get_issues([issue_key], fields).get(issue_key)
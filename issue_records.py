@@ -0,0 +1,164 @@
+"""
+Issue Records
+
+Compact issue records for the scripts that page through many issues only to
+read a few values from each (extract.py, my_todos.py).
+
+An IssueRecord keeps just those values in __slots__: no nested field dicts,
+avatar URLs, `self` links or status categories. A record of a sprint issue
+takes roughly a tenth of the memory of the issue dict it replaces.
+
+read_page() builds the records while the response is still arriving. It reads
+the page object one key at a time from the response stream, and decodes each
+element of its issue array on its own, turning it into a record straight away.
+So only one issue's JSON is ever held as Python objects, never the parsed tree
+of the whole page.
+"""
+
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+class IssueRecord:
+    """The values extract.py and my_todos.py read from an issue, and nothing else."""
+
+    __slots__ = ("key", "summary", "status", "story_points", "issue_type", "assignee",
+                 "priority", "created", "parent_key", "epic_key", "subtask_keys")
+
+    def __init__(self, key, summary=None, status=None, story_points=0, issue_type=None, assignee=None,
+                 priority=None, created=None, parent_key=None, epic_key=None, subtask_keys=()):
+        self.key = key
+        self.summary = summary
+        self.status = status
+        self.story_points = story_points
+        self.issue_type = issue_type
+        self.assignee = assignee
+        self.priority = priority
+        self.created = created
+        self.parent_key = parent_key
+        self.epic_key = epic_key
+        self.subtask_keys = subtask_keys
+
+    @classmethod
+    def from_issue(cls, issue):
+        """Build a record from an issue as Jira returns it; fields that weren't fetched stay empty."""
+        fields = issue.get("fields") or {}
+        parent = fields.get("parent") or {}
+        parent_type = ((parent.get("fields") or {}).get("issuetype") or {}).get("name")
+        return cls(
+            issue["key"],
+            summary=fields.get("summary"),
+            status=(fields.get("status") or {}).get("name"),
+            story_points=fields.get("customfield_10016", 0),  # Adjust field ID for story points
+            issue_type=(fields.get("issuetype") or {}).get("name"),
+            assignee=(fields.get("assignee") or {}).get("displayName"),
+            priority=(fields.get("priority") or {}).get("name"),
+            created=fields.get("created"),
+            parent_key=parent.get("key"),
+            epic_key=parent.get("key") if parent_type == "Epic" else None,
+            subtask_keys=tuple(subtask["key"] for subtask in fields.get("subtasks") or ()),
+        )
+
+    def __repr__(self):
+        return f"IssueRecord({self.key!r}, summary={self.summary!r}, status={self.status!r})"
+
+class _Reader:
+    """Reads JSON values one at a time from a streamed response."""
+
+    def __init__(self, response):
+        self.chunks = response.iter_content(CHUNK_SIZE)
+        self.decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self):
+        """Append the next chunk to the unread part of the buffer; False at the end of the body."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.decoder.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            text = self.decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON response")
+
+    def take(self, expected):
+        """Consume the next character, which must be one of `expected`."""
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r} in JSON response, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the buffer ("12" of "123", "1." of "1.5")
+            # decodes without error, so read on until something follows it
+            if (end == len(self.buffer) or self.buffer[end] in ".eE") and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self, convert):
+        """Yield convert(element) for each element of the next JSON array."""
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield convert(self.value())
+            if self.take(",]") == "]":
+                return
+
+def read_page(response, convert=IssueRecord.from_issue, array_key="issues"):
+    """Parse a page response, converting each element of its array_key list as it is decoded.
+
+    Returns the page as a dict, like response.json(), with the converted
+    elements in place of the raw ones. The number of body bytes read is in
+    page["_bytes"], since the body can't be read again afterwards.
+    """
+    reader = _Reader(response)
+    page = {}
+    reader.take("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            reader.take(":")
+            page[key] = list(reader.array(convert)) if key == array_key else reader.value()
+            if reader.take(",}") == "}":
+                break
+    # Drain the rest of the body so the connection goes back to the pool
+    while reader._fill():
+        pass
+    page["_bytes"] = reader.bytes_read
+    return page
@@ -0,0 +1,61 @@
+"""
+Issue Streams
+
+With --ndjson the scripts pass whole issue records between each other instead
+of bare keys: one JSON object per line, in the shape Jira returns them
+({"key": ..., "fields": {...}}). A consumer puts the records it reads into the
+issue cache's run memo, so it only goes back to Jira for issues whose record
+lacks a field it needs. Records are written and read line by line, so the next
+script in a pipeline starts on the first issues while the previous one is
+still producing the rest.
+
+Example:
+    python my_todos.py 69 --ndjson | python create_mirror.py -b EXMP --ndjson | python show_description.py --ndjson
+"""
+
+import json
+import re
+import sys
+import issue_cache
+
+# Fields producers include so downstream scripts rarely need to fetch
+# (create_mirror.py reads summary, description, duedate and issuelinks)
+STREAM_FIELDS = ["summary", "description", "duedate", "issuelinks", "updated"]
+
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*-\d+$")
+
+def write_issue(issue, stream=None):
+    """Write one issue record as a line of NDJSON and flush it to the next stage."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(issue) + "\n")
+    stream.flush()
+
+def read_issues(stream=None):
+    """Yield issue records from NDJSON lines as they arrive.
+
+    Lines that aren't JSON are read as whitespace-separated issue keys (anything
+    else on them is ignored), so the plain output of my_todos.py can be piped
+    in as well. Records are added to the issue cache's run memo as they are
+    read.
+    """
+    stream = stream or sys.stdin
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                issue = json.loads(line)
+            except ValueError:
+                print(f"Skipping malformed record: {line[:80]}", file=sys.stderr)
+                continue
+            if not isinstance(issue, dict) or not isinstance(issue.get("key"), str):
+                print(f"Skipping record without an issue key: {line[:80]}", file=sys.stderr)
+                continue
+            issue["key"] = issue["key"].upper()
+            issue_cache.remember([issue])
+            yield issue
+        else:
+            for key in line.split():
+                if ISSUE_KEY_PATTERN.match(key):
+                    yield {"key": key.upper()}
@@ -0,0 +1,235 @@
+"""
+Jira Client
+
+Shared HTTP client used by all scripts in this repository. Every request goes
+through one pooled requests.Session, so a run that touches many tickets reuses
+warm keep-alive connections instead of paying a TCP+TLS handshake per call.
+
+Connection handling can be tuned from the environment (or .env):
+    JIRA_POOL_SIZE       connections kept open per host (default 10)
+    JIRA_TIMEOUT         seconds before a request times out (default 30)
+    JIRA_MAX_RETRIES     retries for connection errors and 5xx responses (default 3)
+    JIRA_BACKOFF_FACTOR  exponential backoff factor between retries (default 0.5)
+    JIRA_PROJECTION_REPORT  set to 1 to print how many bytes field projection saved
+
+Requests are also paced by the shared scheduler in scheduler.py, which
+handles 429 responses and adapts the request rate and concurrency.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+import atexit
+import os
+import sys
+import threading
+import time
+import instrumentation
+import issue_records
+import scheduler
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Jira API details
+JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
+JIRA_EMAIL = os.getenv("JIRA_EMAIL")
+AUTH = HTTPBasicAuth(JIRA_EMAIL, os.getenv("JIRA_API_TOKEN"))
+
+# URLs (JIRA_BASE_URL points the scripts at another server, e.g. the local mock in bench/)
+BASE_URL = os.getenv("JIRA_BASE_URL") or f"https://{JIRA_DOMAIN}"
+ISSUE_API_URL = f"{BASE_URL}/rest/api/2/issue"
+ISSUE_LINK_URL = f"{BASE_URL}/rest/api/2/issueLink"
+ISSUE_LINK_TYPE_URL = f"{BASE_URL}/rest/api/2/issueLinkType"
+SEARCH_URL = f"{BASE_URL}/rest/api/2/search"
+AGILE_API_URL = f"{BASE_URL}/rest/agile/1.0"
+
+# Headers
+HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json"
+}
+
+# Connection pool settings
+POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "10"))
+TIMEOUT = float(os.getenv("JIRA_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("JIRA_BACKOFF_FACTOR", "0.5"))
+
+# Key searches are split into chunks of at most this many keys
+SEARCH_BATCH_SIZE = 50
+
+# Field projection accounting, reported at exit when JIRA_PROJECTION_REPORT is set
+PROJECTION_REPORT = os.getenv("JIRA_PROJECTION_REPORT", "") not in ("", "0")
+_projection = {"bytes": 0, "issues": 0, "sample_key": None}
+_projection_lock = threading.Lock()
+
+_session = None
+_session_lock = threading.Lock()
+
+# Every request waits for its turn here; see scheduler.py
+SCHEDULER = scheduler.from_environment(POOL_SIZE)
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False,
+                # Leave 429s to the scheduler, which must see them to back off
+                respect_retry_after_header=False
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            session.auth = AUTH
+            _session = session
+        return _session
+
+def request(method, url, **kwargs):
+    """Send a request through the shared session, paced by the scheduler."""
+    kwargs.setdefault("timeout", TIMEOUT)
+    session = get_session()
+
+    def send():
+        started = time.perf_counter()
+        response = session.request(method, url, **kwargs)
+        instrumentation.record(method, url, response, started, stream=kwargs.get("stream", False))
+        return response
+
+    return SCHEDULER.run(send, instrumentation.endpoint_template(method, url))
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def put(url, **kwargs):
+    return request("PUT", url, **kwargs)
+
+def record_projection(response, issues, size=None):
+    """Count the bytes of a response that only carried projected fields.
+
+    A streamed response can't be read again, so its size is passed in instead.
+    """
+    if not PROJECTION_REPORT or response.status_code != 200 or not issues:
+        return
+    with _projection_lock:
+        _projection["bytes"] += len(response.content) if size is None else size
+        _projection["issues"] += len(issues)
+        if _projection["sample_key"] is None:
+            sample = issues[0]
+            _projection["sample_key"] = sample["key"] if isinstance(sample, dict) else sample.key
+
+def report_projection():
+    """Print the bytes received with projection against an estimate without it."""
+    if not _projection["issues"]:
+        return
+    # One unprojected fetch of a sample issue gives the size of a full payload
+    response = get(f"{ISSUE_API_URL}/{_projection['sample_key']}")
+    if response.status_code != 200:
+        return
+    received = _projection["bytes"]
+    estimated = len(response.content) * _projection["issues"]
+    saved = max(0, estimated - received)
+    print(
+        f"Field projection: {_projection['issues']} issues in {received / 1024:.1f} KB; "
+        f"about {estimated / 1024:.1f} KB without projection "
+        f"({saved / 1024:.1f} KB, {100 * saved / max(estimated, 1):.0f}% saved)",
+        file=sys.stderr
+    )
+
+if PROJECTION_REPORT:
+    atexit.register(report_projection)
+
+def get_issue_details(issue_key, fields=None):
+    """Fetch information for an issue by its key, optionally only the given fields."""
+    url = f"{ISSUE_API_URL}/{issue_key}"
+    params = {"fields": ",".join(fields)} if fields else None
+    response = get(url, params=params)
+    if response.status_code == 200:
+        issue = response.json()
+        if fields:
+            record_projection(response, [issue])
+        return issue
+    else:
+        print(f"Failed to fetch details for issue {issue_key}. Status code: {response.status_code}")
+        return None
+
+def read_issue_page(response, convert=None, projected=True):
+    """Parse a page of issues from a response.
+
+    With convert (e.g. issue_records.IssueRecord.from_issue), the response must
+    have been requested with stream=True, and each issue is converted as soon
+    as it has been read from the stream; see issue_records.py.
+    """
+    if convert is None:
+        page = response.json()
+        size = None
+    else:
+        page = issue_records.read_page(response, convert)
+        size = page.pop("_bytes")
+        instrumentation.record_body(response, size)
+    if projected:
+        record_projection(response, page.get("issues", []), size)
+    return page
+
+def get_issues_by_keys(issue_keys, fields, convert=None):
+    """Fetch many issues in batched JQL searches, returning a dict keyed by issue key.
+
+    With convert, the values are converted issues (see read_issue_page) instead of dicts.
+    """
+    issue_keys = list(dict.fromkeys(issue_keys))
+    found = {}
+    for i in range(0, len(issue_keys), SEARCH_BATCH_SIZE):
+        chunk = issue_keys[i:i + SEARCH_BATCH_SIZE]
+        payload = {
+            "jql": f"key in ({', '.join(chunk)})",
+            "maxResults": len(chunk),
+            "fields": fields,
+            # Don't fail the whole chunk when one of the keys no longer exists
+            "validateQuery": "warn"
+        }
+        response = post(SEARCH_URL, json=payload, stream=convert is not None)
+        if response.status_code == 200:
+            issues = read_issue_page(response, convert, projected="*all" not in fields).get("issues", [])
+            for issue in issues:
+                found[issue["key"] if convert is None else issue.key] = issue
+        else:
+            print(f"Failed to fetch details for issues {', '.join(chunk)}. Status code: {response.status_code}")
+    return found
+
+def iter_search(jql, fields, page_size=100, convert=None):
+    """Yield the issues matching a JQL query page by page, following startAt/total.
+
+    With convert, the pages hold converted issues (see read_issue_page) instead of dicts.
+    """
+    start_at = 0
+    while True:
+        payload = {
+            "jql": jql,
+            "startAt": start_at,
+            "maxResults": page_size,
+            "fields": fields
+        }
+        response = post(SEARCH_URL, json=payload, stream=convert is not None)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Search failed. Status code: {response.status_code}\n"
+                f"Error message: {response.text}"
+            )
+        page = read_issue_page(response, convert)
+        issues = page.get("issues", [])
+        yield issues
+        start_at = page.get("startAt", start_at) + len(issues)
+        if not issues or start_at >= page.get("total", 0):
+            return
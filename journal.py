@@ -0,0 +1,152 @@
+"""
+Mutation Journal
+
+An append-only JSON Lines file recording what a batch run of create_mirror.py
+or sync_due_dates.py plans to change in Jira and what it has changed so far,
+so a run that dies halfway can be resumed without fetching or changing
+anything twice.
+
+A journaled run first works out every mutation (mirror create, link, due date
+update) from one round of batched reads, and writes them all to the journal
+as `plan` records, each with everything needed to send it. A `done` record is
+appended as soon as Jira confirms a mutation, carrying its result (such as a
+new mirror's key). `checkpoint` records mark the end of each phase.
+
+Rerunning the same command with the same journal skips the reads, sends only
+the mutations without a `done` record (failed ones are retried) and picks up
+results such as mirror keys from the journal, so a crash between creating a
+mirror and linking it no longer leaves an orphan. Once a run has finished,
+rerunning it just prints its summary again. Only a crash while a request is in
+flight, before its response arrived, can still send that one request twice.
+
+With --plan the mutations are worked out, printed and (with --journal)
+written to the journal without changing anything in Jira; running the command
+again with the same journal then carries out exactly that plan.
+
+Example:
+    python create_mirror.py -b DEV --journal mirror.jsonl --plan EXMP-152 EXMP-153
+    python create_mirror.py -b DEV --journal mirror.jsonl EXMP-152 EXMP-153
+"""
+
+import json
+import os
+import sys
+import threading
+
+PLANNED = "planned"
+FINISHED = "finished"
+
+class Journal:
+    """A journal file and the state read back from it.
+
+    With no path the journal is kept in memory only, which is how the bulk
+    modes run without --journal.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.run = None  # The command the journal was started for
+        self.ops = []  # Planned mutations in plan order
+        self.results = {}  # Op id -> result of every completed mutation
+        self.checkpoints = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path) as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run killed mid-write leaves a partial last line; it never happened,
+                # and is cut off so that new records don't get appended to it
+                if number == len(lines):
+                    with open(self.path, "r+b") as f:
+                        f.truncate(os.path.getsize(self.path) - len(line.encode()))
+                    break
+                raise RuntimeError(f"{self.path}:{number} is not a journal record")
+            kind = record.pop("type")
+            if kind == "run":
+                self.run = record
+            elif kind == "plan":
+                self.ops.append(record)
+            elif kind == "done":
+                self.results[record["id"]] = record.get("result")
+            elif kind == "checkpoint":
+                self.checkpoints.add(record["name"])
+
+    def _append(self, records, sync=False):
+        if not self.path:
+            return
+        with self._lock, open(self.path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+
+    def start(self, run):
+        """Begin a new journal for the run, or check an existing one belongs to it."""
+        if self.run is None:
+            self.run = run
+            self._append([dict(run, type="run")], sync=True)
+        elif self.run != run:
+            raise RuntimeError(f"Journal {self.path} was started for a different {self.run.get('script')} command; "
+                               f"rerun that command or use a new journal file")
+
+    def plan(self, ops):
+        """Record the full set of planned mutations, followed by the `planned` checkpoint."""
+        self.ops = list(ops)
+        self._append([dict(op, type="plan") for op in self.ops] + [{"type": "checkpoint", "name": PLANNED}],
+                     sync=True)
+        self.checkpoints.add(PLANNED)
+
+    def is_done(self, op_id):
+        return op_id in self.results
+
+    def pending(self, kind):
+        """Return the planned mutations of one kind that haven't been completed yet."""
+        return [op for op in self.ops if op["op"] == kind and op["id"] not in self.results]
+
+    def complete(self, completed):
+        """Record mutations Jira confirmed, given as {op id: result}."""
+        if completed:
+            self._append([{"type": "done", "id": op_id, "result": result} for op_id, result in completed.items()])
+            self.results.update(completed)
+
+    def checkpoint(self, name):
+        self._append([{"type": "checkpoint", "name": name}], sync=True)
+        self.checkpoints.add(name)
+
+    @property
+    def planned(self):
+        return PLANNED in self.checkpoints
+
+    @property
+    def finished(self):
+        return FINISHED in self.checkpoints
+
+def open_journal(path, run):
+    """Open (or start) the journal at path for a run described by a JSON-able dict.
+
+    With no path (--plan on its own) the journal is kept in memory.
+    """
+    journal = Journal(path)
+    journal.start(run)
+    return journal
+
+def add_arguments(parser):
+    """Add the --journal and --plan flags to a batch script's parser."""
+    parser.add_argument('--journal', metavar='FILE',
+                        help='Record planned and completed changes in FILE and resume from it when rerun (implies --bulk)')
+    parser.add_argument('--plan', action='store_true',
+                        help='Only work out and print the changes, without making them (implies --bulk)')
+
+def print_plan(journal, describe, stream=None):
+    """Print one line per planned mutation, marking the ones already done."""
+    stream = stream or sys.stdout
+    print(f"\nPlan: {len(journal.ops)} changes", file=stream)
+    print("-" * 50, file=stream)
+    for op in journal.ops:
+        print(f"{'[done] ' if journal.is_done(op['id']) else ''}{describe(op)}", file=stream)
@@ -0,0 +1,109 @@
+"""
+Link Graph
+
+A local index of the issue links around a set of tickets, used by
+sync_due_dates.py to propagate due dates beyond one hop.
+
+The graph is built breadth-first from the source tickets that have a due
+date: each level is fetched in batched searches through the issue cache (only
+`duedate` and `issuelinks`; the last level only `duedate`), and every issue is
+fetched once no matter how many sources or paths lead to it. The result maps each issue key
+to its due date and its links as (link type, other key) pairs.
+
+Propagation then walks the graph from each source in turn, again breadth-first
+with a visited set, so cycles in the links are harmless.
+"""
+
+from collections import deque
+from issue_cache import get_issues
+
+GRAPH_FIELDS = ["duedate", "issuelinks"]
+LEAF_FIELDS = ["duedate"]
+
+def issue_links(issue, link_types):
+    """Return (link type, other key) pairs for the issue's links of the given types."""
+    links = []
+    for link in issue.get('fields', {}).get('issuelinks', []):
+        link_type = link.get('type', {}).get('name')
+        if link_type not in link_types:
+            continue
+        linked_issue = link.get('outwardIssue') or link.get('inwardIssue')
+        if linked_issue:
+            links.append((link_type, linked_issue['key']))
+    return links
+
+def _node(issue, link_types, with_links):
+    return {
+        "duedate": issue['fields'].get('duedate'),
+        "links": issue_links(issue, link_types) if with_links else [],
+    }
+
+def build_link_graph(source_keys, link_types, max_depth):
+    """Index every issue within max_depth links of the sources that have a due date.
+
+    Returns {key: {"duedate": ..., "links": [(link type, other key)]}}; issues
+    on the outermost level have no links recorded.
+    """
+    source_keys = list(dict.fromkeys(source_keys))
+    sources = get_issues(source_keys, GRAPH_FIELDS if max_depth else LEAF_FIELDS)
+    graph = {key: _node(sources[key], link_types, max_depth > 0) for key in source_keys if key in sources}
+
+    # Sources without a due date only get expanded if another source's links lead to them
+    level = [key for key in graph if graph[key]["duedate"]]
+    placed = set(level)
+    for depth in range(1, max_depth + 1):
+        neighbours = dict.fromkeys(
+            other for key in level for _, other in graph[key]["links"] if other not in placed
+        )
+        missing = [key for key in neighbours if key not in graph]
+        if missing:
+            fetched = get_issues(missing, GRAPH_FIELDS if depth < max_depth else LEAF_FIELDS)
+            for key in missing:
+                if key in fetched:
+                    graph[key] = _node(fetched[key], link_types, depth < max_depth)
+        level = [key for key in neighbours if key in graph]
+        placed.update(level)
+    return graph
+
+def reachable(graph, source_key, max_depth):
+    """Yield (key, depth) for every issue within max_depth links of the source, nearest first."""
+    visited = {source_key}
+    queue = deque([(source_key, 0)])
+    while queue:
+        key, depth = queue.popleft()
+        if depth == max_depth:
+            continue
+        for _, other in graph.get(key, {}).get("links", []):
+            if other in visited or other not in graph:
+                continue
+            visited.add(other)
+            yield other, depth + 1
+            queue.append((other, depth + 1))
+
+def propagate_due_dates(graph, source_keys, max_depth):
+    """Work out which issues should take a due date from which source.
+
+    Returns {target key: (source key, due date)} for every issue without a due
+    date that is reachable from a source with one. A target reachable from
+    several sources takes the due date of the first source given.
+    """
+    updates = {}
+    for source_key in dict.fromkeys(source_keys):
+        node = graph.get(source_key)
+        if not node:
+            print(f"Failed to fetch {source_key}")
+            continue
+        if not node["duedate"]:
+            print(f"{source_key} has no due date. Skipping.")
+            continue
+        for target_key, _ in reachable(graph, source_key, max_depth):
+            if graph[target_key]["duedate"]:
+                continue
+            if target_key in updates:
+                other_source, other_due_date = updates[target_key]
+                if other_due_date != node["duedate"]:
+                    print(f"{target_key} is related to both {other_source} and {source_key}; "
+                          f"keeping due date {other_due_date} from {other_source}")
+                continue
+            updates[target_key] = (source_key, node["duedate"])
+    return updates
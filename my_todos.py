@@ -2,8 +2,12 @@
 My TODOs Script
 
 This script lists all TODO tickets assigned to you in a specific Jira board.
-It automatically detects TODO/Open/Backlog columns from the board configuration
-and outputs ticket numbers in a format suitable for piping to other scripts.
+It automatically detects TODO/Open/Backlog columns from the board configuration,
+matches the statuses mapped to them, and outputs ticket numbers in a format suitable for piping to other scripts.
+Board metadata is cached for a day (see board_cache.py), and the search is
+paginated so every matching ticket is listed, printed as each page arrives.
+Unless --ndjson needs the full issues, each one is read into a compact record
+while its page streams in (see issue_records.py).
 
 Usage:
     python my_todos.py BOARD_NUMBER
@@ -14,138 +18,121 @@ Example:
 Chaining Example:
     # Get all your TODO tickets and create mirrors for them
     python my_todos.py 90 | xargs python create_mirror.py
+
+    # Stream full issue records instead, so create_mirror.py needn't fetch them again
+    python my_todos.py 90 --ndjson | python create_mirror.py -b EXMP --ndjson
 """
 
-import requests
-from requests.auth import HTTPBasicAuth
-from dotenv import load_dotenv
-import os
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
+import argparse
 import sys
+import instrumentation
+import issue_stream
+import jira_client
+from issue_records import IssueRecord
+from jira_client import JIRA_EMAIL
+from board_cache import get_board_metadata
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Jira API details
-JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
-JIRA_EMAIL = os.getenv("JIRA_EMAIL")
-AUTH = HTTPBasicAuth(JIRA_EMAIL, os.getenv("JIRA_API_TOKEN"))
-
-# Headers
-HEADERS = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
-
-def get_board_info(board_id):
-    """Get board configuration and project key."""
-    # First try to get board info
-    board_url = f"https://{JIRA_DOMAIN}/rest/agile/1.0/board/{board_id}"
-    response = requests.get(board_url, headers=HEADERS, auth=AUTH)
-    
-    if response.status_code == 200:
-        board_data = response.json()
-        # The project key is usually in the location or the first project
-        if 'location' in board_data and 'projectKey' in board_data['location']:
-            return board_data['location']['projectKey']
-        elif 'projects' in board_data and len(board_data['projects']) > 0:
-            return board_data['projects'][0]['key']
-    
-    # If that fails, try getting it from the configuration
-    config_url = f"https://{JIRA_DOMAIN}/rest/agile/1.0/board/{board_id}/configuration"
-    response = requests.get(config_url, headers=HEADERS, auth=AUTH)
-    
-    if response.status_code == 200:
-        config = response.json()
-        if 'location' in config and 'projectKey' in config['location']:
-            return config['location']['projectKey']
-        
-    print(f"Failed to fetch board info. Status code: {response.status_code}")
-    print(f"Error: {response.text}")
-    return None
-
-def get_todo_issues(board_id):
-    """Get all TODO issues assigned to the current user."""
-    project_key = get_board_info(board_id)
-    if not project_key:
+TODO_WORDS = ['todo', 'to do', 'open', 'backlog']
+TODO_FIELDS = [
+    "summary",
+    "status",
+    "created",
+    "priority",
+    "issuetype"
+]
+
+def build_todo_jql(metadata):
+    """Build the JQL for the current user's TODO issues on a board.
+
+    Matches the status IDs mapped to the board's TODO-like columns rather than
+    the column names, since a column is often named differently from the
+    statuses in it. When the configuration maps no statuses to those columns,
+    their names are matched as before.
+    """
+    project_key = metadata['project_key']
+    status_clause = 'status in ("To Do", "Open", "TODO", "BACKLOG")'
+
+    # Prefer the statuses mapped to the board's TODO-like columns
+    todo_columns = [col for col in metadata['columns']
+                    if any(word in col['name'].lower() for word in TODO_WORDS)]
+    if todo_columns:
+        status_ids = [status_id for col in todo_columns for status_id in col['status_ids']]
+        if status_ids:
+            status_clause = 'status in (' + ', '.join(status_ids) + ')'
+        else:
+            status_clause = 'status in (' + ', '.join(f'"{col["name"]}"' for col in todo_columns) + ')'
+    return f'project = {project_key} AND assignee = currentUser() AND {status_clause} ORDER BY created DESC'
+
+def iter_todo_issues(board_id, fields=TODO_FIELDS, convert=None):
+    """Yield all TODO issues assigned to the current user, page by page (converted with convert, if given)."""
+    metadata = get_board_metadata(board_id)
+    if not metadata:
         print("Could not determine project key from board ID")
         sys.exit(1)
-    
-    # JQL query to find TODO issues assigned to current user
-    jql = f'project = {project_key} AND assignee = currentUser() AND status in ("To Do", "Open", "TODO", "BACKLOG") ORDER BY created DESC'
-    
-    # First, get configuration to ensure we have the right status names
-    config_url = f"https://{JIRA_DOMAIN}/rest/agile/1.0/board/{board_id}/configuration"
-    config_response = requests.get(config_url, headers=HEADERS, auth=AUTH)
-    
-    if config_response.status_code == 200:
-        # Add any additional status names from the board configuration
-        config = config_response.json()
-        todo_columns = [col['name'] for col in config.get('columnConfig', {}).get('columns', [])
-                       if any(word.lower() in col['name'].lower() for word in ['todo', 'to do', 'open', 'backlog'])]
-        if todo_columns:
-            status_clause = 'status in (' + ', '.join(f'"{s}"' for s in todo_columns) + ')'
-            jql = f'project = {project_key} AND assignee = currentUser() AND {status_clause} ORDER BY created DESC'
-
-    # Search for issues
-    search_url = f"https://{JIRA_DOMAIN}/rest/api/2/search"
-    payload = {
-        "jql": jql,
-        "maxResults": 50,
-        "fields": [
-            "summary",
-            "status",
-            "created",
-            "priority",
-            "issuetype"
-        ]
-    }
-    
-    response = requests.post(search_url, headers=HEADERS, auth=AUTH, json=payload)
-    
-    if response.status_code == 200:
-        return project_key, response.json()
-    else:
-        print(f"Failed to fetch issues. Status code: {response.status_code}")
-        print(f"Error: {response.text}")
-        return None, None
+
+    yield from jira_client.iter_search(build_todo_jql(metadata), fields, convert=convert)
 
 def format_issue(issue):
-    """Format a single issue for display."""
-    fields = issue['fields']
+    """Format a single issue record for display."""
     return {
-        'key': issue['key'],
-        'type': fields['issuetype']['name'],
-        'priority': fields['priority']['name'],
-        'status': fields['status']['name'],
-        'summary': fields['summary']
+        'key': issue.key,
+        'type': issue.issue_type,
+        'priority': issue.priority,
+        'status': issue.status,
+        'summary': issue.summary
     }
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python my_todos.py BOARD_NUMBER")
-        print("Example: python my_todos.py 90")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='List your TODO tickets on a board.',
+        epilog='Example: python my_todos.py 90'
+    )
+    parser.add_argument('board', help='Board number')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Print one JSON issue record per line instead of bare keys, for --ndjson consumers')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup(args)
 
     try:
-        board_id = sys.argv[1]
+        board_id = args.board
         int(board_id)  # Validate it's a number
     except ValueError:
         print("Error: Board number must be a number", file=sys.stderr)
         sys.exit(1)
     
     print(f"Fetching TODO issues for {JIRA_EMAIL} from board {board_id}...", file=sys.stderr)
-    project_key, issues_data = get_todo_issues(board_id)
-    
-    if not issues_data:
+
+    # Print just the ticket numbers, space-separated, as each page arrives
+    # (or whole records, with the fields the other scripts read)
+    count = 0
+    if args.ndjson:
+        fields, convert = list(dict.fromkeys(TODO_FIELDS + issue_stream.STREAM_FIELDS)), None
+    else:
+        fields, convert = TODO_FIELDS, IssueRecord.from_issue
+    try:
+        for issues in iter_todo_issues(board_id, fields, convert):
+            for issue in issues:
+                if args.ndjson:
+                    issue_stream.write_issue(issue)
+                else:
+                    print(("" if count == 0 else " ") + issue.key, end="")
+                count += 1
+            sys.stdout.flush()
+    except RuntimeError as e:
+        if count and not args.ndjson:
+            print()
+        print(e, file=sys.stderr)
         sys.exit(1)
-        
-    issues = issues_data['issues']
-    if not issues:
+
+    if not count:
         print("No TODO issues found! 🎉", file=sys.stderr)
         sys.exit(0)
-    
-    # Print just the ticket numbers, space-separated
-    print(" ".join(issue['key'] for issue in issues))
+    if not args.ndjson:
+        print()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Request Scheduler
+
+Rate-limit-aware scheduling for every HTTP call made through jira_client.
+
+Requests first take a token from a token bucket (steady rate plus a small
+burst) and then a concurrency slot. The concurrency limit and the token rate
+adapt AIMD-style: they grow slowly while responses are fast and successful,
+and are cut in half when Jira answers 429. The concurrency limit also shrinks
+when responses get much slower.
+
+Latency is compared per endpoint. Each endpoint keeps the best latency seen
+for it, since a search is always slower than a small PUT.
+
+A 429 response is retried after the delay in its Retry-After header. All
+other requests pause until then too, so a throttled run slows down instead of
+failing tickets.
+
+Settings (environment or .env):
+    JIRA_RATE_LIMIT        initial requests per second (default 10)
+    JIRA_RATE_BURST        token bucket size (default 20)
+    JIRA_MAX_CONCURRENCY   upper bound for requests in flight (default: JIRA_POOL_SIZE)
+    JIRA_MAX_429_RETRIES   retries for a throttled request (default 5)
+"""
+
+from email.utils import parsedate_to_datetime
+import os
+import threading
+import time
+
+# Bounds for the adaptive token rate (requests per second)
+MIN_RATE = 0.5
+MAX_RATE_FACTOR = 4
+
+# A response slower than this multiple of the best latency counts as congestion
+LATENCY_TOLERANCE = 3.0
+
+# Backoff used when a 429 response carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 2.0
+
+def parse_retry_after(value):
+    """Return the Retry-After delay in seconds, or None when it can't be parsed."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RequestScheduler:
+    """Token bucket plus AIMD concurrency control shared by all threads."""
+
+    def __init__(self, rate, burst, max_concurrency, max_retries):
+        self.rate = float(rate)
+        self.max_rate = self.rate * MAX_RATE_FACTOR
+        self.burst = float(burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = max(1.0, self.max_concurrency / 2)
+        self.max_retries = max_retries
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.best_latency = {}  # Endpoint -> fastest successful response seen
+        self.paused_until = 0.0
+        self.last_refill = time.monotonic()
+        self.condition = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _acquire(self):
+        """Block until a token and a concurrency slot are available."""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.in_flight >= int(self.limit):
+                    wait = None
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                self.condition.wait(wait)
+
+    def _release(self, latency, throttled, retry_after, endpoint=None):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                # Multiplicative decrease, once per throttling episode: requests
+                # that were already in flight when the first 429 arrived don't
+                # cut the limits again.
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                # Hold everyone back until Jira allows more
+                self.paused_until = max(self.paused_until, now + retry_after)
+            else:
+                best = self.best_latency.get(endpoint)
+                if best is None or latency < best:
+                    best = self.best_latency[endpoint] = latency
+                if latency > best * LATENCY_TOLERANCE:
+                    self.limit = max(1.0, self.limit * 0.75)
+                else:
+                    # Additive increase: roughly one extra slot per window of requests
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                    self.rate = min(self.max_rate, self.rate + 1 / self.limit)
+            self.condition.notify_all()
+
+    def run(self, send, endpoint=None):
+        """Send a request via `send()`, retrying it while Jira answers 429.
+
+        endpoint (e.g. "GET /rest/api/2/issue/{key}") picks the latency
+        baseline the response time is compared with.
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            response = None
+            try:
+                response = send()
+            finally:
+                throttled = response is not None and response.status_code == 429
+                retry_after = 0.0
+                if throttled:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is None:
+                        retry_after = DEFAULT_RETRY_AFTER * (2 ** attempt)
+                self._release(time.monotonic() - start, throttled, retry_after, endpoint)
+            if not throttled or attempt >= self.max_retries:
+                return response
+            response.close()
+            attempt += 1
+
+def from_environment(default_concurrency):
+    """Build a scheduler from the JIRA_* settings."""
+    return RequestScheduler(
+        rate=float(os.getenv("JIRA_RATE_LIMIT", "10")),
+        burst=float(os.getenv("JIRA_RATE_BURST", "20")),
+        max_concurrency=int(os.getenv("JIRA_MAX_CONCURRENCY", str(default_concurrency))),
+        max_retries=int(os.getenv("JIRA_MAX_429_RETRIES", "5"))
+    )
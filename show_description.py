@@ -4,43 +4,60 @@ Show Description Script
 This script fetches and displays the description of a Jira ticket.
 It formats the output nicely and includes the ticket summary.
 
+Several tickets can be given at once, or piped in on stdin as keys or as
+issue records (see issue_stream.py). They are fetched in batched searches that
+only ask for the summary and description, and each ticket is printed as soon
+as it is rendered. Descriptions are wrapped line by line as they are printed,
+so very long ones don't have to be wrapped in one go first.
+
 Usage:
-    python show_description.py TICKET-123
+    python show_description.py TICKET-123 [TICKET-456 ...]
+    python show_description.py < keys.txt
 
 Example:
     python show_description.py EXMP-152
+    python show_description.py EXMP-152 EXMP-153 EXMP-154
+    python my_todos.py 69 | python show_description.py
+    python my_todos.py 69 --ndjson | python show_description.py --ndjson
 """
 
-import requests
-from requests.auth import HTTPBasicAuth
-from dotenv import load_dotenv
-import os
-import sys
-import textwrap
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Jira API details
-JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
-ISSUE_DETAILS_URL = f"https://{JIRA_DOMAIN}/rest/api/2/issue"
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
 
-# Headers
-HEADERS = {
-    "Accept": "application/json"
-}
+import argparse
+import re
+import sys
+import instrumentation
+import issue_stream
+from issue_cache import get_issues
+from jira_client import SEARCH_BATCH_SIZE
 
-AUTH = HTTPBasicAuth(os.getenv('JIRA_EMAIL'), os.getenv("JIRA_API_TOKEN"))
+DESCRIPTION_FIELDS = ["summary", "description"]
+WRAP_WIDTH = 80
 
-def get_issue_details(issue_key):
-    """Fetch detailed information for an issue by its key."""
-    url = f"{ISSUE_DETAILS_URL}/{issue_key}"
-    response = requests.get(url, headers=HEADERS, auth=AUTH)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch details for issue {issue_key}. Status code: {response.status_code}")
-        return None
+def iter_wrapped_lines(text, width=WRAP_WIDTH):
+    """Wrap text at word boundaries like textwrap.fill, yielding each line as soon as it is full."""
+    line = ""
+    for match in re.finditer(r"\S+", text):
+        word = match.group()
+        if line and len(line) + 1 + len(word) <= width:
+            line += " " + word
+            continue
+        if len(word) > width:
+            # Words longer than a line are split, filling up the current line first as textwrap does
+            space_left = width - len(line) - 1 if line else width
+            if space_left > 0:
+                line = f"{line} {word[:space_left]}" if line else word[:space_left]
+                word = word[space_left:]
+            while word:
+                yield line
+                line, word = word[:width], word[width:]
+            continue
+        if line:
+            yield line
+        line = word
+    if line:
+        yield line
 
 def format_description(description):
     """Format the description text for better readability."""
@@ -48,27 +65,60 @@ def format_description(description):
         return "No description available."
     
     # Wrap text at 80 characters
-    wrapped_text = textwrap.fill(description, width=80)
-    return wrapped_text
+    return "\n".join(iter_wrapped_lines(description))
+
+def show_issue(ticket_key, issue, out=None):
+    """Print a ticket's summary and description, wrapping the description as it goes."""
+    out = out or sys.stdout
+    if not issue:
+        print(f"Could not find ticket {ticket_key}", file=out)
+        return
+    print(f"\nTicket: {ticket_key}", file=out)
+    print(f"Summary: {issue['fields']['summary']}", file=out)
+    print("\nDescription:", file=out)
+    print("-" * 80, file=out)
+    description = issue['fields'].get('description')
+    if description:
+        for line in iter_wrapped_lines(description):
+            out.write(line + "\n")
+    else:
+        print("No description available.", file=out)
+    print("-" * 80, file=out)
+    out.flush()
+
+def show_tickets(ticket_keys):
+    """Fetch the tickets' summaries and descriptions in one batched lookup and print them in order."""
+    issues = get_issues(ticket_keys, DESCRIPTION_FIELDS)
+    for key in ticket_keys:
+        show_issue(key, issues.get(key))
+
+def iter_stdin_batches(size=SEARCH_BATCH_SIZE):
+    """Yield the keys read from stdin in batches, each as soon as it is full."""
+    batch = []
+    for record in issue_stream.read_issues():
+        batch.append(record['key'])
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python show_description.py TICKET-123")
-        sys.exit(1)
-    
-    ticket_key = sys.argv[1].upper()
-    issue = get_issue_details(ticket_key)
-    
-    if issue:
-        print(f"\nTicket: {ticket_key}")
-        print(f"Summary: {issue['fields']['summary']}")
-        print("\nDescription:")
-        print("-" * 80)
-        description = issue['fields'].get('description', '')
-        print(format_description(description))
-        print("-" * 80)
+    parser = argparse.ArgumentParser(description='Show the description of Jira tickets.')
+    parser.add_argument('tickets', nargs='*', help='Ticket keys, e.g. EXMP-152; read from stdin when none are given')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Read issue records (or keys) from stdin and show each of them')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup(args)
+
+    if args.tickets and not args.ndjson:
+        show_tickets(list(dict.fromkeys(key.upper() for key in args.tickets)))
+    elif args.ndjson or not sys.stdin.isatty():
+        for batch in iter_stdin_batches():
+            show_tickets(batch)
     else:
-        print(f"Could not find ticket {ticket_key}")
+        parser.error('the following arguments are required: tickets (or keys on stdin)')
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
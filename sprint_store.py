@@ -0,0 +1,97 @@
+"""
+Sprint Store
+
+Local SQLite copy of the tickets extract.py reports for a sprint, together
+with the time of the last sync. Incremental runs only re-process issues that
+changed since then and compute the story point totals from the stored rows.
+
+Settings (environment or .env):
+    JIRA_SPRINT_STORE_PATH  SQLite file (default ~/.cache/jira-extractor/sprints.sqlite)
+"""
+
+import os
+import sqlite3
+from collections import defaultdict
+
+STORE_PATH = os.path.expanduser(os.getenv("JIRA_SPRINT_STORE_PATH", "~/.cache/jira-extractor/sprints.sqlite"))
+
+def connect():
+    """Open the store, creating its tables on first use."""
+    os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+    db = sqlite3.connect(STORE_PATH)
+    db.executescript(
+        "CREATE TABLE IF NOT EXISTS sync_state ("
+        " sprint_id TEXT PRIMARY KEY,"
+        " last_sync REAL NOT NULL);"
+        "CREATE TABLE IF NOT EXISTS full_scans ("
+        " sprint_id TEXT PRIMARY KEY,"
+        " scanned_at REAL NOT NULL);"
+        "CREATE TABLE IF NOT EXISTS tickets ("
+        " sprint_id TEXT NOT NULL,"
+        " issue_key TEXT NOT NULL,"  # The sprint issue this ticket was derived from
+        " key TEXT NOT NULL,"
+        " summary TEXT,"
+        " status TEXT,"
+        " story_points REAL,"
+        " PRIMARY KEY (sprint_id, issue_key, key));"
+    )
+    return db
+
+def get_last_sync(db, sprint_id):
+    """Return the high-water mark of the last sync as a Unix timestamp, or None."""
+    row = db.execute("SELECT last_sync FROM sync_state WHERE sprint_id = ?", (sprint_id,)).fetchone()
+    return row[0] if row else None
+
+def set_last_sync(db, sprint_id, timestamp):
+    db.execute("INSERT OR REPLACE INTO sync_state (sprint_id, last_sync) VALUES (?, ?)", (sprint_id, timestamp))
+    db.commit()
+
+def get_last_full_scan(db, sprint_id):
+    """Return when the sprint's whole membership was last checked, as a Unix timestamp, or None."""
+    row = db.execute("SELECT scanned_at FROM full_scans WHERE sprint_id = ?", (sprint_id,)).fetchone()
+    return row[0] if row else None
+
+def set_last_full_scan(db, sprint_id, timestamp):
+    db.execute("INSERT OR REPLACE INTO full_scans (sprint_id, scanned_at) VALUES (?, ?)", (sprint_id, timestamp))
+    db.commit()
+
+def replace_tickets(db, sprint_id, issue_key, tickets):
+    """Replace everything stored for one sprint issue with its freshly processed tickets."""
+    db.execute("DELETE FROM tickets WHERE sprint_id = ? AND issue_key = ?", (sprint_id, issue_key))
+    db.executemany(
+        "INSERT OR REPLACE INTO tickets (sprint_id, issue_key, key, summary, status, story_points)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (sprint_id, issue_key, t["key"], t["summary"], t["status"], t["story_points"])
+            for t in tickets
+        ]
+    )
+
+def remove_issues(db, sprint_id, issue_keys):
+    db.executemany(
+        "DELETE FROM tickets WHERE sprint_id = ? AND issue_key = ?",
+        [(sprint_id, key) for key in issue_keys]
+    )
+
+def stored_issue_keys(db, sprint_id):
+    rows = db.execute("SELECT DISTINCT issue_key FROM tickets WHERE sprint_id = ?", (sprint_id,))
+    return {key for (key,) in rows}
+
+def get_tickets(db, sprint_id):
+    rows = db.execute(
+        "SELECT key, summary FROM tickets WHERE sprint_id = ? ORDER BY rowid", (sprint_id,)
+    )
+    return [{"key": key, "summary": summary} for key, summary in rows]
+
+def story_points_by_status(db, sprint_id):
+    """Aggregate the stored tickets' story points per status."""
+    totals = defaultdict(float)
+    rows = db.execute(
+        "SELECT status, SUM(story_points) FROM tickets"
+        " WHERE sprint_id = ? AND story_points"
+        " GROUP BY status ORDER BY MIN(rowid)",
+        (sprint_id,)
+    )
+    for status, points in rows:
+        totals[status] += points
+    return totals
@@ -7,46 +7,58 @@ For each provided ticket, it:
 2. If the original ticket has a due date and the linked ticket doesn't
 3. Updates the linked ticket's due date to match the original
 
+With --bulk, all linked tickets of every source are resolved in batched
+searches up front, tickets linked from several sources are updated only once,
+and the due date updates are sent through a bounded pool of workers.
+--depth N follows links up to N hops away (through tickets that already have
+a due date too), and --link-types picks which link types are followed; both
+use the link graph index in link_graph.py and imply --bulk.
+
+--journal FILE records the planned and completed updates in FILE, so that
+rerunning the command with it resumes an interrupted run without indexing
+the links or sending any update again (see journal.py); --plan only prints
+the planned updates. Both imply --bulk.
+
+Without --bulk, -j/--concurrency N processes up to N tickets at the same time
+(see ticket_engine.py), each one's steps still in order.
+
 Usage:
-    python sync_due_dates.py TICKET-123 [TICKET-456 TICKET-789 ...]
+    python sync_due_dates.py [--bulk | -j N] [--journal FILE] [--plan] TICKET-123 [TICKET-456 TICKET-789 ...]
 
 Example:
     python sync_due_dates.py EXMP-152
     python sync_due_dates.py EXMP-152 EXMP-153 EXMP-154
+    python sync_due_dates.py --bulk EXMP-152 EXMP-153 EXMP-154
+    python sync_due_dates.py EXMP-152 --depth 3 --link-types Relates Blocks
+    python sync_due_dates.py -j 8 EXMP-152 EXMP-153 EXMP-154
+    python sync_due_dates.py --journal due.jsonl --plan EXMP-152 EXMP-153 EXMP-154
 """
 
-import requests
-from requests.auth import HTTPBasicAuth
-from dotenv import load_dotenv
-import os
+import daemon
+daemon.forward(__name__, __file__)  # With JIRA_DAEMON=1, run in the warm daemon instead
+
 import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+import jira_client
+from jira_client import ISSUE_API_URL
+import issue_cache
+import journal
+import link_graph
+import ticket_engine
+from issue_cache import get_issue
 
-# Load environment variables from .env file
-load_dotenv()
+UPDATE_WORKERS = 8
 
-# Jira API details
-JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
-ISSUE_API_URL = f"https://{JIRA_DOMAIN}/rest/api/2/issue"
+# Links followed by default, and how far
+LINK_TYPES = ["Relates"]
+DEFAULT_DEPTH = 1
 
-# Headers
-HEADERS = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
-
-AUTH = HTTPBasicAuth(os.getenv('JIRA_EMAIL'), os.getenv("JIRA_API_TOKEN"))
-
-def get_issue_details(issue_key):
-    """Fetch detailed information for an issue by its key."""
-    url = f"{ISSUE_API_URL}/{issue_key}"
-    response = requests.get(url, headers=HEADERS, auth=AUTH)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch details for issue {issue_key}. Status code: {response.status_code}")
-        return None
+# The only fields due date syncing reads
+SOURCE_FIELDS = ["duedate", "issuelinks"]
+LINKED_FIELDS = ["duedate"]
 
 def update_issue_due_date(issue_key, due_date):
     """Update the due date of an issue."""
@@ -57,12 +69,7 @@ def update_issue_due_date(issue_key, due_date):
         }
     }
     
-    response = requests.put(
-        url,
-        headers=HEADERS,
-        auth=AUTH,
-        json=payload
-    )
+    response = jira_client.put(url, json=payload)
     
     if response.status_code == 204:  # 204 is success with no content
         return True
@@ -76,7 +83,7 @@ def process_ticket(source_key):
     print(f"\nProcessing ticket: {source_key}")
     
     # Get source issue details
-    source_issue = get_issue_details(source_key)
+    source_issue = get_issue(source_key, SOURCE_FIELDS)
     if not source_issue:
         print(f"Failed to fetch {source_key}")
         return False
@@ -101,33 +108,124 @@ def process_ticket(source_key):
             linked_key = linked_issue['key']
             print(f"Checking related ticket: {linked_key}")
             
-            # Get full details of linked issue
-            linked_details = get_issue_details(linked_key)
-            if not linked_details:
-                continue
-            
-            # Check if linked issue has no due date
-            if not linked_details['fields'].get('duedate'):
-                print(f"Updating due date for {linked_key}")
-                if update_issue_due_date(linked_key, source_due_date):
-                    print(f"Successfully updated due date for {linked_key}")
-                    updated_count += 1
-                else:
-                    print(f"Failed to update due date for {linked_key}")
+            # Another ticket processed at the same time may be updating it too
+            with ticket_engine.key_lock(linked_key):
+                # Get full details of linked issue
+                linked_details = get_issue(linked_key, LINKED_FIELDS)
+                if not linked_details:
+                    continue
+                
+                # Check if linked issue has no due date
+                if not linked_details['fields'].get('duedate'):
+                    print(f"Updating due date for {linked_key}")
+                    if update_issue_due_date(linked_key, source_due_date):
+                        issue_cache.invalidate(linked_key)
+                        print(f"Successfully updated due date for {linked_key}")
+                        updated_count += 1
+                    else:
+                        print(f"Failed to update due date for {linked_key}")
     
     return updated_count > 0
 
+def plan_due_date_updates(source_keys, depth=DEFAULT_DEPTH, link_types=LINK_TYPES):
+    """Work out which linked tickets need a due date, using batched lookups.
+
+    Returns a dict mapping each target key to (source key, due date). A target
+    linked from several sources takes the due date of the first one given.
+    """
+    print(f"\nIndexing links up to {depth} hops from {len(source_keys)} source tickets...")
+    graph = link_graph.build_link_graph(source_keys, link_types, depth)
+    print(f"Checking {len(graph)} tickets...")
+    return link_graph.propagate_due_dates(graph, source_keys, depth)
+
+def apply_update(linked_key, due_date):
+    """Send one due date update, returning whether it succeeded."""
+    if update_issue_due_date(linked_key, due_date):
+        issue_cache.invalidate(linked_key)
+        print(f"Successfully updated due date for {linked_key}")
+        return True
+    return False
+
+def plan_ops(source_keys, depth=DEFAULT_DEPTH, link_types=LINK_TYPES):
+    """Turn the planned due date updates into journal records."""
+    updates = plan_due_date_updates(source_keys, depth, link_types)
+    return [
+        {"op": "duedate", "id": f"duedate {target_key}", "key": target_key, "source": source_key, "duedate": due_date}
+        for target_key, (source_key, due_date) in updates.items()
+    ]
+
+def describe_op(op):
+    """One line of --plan output."""
+    return f"Set due date of {op['key']} to {op['duedate']} (from {op['source']})"
+
+def process_tickets_bulk(source_keys, workers=UPDATE_WORKERS, depth=DEFAULT_DEPTH, link_types=LINK_TYPES,
+                         run_journal=None):
+    """Sync due dates for many tickets at once, returning (key, success) pairs in input order.
+
+    With a journal, a plan recorded by an earlier run is used instead of
+    indexing the links again, and only the updates not yet done are sent.
+    """
+    run_journal = run_journal or journal.Journal()
+    if not run_journal.planned:
+        run_journal.plan(plan_ops(source_keys, depth, link_types))
+
+    pending = run_journal.pending("duedate")
+    if run_journal.finished:
+        print(f"Journal {run_journal.path} is already finished; nothing left to do.")
+    else:
+        print(f"Updating due dates for {len(pending)} tickets...")
+
+    def update(op):
+        if apply_update(op["key"], op["duedate"]):
+            run_journal.complete({op["id"]: op["duedate"]})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(daemon.propagate(update), pending))
+    if not run_journal.finished and not run_journal.pending("duedate"):
+        run_journal.checkpoint(journal.FINISHED)
+
+    updated_sources = {op["source"] for op in run_journal.ops if run_journal.is_done(op["id"])}
+    return [(key, key in updated_sources) for key in source_keys]
+
 def main():
     parser = argparse.ArgumentParser(description='Sync due dates between related Jira tickets.')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Resolve all related tickets in batched searches and update them concurrently')
+    parser.add_argument('--workers', type=int, default=UPDATE_WORKERS,
+                        help=f'Concurrent due date updates in bulk mode (default {UPDATE_WORKERS})')
+    parser.add_argument('--depth', type=int,
+                        help=f'Follow links up to this many hops from each ticket (default {DEFAULT_DEPTH}; implies --bulk)')
+    parser.add_argument('--link-types', nargs='+', metavar='TYPE',
+                        help=f'Link types to follow (default {" ".join(LINK_TYPES)}; implies --bulk)')
+    ticket_engine.add_arguments(parser)
+    journal.add_arguments(parser)
     parser.add_argument('tickets', nargs='+', help='One or more ticket keys to process')
     
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
+    instrumentation.setup(args)
     source_keys = [key.upper() for key in args.tickets]
     
-    results = []
-    for key in source_keys:
-        success = process_ticket(key)
-        results.append((key, success))
+    depth = args.depth if args.depth is not None else DEFAULT_DEPTH
+    link_types = args.link_types or LINK_TYPES
+    if args.journal or args.plan:
+        try:
+            run_journal = journal.open_journal(
+                args.journal, {"script": "sync_due_dates", "depth": depth, "link_types": link_types, "tickets": source_keys}
+            )
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if args.plan:
+            if not run_journal.planned:
+                run_journal.plan(plan_ops(source_keys, depth, link_types))
+            journal.print_plan(run_journal, describe_op)
+            return
+        results = process_tickets_bulk(source_keys, args.workers, depth, link_types, run_journal)
+    elif args.bulk or args.depth is not None or args.link_types:
+        results = process_tickets_bulk(source_keys, args.workers, depth, link_types)
+    else:
+        results = ticket_engine.run_tickets(process_ticket, source_keys, args.concurrency)
     
     # Print summary
     print("\nSummary:")
@@ -0,0 +1,57 @@
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "bench")]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# The scripts read their settings (and build their URLs) at import time, so the
+# mock always listens on the same port
+MOCK_PORT = _free_port()
+os.environ.update({
+    "JIRA_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "JIRA_DOMAIN": "mock.atlassian.net",
+    "JIRA_EMAIL": "test@example.com",
+    "JIRA_API_TOKEN": "test",
+    "JIRA_DAEMON": "0",
+})
+
+import mock_jira
+
+@pytest.fixture
+def mock_server():
+    """A mock Jira with a small dataset, served from a background thread."""
+    server = mock_jira.start_in_thread(mock_jira.Dataset(issues=50), port=MOCK_PORT)
+    yield server
+    server.shutdown()
+    server.server_close()
+    # Pooled keep-alive connections would still reach this server's handler threads
+    jira_client = sys.modules.get("jira_client")
+    if jira_client and jira_client._session:
+        jira_client._session.close()
+        jira_client._session = None
+
+@pytest.fixture
+def run_script(mock_server, tmp_path):
+    """Run a script against the mock with empty caches; returns the finished process."""
+    env = dict(os.environ)
+    env.update({
+        "JIRA_BASE_URL": mock_server.base_url,
+        "JIRA_CACHE_PATH": str(tmp_path / "issues.sqlite"),
+        "JIRA_BOARD_CACHE_PATH": str(tmp_path / "boards.sqlite"),
+    })
+
+    def run(*argv, stdin=None):
+        process = subprocess.run([sys.executable, *argv], cwd=ROOT, env=env, input=stdin,
+                                 capture_output=True, text=True, timeout=60)
+        assert process.returncode == 0, process.stderr
+        return process
+    return run
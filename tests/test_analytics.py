@@ -0,0 +1,47 @@
+import pytest
+
+import analytics
+
+ROWS = [
+    {"sprint_id": "1", "key": "A-1", "status": "Done", "assignee": "ann", "story_points": 3},
+    {"sprint_id": "1", "key": "A-2", "status": "Done", "assignee": "bob", "story_points": 5},
+    {"sprint_id": "1", "key": "A-3", "status": "To Do", "assignee": "ann", "story_points": 2},
+    {"sprint_id": "2", "key": "A-4", "status": "Done", "assignee": "ann", "story_points": 1.5},
+    {"sprint_id": "2", "key": "A-5", "status": "To Do", "assignee": None, "story_points": None},
+]
+
+@pytest.fixture
+def csv_fallback(monkeypatch):
+    monkeypatch.setattr(analytics, "pyarrow", None)
+
+def test_group_by_through_csv_fallback(csv_fallback, tmp_path, capsys):
+    path = analytics.write_table(analytics.to_table(ROWS), str(tmp_path / "tickets.parquet"))
+    assert path.endswith(".csv")
+    table = analytics.read_table(path, ["status", "assignee", "story_points"])
+    assert isinstance(table, dict)
+
+    assert analytics.group_by(table, ["status", "assignee"]) == [
+        (("Done", "bob"), 1, 5.0),
+        (("Done", "ann"), 2, 4.5),
+        (("To Do", "ann"), 1, 2.0),
+        (("To Do", ""), 1, 0.0),
+    ]
+
+    done = analytics.filter_rows(table, [("status", "Done")])
+    assert analytics.group_by(done, ["assignee"]) == [(("bob",), 1, 5.0), (("ann",), 2, 4.5)]
+
+def test_group_by_many_distinct_groups_does_not_overflow(csv_fallback):
+    # 4 columns of 2**16 distinct values each: a mixed-radix code would need 64 bits
+    size = 2 ** 16
+    rows = [
+        {"sprint_id": str(i), "key": f"A-{i}", "status": f"s{i}", "assignee": f"u{i}", "story_points": 1}
+        for i in range(size)
+    ]
+    table = analytics.to_table(rows)
+    results = analytics.group_by(table, ["sprint_id", "key", "status", "assignee"])
+    assert len(results) == size
+    assert results[-1][0] == (f"{size - 1}", f"A-{size - 1}", f"s{size - 1}", f"u{size - 1}")
+
+def test_group_by_rejects_unknown_columns(csv_fallback):
+    with pytest.raises(ValueError):
+        analytics.group_by(analytics.to_table(ROWS), ["priority"])
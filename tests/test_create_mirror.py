@@ -0,0 +1,25 @@
+def test_indexed_rerun_fetches_no_mirrored_sources(mock_server, run_script):
+    keys = sorted(mock_server.dataset.issues)[:30]
+    run_script("create_mirror.py", "-b", "DEV", "--bulk", *keys)
+
+    mock_server.stats.reset()
+    process = run_script("create_mirror.py", "-b", "DEV", "--index", "--ndjson", stdin="\n".join(keys))
+
+    assert process.stdout == ""  # No new mirrors
+    endpoints = mock_server.stats.snapshot()["endpoints"]
+    # The link types and one search page for the index
+    assert sorted(endpoints) == ["GET /rest/api/2/issueLinkType", "POST /rest/api/2/search"]
+    assert endpoints["POST /rest/api/2/search"]["requests"] == 1
+
+def test_index_only_reads_issues_with_mirror_links(mock_server, run_script):
+    keys = sorted(mock_server.dataset.issues)[:5]
+    run_script("create_mirror.py", "-b", "DEV", *keys)
+    for _ in range(250):  # Three pages of unlinked issues on the target board
+        mock_server.dataset.create_issue({"project": {"key": "DEV"}, "summary": "Unrelated"})
+
+    mock_server.stats.reset()
+    run_script("create_mirror.py", "-b", "DEV", "--index", *keys)
+
+    endpoints = mock_server.stats.snapshot()["endpoints"]
+    assert endpoints["POST /rest/api/2/search"]["requests"] == 1
+    assert "GET /rest/api/2/issue/{key}" not in endpoints
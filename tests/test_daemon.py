@@ -0,0 +1,71 @@
+import json
+import os
+import stat
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import daemon
+
+from conftest import ROOT
+
+@pytest.fixture
+def daemon_env(mock_server, tmp_path):
+    """Settings that forward the scripts to a daemon of their own, serving the mock."""
+    env = dict(os.environ)
+    env.update({
+        "JIRA_BASE_URL": mock_server.base_url,
+        "JIRA_DAEMON": "1",
+        "JIRA_DAEMON_SOCKET": str(tmp_path / "daemon.sock"),
+        "JIRA_CACHE_PATH": str(tmp_path / "issues.sqlite"),
+        "JIRA_BOARD_CACHE_PATH": str(tmp_path / "boards.sqlite"),
+        "JIRA_SPRINT_STORE_PATH": str(tmp_path / "sprints.sqlite"),
+        "JIRA_CHANGELOG_STORE_PATH": str(tmp_path / "changelogs.sqlite"),
+    })
+    yield env
+    subprocess.run([sys.executable, "daemon.py", "stop"], cwd=ROOT, env=env, capture_output=True)
+
+def test_ndjson_pipeline_through_daemon(daemon_env):
+    python = sys.executable
+    process = subprocess.run(
+        f"{python} my_todos.py 69 --ndjson | {python} create_mirror.py -b DEV --ndjson",
+        shell=True, cwd=ROOT, env=daemon_env, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 0, process.stderr
+    assert "not iterable" not in process.stderr
+    records = [json.loads(line) for line in process.stdout.splitlines()]
+    assert records
+    assert all(record["key"].startswith("DEV-") for record in records)
+    assert os.path.exists(daemon_env["JIRA_DAEMON_SOCKET"])  # The commands ran in the daemon
+    assert stat.S_IMODE(os.stat(daemon_env["JIRA_DAEMON_SOCKET"]).st_mode) == 0o600
+
+def test_propagate_hands_the_command_to_worker_threads():
+    command = {"argv": ["extract.py"]}
+
+    def run():
+        token = daemon._command.set(command)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                wrapped = list(executor.map(daemon.propagate(lambda _: daemon.current_command()), range(4)))
+                bare = list(executor.map(lambda _: daemon.current_command(), range(4)))
+        finally:
+            daemon._command.reset(token)
+        return wrapped, bare
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        wrapped, bare = executor.submit(run).result()
+    assert all(found is command for found in wrapped)
+    assert bare == [None] * 4
+    assert daemon.current_command() is None
+
+def test_projection_report_runs_in_process(daemon_env):
+    daemon_env["JIRA_PROJECTION_REPORT"] = "1"
+    process = subprocess.run(
+        [sys.executable, "show_description.py", "SRC-1"],
+        cwd=ROOT, env=daemon_env, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 0, process.stderr
+    assert "projection" in (process.stdout + process.stderr).lower()
+    assert not os.path.exists(daemon_env["JIRA_DAEMON_SOCKET"])  # No daemon was started
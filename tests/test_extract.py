@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+import extract
+import jira_client
+import sprint_store
+
+def test_hierarchy_counts_leaves_at_every_depth(mock_server):
+    dataset = mock_server.dataset
+    children = {}
+    for key, issue in dataset.issues.items():
+        parent_key = (issue["fields"].get("parent") or {}).get("key")
+        if parent_key:
+            children.setdefault(parent_key, []).append(key)
+    # Put an epic in the sprint, so its stories and their subtasks are two levels down
+    epic = next(key for key, issue in dataset.issues.items() if issue["fields"]["issuetype"]["name"] == "Epic"
+                and any(children.get(story) for story in children.get(key, ())))
+    dataset.sprint_of[epic] = 750
+    sprint_keys = {key for key, sprint_id in dataset.sprint_of.items() if sprint_id == 750}
+
+    tickets = extract.collect_hierarchy_tickets("750")
+
+    keys = [ticket["key"] for ticket in tickets]
+    assert len(keys) == len(set(keys))
+    assert all(key not in children for key in keys)
+    top_level = [key for key in sprint_keys
+                 if (dataset.issues[key]["fields"].get("parent") or {}).get("key") not in sprint_keys]
+    reached, pending = set(), list(top_level)
+    while pending:
+        key = pending.pop()
+        reached.add(key)
+        pending.extend(children.get(key, ()))
+    assert set(keys) == {key for key in reached if key not in children}
+    under_epic, pending = set(), list(children[epic])
+    while pending:
+        key = pending.pop()
+        under_epic.add(key)
+        pending.extend(children.get(key, ()))
+    epic_tickets = [ticket for ticket in tickets if ticket["key"] in under_epic]
+    assert epic_tickets and all(ticket["epic"] == epic for ticket in epic_tickets)
+
+@pytest.fixture
+def sprint_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(sprint_store, "STORE_PATH", str(tmp_path / "sprints.sqlite"))
+    db = sprint_store.connect()
+    yield db
+    db.close()
+
+@pytest.fixture
+def searches(monkeypatch):
+    """The JQL of every search the extract module runs."""
+    queries = []
+    iter_search = jira_client.iter_search
+
+    def recording_iter_search(jql, *args, **kwargs):
+        queries.append(jql)
+        return iter_search(jql, *args, **kwargs)
+
+    monkeypatch.setattr(jira_client, "iter_search", recording_iter_search)
+    return queries
+
+def stored_totals(db, sprint_id):
+    return len(sprint_store.get_tickets(db, sprint_id)), dict(sprint_store.story_points_by_status(db, sprint_id))
+
+def test_incremental_sync_follows_changes_and_removals(mock_server, sprint_db, searches):
+    dataset = mock_server.dataset
+    assert extract.sync_sprint(sprint_db, "750") > 0
+    assert stored_totals(sprint_db, "750") == extract.collect_sprint_totals("750")
+    assert sprint_store.get_last_full_scan(sprint_db, "750") is not None
+
+    stories = [key for key, sprint_id in dataset.sprint_of.items() if sprint_id == 750
+               and not dataset.issues[key]["fields"].get("parent")]
+    done, moved = stories[0], stories[1]
+    for subtask_key in [done] + [s["key"] for s in dataset.issues[done]["fields"]["subtasks"]]:
+        dataset.transition(subtask_key, "10002")
+    for key in [moved] + [s["key"] for s in dataset.issues[moved]["fields"]["subtasks"]]:
+        del dataset.sprint_of[key]
+        dataset.touch(key)
+    searches.clear()
+
+    extract.sync_sprint(sprint_db, "750")
+
+    assert moved not in sprint_store.stored_issue_keys(sprint_db, "750")
+    assert stored_totals(sprint_db, "750") == extract.collect_sprint_totals("750")
+    assert "sprint = 750" not in searches  # No full membership scan between the daily ones
+
+def test_incremental_sync_rescans_membership_daily(mock_server, sprint_db, searches):
+    dataset = mock_server.dataset
+    extract.sync_sprint(sprint_db, "750")
+    # An issue that disappears from the sprint without being updated, as a deleted one does
+    gone = next(key for key, sprint_id in dataset.sprint_of.items() if sprint_id == 750
+                and not dataset.issues[key]["fields"].get("subtasks"))
+    del dataset.sprint_of[gone]
+
+    extract.sync_sprint(sprint_db, "750")
+    assert gone in sprint_store.stored_issue_keys(sprint_db, "750")
+
+    sprint_store.set_last_full_scan(sprint_db, "750", time.time() - extract.FULL_SCAN_HOURS * 3600)
+    searches.clear()
+    extract.sync_sprint(sprint_db, "750")
+    assert "sprint = 750" in searches
+    assert gone not in sprint_store.stored_issue_keys(sprint_db, "750")
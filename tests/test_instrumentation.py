@@ -0,0 +1,26 @@
+import urllib.request
+
+import extract
+import instrumentation
+
+def test_endpoint_template_keeps_api_version():
+    assert instrumentation.endpoint_template("GET", "https://x/rest/api/2/issue/SRC-12/changelog") == \
+        "GET /rest/api/2/issue/{key}/changelog"
+    assert instrumentation.endpoint_template("GET", "https://x/rest/agile/1.0/sprint/750/issue?startAt=50") == \
+        "GET /rest/agile/1.0/sprint/{id}/issue"
+    assert instrumentation.endpoint_template("POST", "https://x/rest/api/3/search") == "POST /rest/api/3/search"
+
+def test_streamed_response_counts_bytes_read(mock_server, monkeypatch):
+    monkeypatch.setattr(instrumentation, "_enabled", True)
+    monkeypatch.setattr(instrumentation, "_endpoints", {})
+    monkeypatch.setattr(instrumentation, "_trace", [])
+
+    extract.get_sprint_page("750", 0)
+
+    fields = ",".join(extract.SPRINT_ISSUE_FIELDS)
+    url = f"{mock_server.base_url}/rest/agile/1.0/sprint/750/issue?startAt=0&maxResults={extract.MAX_RESULTS}&fields={fields}"
+    with urllib.request.urlopen(url) as response:
+        size = len(response.read())
+    template = "GET /rest/agile/1.0/sprint/{id}/issue"
+    assert instrumentation.summary()["endpoints"][template]["bytes_in"] == size
+    assert instrumentation._trace[0]["args"]["bytes_in"] == size
@@ -0,0 +1,40 @@
+import threading
+
+import daemon
+import issue_cache
+
+def run_as_command(command, target):
+    """Run target in a thread working for a daemon command, as daemon.run_command does."""
+    def run():
+        daemon._command.set(command)
+        target()
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+def test_daemon_commands_keep_separate_memos():
+    issue = {"key": "DEV-1", "fields": {"summary": "Mirror", "updated": "2026-10-01T00:00:00.000+0000"}}
+    first, second = {}, {}
+    found = {}
+
+    run_as_command(first, lambda: issue_cache.remember([issue]))
+    run_as_command(second, issue_cache.forget_run)
+    run_as_command(first, lambda: found.update(issue_cache.get_issues(["DEV-1"], ["summary"])))
+
+    assert found == {"DEV-1": issue}
+    assert "DEV-1" not in second.get("issue_memo", {})
+    assert "DEV-1" not in issue_cache._memo
+
+def test_remembered_record_only_covers_its_own_fields():
+    issue = {"key": "DEV-2", "fields": {"summary": "Mirror", "description": ""}}
+    command = {}
+    found = {}
+
+    def read():
+        issue_cache.remember([issue])
+        found["memo"] = dict(issue_cache._run_memo())
+        found["summary"] = issue_cache.get_issues(["DEV-2"], ["summary"])
+    run_as_command(command, read)
+
+    assert found["memo"]["DEV-2"][0] == {"summary", "description"}
+    assert found["summary"] == {"DEV-2": issue}
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from issue_records import IssueRecord, read_page
+
+PAGE = {
+    "startAt": 0,
+    "maxResults": 50,
+    "total": 3,
+    "issues": [
+        {"key": "SRC-1", "fields": {"summary": "Café ☕ über 12.5", "status": {"name": "Done"},
+                                    "customfield_10016": 12.5, "subtasks": [{"key": "SRC-2"}]}},
+        {"key": "SRC-2", "fields": {"summary": "", "status": {"name": "To Do"}, "customfield_10016": 1e3,
+                                    "parent": {"key": "SRC-1"}, "flags": [True, False, None, -3, 0.25e-2]}},
+        {"key": "SRC-3", "fields": {"customfield_10016": 123456789012}},
+    ],
+    "names": {"nested": {"deep": [1, [2, [3]]]}},
+    "isLast": True,
+}
+
+class ChunkedResponse:
+    """A streamed response whose body arrives in chunks of a fixed size."""
+
+    def __init__(self, body, size):
+        self.body = body
+        self.size = size
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), self.size):
+            yield self.body[i:i + self.size]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_read_page_across_chunk_boundaries(size):
+    # The chunks split numbers ("12." | "5"), literals, strings and multi-byte characters
+    body = json.dumps(PAGE, ensure_ascii=False, separators=(",", ":")).encode()
+
+    page = read_page(ChunkedResponse(body, size), convert=lambda issue: issue)
+
+    assert page.pop("_bytes") == len(body)
+    assert page == PAGE
+
+def test_read_page_builds_records_from_split_numbers():
+    body = json.dumps(PAGE, indent=2).encode()  # Escaped characters and whitespace between tokens
+
+    page = read_page(ChunkedResponse(body, 1))
+
+    records = page["issues"]
+    assert [record.key for record in records] == ["SRC-1", "SRC-2", "SRC-3"]
+    assert [record.story_points for record in records] == [12.5, 1000.0, 123456789012]
+    assert records[0].summary == "Café ☕ über 12.5"
+    assert records[0].subtask_keys == ("SRC-2",)
+    assert records[1].parent_key == "SRC-1"
+    assert all(isinstance(record, IssueRecord) for record in records)
+
+def test_read_page_rejects_a_truncated_body():
+    body = json.dumps(PAGE).encode()[:-20]
+    with pytest.raises(ValueError):
+        read_page(ChunkedResponse(body, 3), convert=lambda issue: issue)
@@ -0,0 +1,14 @@
+import io
+
+import issue_stream
+
+def test_records_without_a_key_are_skipped(capsys):
+    stream = io.StringIO(
+        '{"fields": {"summary": "No key"}}\n'
+        '{"key": "src-1", "fields": {"summary": "Kept"}}\n'
+        '[1, 2]\n'
+        'SRC-2 SRC-3\n'
+    )
+    keys = [issue["key"] for issue in issue_stream.read_issues(stream)]
+    assert keys == ["SRC-1", "SRC-2", "SRC-3"]
+    assert capsys.readouterr().err.count("Skipping record without an issue key") == 1
@@ -0,0 +1,42 @@
+import journal
+
+def dev_links(dataset, key):
+    links = dataset.issues[key]["fields"]["issuelinks"]
+    linked = [(link.get("outwardIssue") or link.get("inwardIssue"))["key"] for link in links]
+    return [other for other in linked if other.startswith("DEV-")]
+
+def test_resume_sends_only_the_unfinished_ops(mock_server, run_script, tmp_path):
+    dataset = mock_server.dataset
+    keys = sorted(dataset.issues)[:3]
+    path = str(tmp_path / "mirror.jsonl")
+    run_script("create_mirror.py", "-b", "DEV", "--journal", path, "--plan", *keys)
+
+    # An earlier run created the first mirror but died before linking it, and
+    # finished the second one, while writing its next record
+    plan = journal.Journal(path)
+    payloads = {op["source"]: op["payload"] for op in plan.ops if op["op"] == "create"}
+    assert sorted(payloads) == keys
+    created = dataset.create_issue(payloads[keys[0]]["fields"])["key"]
+    plan.complete({f"create {keys[0]}": created})
+    linked = dataset.create_issue(payloads[keys[1]]["fields"])["key"]
+    dataset.add_link(keys[1], linked, "Relates")
+    plan.complete({f"create {keys[1]}": linked, f"link {keys[1]}": linked})
+    with open(path, "a") as f:
+        f.write('{"type": "done", "id": "create')
+
+    mock_server.stats.reset()
+    run_script("create_mirror.py", "-b", "DEV", "--journal", path, *keys)
+
+    endpoints = mock_server.stats.snapshot()["endpoints"]
+    assert "POST /rest/api/2/search" not in endpoints  # The plan wasn't worked out again
+    assert "GET /rest/api/2/issue/{key}" not in endpoints
+    assert endpoints["POST /rest/api/2/issueLink"]["requests"] == 2
+    assert [dev_links(dataset, key) for key in keys[:2]] == [[created], [linked]]
+    assert len(dev_links(dataset, keys[2])) == 1
+    assert len([key for key in dataset.issues if key.startswith("DEV-")]) == 3
+    assert journal.Journal(path).finished
+
+    mock_server.stats.reset()
+    process = run_script("create_mirror.py", "-b", "DEV", "--journal", path, *keys)
+    assert "already finished" in process.stderr
+    assert not any(endpoint.startswith("POST") for endpoint in mock_server.stats.snapshot()["endpoints"])
@@ -0,0 +1,33 @@
+import time
+
+import jira_client
+import scheduler
+
+def test_get_429_reaches_scheduler(mock_server, monkeypatch):
+    """urllib3 must not retry a throttled GET itself; the scheduler has to see the 429 and pause."""
+    mock_server.throttle.ratio_429 = 1.0
+    requests_scheduler = scheduler.RequestScheduler(rate=100, burst=100, max_concurrency=4, max_retries=0)
+    monkeypatch.setattr(jira_client, "SCHEDULER", requests_scheduler)
+
+    response = jira_client.get(f"{mock_server.base_url}/rest/api/2/issue/SRC-1")
+
+    assert response.status_code == 429
+    assert requests_scheduler.paused_until > time.monotonic()
+    assert requests_scheduler.rate == 50
+    assert mock_server.stats.snapshot()["endpoints"]["GET /rest/api/2/issue/{key}"]["requests"] == 1
+
+def test_latency_baseline_is_per_endpoint():
+    """A slow search after a fast PUT is not congestion; a slow PUT after a fast PUT is."""
+    requests_scheduler = scheduler.RequestScheduler(rate=100, burst=100, max_concurrency=8, max_retries=0)
+    limit = requests_scheduler.limit
+
+    requests_scheduler._acquire()
+    requests_scheduler._release(0.004, False, 0.0, "PUT /rest/api/2/issue/{key}")
+    requests_scheduler._acquire()
+    requests_scheduler._release(0.2, False, 0.0, "POST /rest/api/2/search")
+    assert requests_scheduler.limit > limit
+
+    limit = requests_scheduler.limit
+    requests_scheduler._acquire()
+    requests_scheduler._release(0.2, False, 0.0, "PUT /rest/api/2/issue/{key}")
+    assert requests_scheduler.limit < limit
@@ -0,0 +1,50 @@
+import pytest
+
+DUE = "2026-12-01"
+OWN_DUE = "2026-11-15"
+
+@pytest.fixture
+def chain(mock_server):
+    """source -R- one -R- dated -R- three -R- four, and source -Blocks- blocked.
+
+    Only the source and `dated` have a due date; `dated` has its own.
+    """
+    dataset = mock_server.dataset
+
+    def issue(due_date=None):
+        return dataset.create_issue({"project": {"key": "SRC"}, "summary": "Chained", "duedate": due_date})["key"]
+
+    keys = {"source": issue(DUE), "one": issue(), "dated": issue(OWN_DUE), "three": issue(), "four": issue(),
+            "blocked": issue()}
+    for inward, outward in [("source", "one"), ("one", "dated"), ("dated", "three"), ("three", "four")]:
+        dataset.add_link(keys[inward], keys[outward], "Relates")
+    dataset.add_link(keys["source"], keys["blocked"], "Blocks")
+    return keys
+
+def due_dates(mock_server, keys):
+    return {name: mock_server.dataset.issues[key]["fields"]["duedate"] for name, key in keys.items()}
+
+def test_depth_propagates_through_dated_tickets(mock_server, run_script, chain):
+    run_script("sync_due_dates.py", "--depth", "3", chain["source"])
+
+    assert due_dates(mock_server, chain) == {
+        "source": DUE, "one": DUE, "dated": OWN_DUE, "three": DUE,
+        "four": None,  # Four hops away
+        "blocked": None,  # Blocks links aren't followed by default
+    }
+
+def test_link_types_pick_the_links_followed(mock_server, run_script, chain):
+    run_script("sync_due_dates.py", chain["source"], "--depth", "2", "--link-types", "Blocks")
+
+    assert due_dates(mock_server, chain) == {
+        "source": DUE, "one": None, "dated": OWN_DUE, "three": None, "four": None, "blocked": DUE,
+    }
+
+def test_default_depth_is_one_hop(mock_server, run_script, chain):
+    mock_server.stats.reset()
+    run_script("sync_due_dates.py", "--bulk", chain["source"])
+
+    assert due_dates(mock_server, chain)["one"] == DUE
+    assert due_dates(mock_server, chain)["three"] is None
+    endpoints = mock_server.stats.snapshot()["endpoints"]
+    assert endpoints["PUT /rest/api/2/issue/{key}"]["requests"] == 1
@@ -0,0 +1,33 @@
+from collections import Counter
+
+import mock_jira
+import replay_events
+import webhook
+
+def test_replay_leaves_nothing_for_cron_and_one_mirror_per_source():
+    args = replay_events.parse_args(["--generate", "150", "--hot", "20", "--issues", "300", "--mirror"])
+    result = replay_events.run_generated(args)
+
+    cron_writes = [name for name in result["cron_requests"]["endpoints"] if name.startswith("PUT")]
+    assert cron_writes == []
+
+    dataset = result["dataset"]
+    mirrors = [issue for issue in dataset.issues.values()
+               if issue["fields"]["project"]["key"] == mock_jira.TARGET_PROJECT]
+    sources = Counter(
+        (link.get("inwardIssue") or link.get("outwardIssue"))["key"]
+        for mirror in mirrors for link in mirror["fields"]["issuelinks"]
+    )
+    assert mirrors and len(mirrors) == result["status"]["mirrors_created"]
+    assert all(count == 1 for count in sources.values()), sources.most_common(3)
+    for mirror in mirrors:
+        (source_key,) = [(link.get("inwardIssue") or link.get("outwardIssue"))["key"]
+                         for link in mirror["fields"]["issuelinks"]]
+        assert mirror["fields"].get("duedate") == dataset.issues[source_key]["fields"].get("duedate")
+
+def test_link_event_without_issue_ids_is_skipped():
+    receiver = webhook.Receiver()
+    receiver.handle({"webhookEvent": "issuelink_created",
+                     "issueLink": {"id": 1, "sourceIssueId": 10001, "issueLinkType": {"name": "Relates"}}})
+    assert receiver.status()["ignored"] == 1
+    assert receiver.queue.pending == {}
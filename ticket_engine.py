@@ -0,0 +1,56 @@
+"""
+Ticket Engine
+
+Runs a per-ticket workflow (fetch, check, create, link, update) for many
+tickets concurrently on an asyncio event loop. A semaphore bounds how many
+tickets are in progress at once; each ticket's steps still run one after the
+other, in a worker thread, since the shared HTTP client is blocking. Results
+come back in input order so the scripts' summary tables don't change.
+
+Workflows that touch an issue shared by several tickets (the same source
+given twice, or a ticket related to several sources) hold key_lock() for it
+around their check-then-change steps.
+"""
+
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 1
+
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+def key_lock(issue_key):
+    """Return the lock serialising changes to one issue across concurrent tickets."""
+    with _key_locks_lock:
+        return _key_locks.setdefault(issue_key, threading.Lock())
+
+async def _run_all(process, keys, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(key):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(process, key)
+            except Exception as e:
+                print(f"Failed to process {key}: {e}", file=sys.stderr)
+                return False
+
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    return await asyncio.gather(*(run_one(key) for key in keys))
+
+def run_tickets(process, keys, concurrency=DEFAULT_CONCURRENCY):
+    """Call process(key) for every key, at most `concurrency` at a time.
+
+    Returns (key, result) pairs in input order; a ticket whose workflow raised
+    gets False.
+    """
+    results = asyncio.run(_run_all(process, keys, max(1, concurrency)))
+    return list(zip(keys, results))
+
+def add_arguments(parser):
+    """Add the -j/--concurrency flag to a multi-ticket script's parser."""
+    parser.add_argument('-j', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Tickets processed at the same time (default {DEFAULT_CONCURRENCY})')
@@ -0,0 +1,455 @@
+"""
+Webhook Receiver
+
+A small local service that takes Jira webhook events instead of polling.
+Running sync_due_dates.py and create_mirror.py from cron over long key lists
+re-reads every issue each time; the receiver only touches the issues Jira says
+changed.
+
+Handled events (register the receiver's URL as a Jira webhook for them):
+    jira:issue_updated, jira:issue_created
+        due date or link changes sync the issue's linked tickets' due dates
+        (or, if it has no due date left, its own from theirs);
+        with --mirror-to, new or changed issues of the --mirror-from projects
+        get a mirror if they have none yet, and their mirror's summary,
+        description and due date follow changes to theirs
+    issuelink_created
+        syncs due dates between the two linked issues
+
+Events are coalesced per issue: an issue is processed once it has been quiet
+for --debounce seconds (or at the latest --max-wait seconds after its first
+event), however many events arrived for it meanwhile, and all issues that are
+ready are processed together in one batch. Issue events carry the whole issue,
+so due date syncs don't fetch those issues again; issues only known from link
+events are looked up in one `id in (...)` search per batch. Mirrors are the
+exception: an event's copy can predate a mirror or an edit, so the sources to
+mirror are read again in one search per batch, and mirrors the receiver
+created are remembered. Events Jira sends back for the receiver's own changes
+are recognised and ignored.
+
+GET /status returns counters and the number of issues still waiting, which
+bench/replay_events.py uses to replay recorded or generated events against a
+local mock Jira instead of a live one.
+
+Usage:
+    python webhook.py [--host 127.0.0.1] [--port 8765] [--mirror-to BOARD --mirror-from PROJECT ...]
+                      [--no-due-dates] [--debounce SECONDS] [--max-wait SECONDS] [--secret SECRET]
+                      [--record FILE]
+
+Example:
+    python webhook.py --port 8765 --mirror-to DEV --mirror-from EXMP
+    python bench/replay_events.py events.ndjson --receiver http://127.0.0.1:8765
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import create_mirror
+import instrumentation
+import issue_cache
+import jira_client
+import journal
+import link_graph
+import sync_due_dates
+from jira_client import SEARCH_BATCH_SIZE
+
+DEFAULT_PORT = 8765
+DEBOUNCE = 2.0
+MAX_WAIT = 30.0
+
+# How long a change made by the receiver itself is expected to come back as an event
+ECHO_WINDOW = 300.0
+
+# Changelog fields that make an issue's linked tickets need a due date sync
+DUE_DATE_FIELDS = {"duedate", "Link"}
+
+# Actions an issue can be queued for
+DUE_DATES = "due_dates"
+MIRROR = "mirror"
+MIRROR_FIELDS_CHANGED = "mirror_fields"
+
+class Coalescer:
+    """Pending work per issue id, released once the issue has been quiet for a while."""
+
+    def __init__(self, debounce=DEBOUNCE, max_wait=MAX_WAIT):
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.pending = {}
+        self.working = False  # A batch has been taken and not reported done yet
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def add(self, issue_id, actions=(), key=None, issue=None, link=None):
+        """Queue actions for an issue; its latest copy and every link event are kept."""
+        now = time.monotonic()
+        with self.condition:
+            entry = self.pending.get(issue_id)
+            if entry is None:
+                entry = self.pending[issue_id] = {
+                    "key": None, "issue": None, "actions": set(), "links": set(), "first": now, "events": 0
+                }
+            entry["last"] = now
+            entry["events"] += 1
+            entry["actions"].update(actions)
+            entry["key"] = key or entry["key"]
+            # Jira doesn't guarantee delivery order, so keep the most recently updated copy
+            if issue and (not entry["issue"] or
+                          issue["fields"].get("updated", "") >= entry["issue"]["fields"].get("updated", "")):
+                entry["issue"] = issue
+            if link:
+                entry["links"].add(link)
+            self.condition.notify()
+
+    def _ready_at(self, entry, debounce=None):
+        return min(entry["last"] + (self.debounce if debounce is None else debounce), entry["first"] + self.max_wait)
+
+    def take(self):
+        """Wait until some issues are ready and return them as {issue id: entry}.
+
+        Issues that have been quiet for half the debounce time join the batch
+        too, rather than each getting its own round of requests moments later.
+        After close() everything still pending is returned at once, then None.
+        """
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.closed and not self.pending:
+                    return None
+                if self.closed or any(self._ready_at(entry) <= now for entry in self.pending.values()):
+                    ready = [issue_id for issue_id, entry in self.pending.items()
+                             if self.closed or self._ready_at(entry, self.debounce / 2) <= now]
+                    self.working = True
+                    return {issue_id: self.pending.pop(issue_id) for issue_id in ready}
+                wake_at = min((self._ready_at(entry) for entry in self.pending.values()), default=None)
+                self.condition.wait(None if wake_at is None else wake_at - now)
+
+    def done(self):
+        """Report that the last batch taken has been processed."""
+        with self.condition:
+            self.working = False
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+class EchoFilter:
+    """Changes the receiver made itself, so the events Jira sends back for them can be ignored."""
+
+    def __init__(self, window=ECHO_WINDOW):
+        self.window = window
+        self.expected = {}  # (issue key, changelog field) -> (value, expiry)
+        self.links = {}  # frozenset of two issue keys -> expiry
+        self.lock = threading.Lock()
+
+    def expect(self, key, field, value):
+        with self.lock:
+            self.expected[(key, field)] = (value, time.monotonic() + self.window)
+
+    def expect_link(self, key, other_key):
+        self.expect(key, "Link", other_key)
+        self.expect(other_key, "Link", key)
+        with self.lock:
+            self.links[frozenset((key, other_key))] = time.monotonic() + self.window
+
+    def is_echo(self, key, items):
+        """Whether every changelog item of an issue event is a change the receiver made."""
+        now = time.monotonic()
+        with self.lock:
+            matched = []
+            for item in items:
+                value, expiry = self.expected.get((key, item.get("field")), (None, 0))
+                if expiry < now or value not in (item.get("to"), item.get("toString")):
+                    return False
+                matched.append((key, item.get("field")))
+            for match in matched:
+                del self.expected[match]
+            return bool(matched)
+
+    def is_link_echo(self, key, other_key):
+        with self.lock:
+            # Both ends of the link report it, so the entry stays until it expires
+            return self.links.get(frozenset((key, other_key)), 0) >= time.monotonic()
+
+def verify_signature(secret, body, signature):
+    """Check a `sha256=<hex>` X-Hub-Signature header against the request body."""
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+class Receiver:
+    """Turns webhook events into queued actions and applies them batch by batch."""
+
+    def __init__(self, mirror_to=None, mirror_from=(), labels=None, due_dates=True,
+                 link_types=sync_due_dates.LINK_TYPES, depth=sync_due_dates.DEFAULT_DEPTH,
+                 debounce=DEBOUNCE, max_wait=MAX_WAIT):
+        self.mirror_to = mirror_to
+        self.mirror_from = set(mirror_from)
+        self.labels = labels
+        self.due_dates = due_dates
+        self.link_types = link_types
+        self.depth = depth
+        self.queue = Coalescer(debounce, max_wait)
+        self.echoes = EchoFilter()
+        self.mirrors = {}  # Source key -> mirror key, for the mirrors created by the receiver
+        self.counts = dict(events=0, ignored=0, echoes=0, batches=0, issues=0,
+                           due_date_updates=0, mirrors_created=0, mirrors_updated=0)
+        self.lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counts[name] += n
+
+    def status(self):
+        with self.lock, self.queue.condition:
+            return dict(self.counts, pending=len(self.queue.pending), busy=self.queue.working)
+
+    def handle(self, event):
+        """Queue the work an event calls for."""
+        self.count("events")
+        kind = event.get("webhookEvent")
+        if kind in ("jira:issue_updated", "jira:issue_created"):
+            self._handle_issue_event(event)
+        elif kind == "issuelink_created" and self.due_dates:
+            link = event.get("issueLink", {})
+            if link.get("issueLinkType", {}).get("name") not in self.link_types:
+                self.count("ignored")
+                return
+            source_id, destination_id = link.get("sourceIssueId"), link.get("destinationIssueId")
+            if source_id is None or destination_id is None:
+                print(f"Link event {link.get('id')} lacks an issue id; skipping it", file=sys.stderr)
+                self.count("ignored")
+                return
+            source_id, destination_id = str(source_id), str(destination_id)
+            self.queue.add(source_id, link=(source_id, destination_id))
+            self.queue.add(destination_id, link=(source_id, destination_id))
+        else:
+            self.count("ignored")
+
+    def _handle_issue_event(self, event):
+        issue = event.get("issue") or {}
+        if not issue.get("id") or "fields" not in issue:
+            self.count("ignored")
+            return
+        key = issue["key"]
+        items = (event.get("changelog") or {}).get("items", [])
+        if items and self.echoes.is_echo(key, items):
+            self.count("echoes")
+            return
+
+        changed = {item.get("field") for item in items}
+        actions = set()
+        if self.due_dates and changed & DUE_DATE_FIELDS:
+            actions.add(DUE_DATES)
+        project = key.rsplit("-", 1)[0]
+        if self.mirror_to and project in self.mirror_from:
+            actions.add(MIRROR)
+            if changed & set(create_mirror.MIRRORED_FIELDS):
+                actions.add(MIRROR_FIELDS_CHANGED)
+        if not actions:
+            self.count("ignored")
+            return
+        self.queue.add(str(issue["id"]), actions, key=key, issue=issue)
+
+    def resolve_issue_ids(self, issue_ids):
+        """Return {issue id: key} for issues only known by id, in batched searches."""
+        keys = {}
+        for i in range(0, len(issue_ids), SEARCH_BATCH_SIZE):
+            jql = f"id in ({', '.join(issue_ids[i:i + SEARCH_BATCH_SIZE])})"
+            for issues in jira_client.iter_search(jql, sync_due_dates.SOURCE_FIELDS):
+                issue_cache.remember(issues)
+                keys.update((issue["id"], issue["key"]) for issue in issues)
+        return keys
+
+    def process(self, batch):
+        """Apply the due date syncs and mirror changes for one batch of ready issues."""
+        # Issue copies from the events are current; anything remembered earlier may not be
+        issue_cache.forget_run()
+        issue_cache.remember([entry["issue"] for entry in batch.values() if entry["issue"]])
+
+        unresolved = [issue_id for issue_id, entry in batch.items() if not entry["key"]]
+        if unresolved:
+            for issue_id, key in self.resolve_issue_ids(unresolved).items():
+                batch[issue_id]["key"] = key
+        keys_by_id = {issue_id: entry["key"] for issue_id, entry in batch.items() if entry["key"]}
+
+        due_date_sources = []
+        for issue_id, entry in batch.items():
+            key = entry["key"]
+            if not key:
+                print(f"Issue {issue_id} from a link event was not found; skipping it", file=sys.stderr)
+                continue
+            links = [
+                link for link in entry["links"]
+                if not self.echoes.is_link_echo(keys_by_id.get(link[0]), keys_by_id.get(link[1]))
+            ]
+            if DUE_DATES in entry["actions"] or links:
+                due_date_sources.append(key)
+                # An issue left without a due date takes one from its linked tickets instead
+                if entry["issue"] and not entry["issue"]["fields"].get("duedate"):
+                    due_date_sources.extend(other for _, other in link_graph.issue_links(entry["issue"], self.link_types))
+
+        self.count("batches")
+        self.count("issues", len(keys_by_id))
+        print(f"\nProcessing {len(keys_by_id)} issues from {sum(e['events'] for e in batch.values())} events",
+              file=sys.stderr)
+        if due_date_sources:
+            self.sync_due_dates(list(dict.fromkeys(due_date_sources)))
+        if self.mirror_to:
+            self.sync_mirrors([entry for entry in batch.values() if MIRROR in entry["actions"] and entry["issue"]])
+
+    def sync_due_dates(self, source_keys):
+        run_journal = journal.Journal()
+        sync_due_dates.process_tickets_bulk(source_keys, depth=self.depth, link_types=self.link_types,
+                                            run_journal=run_journal)
+        for op in run_journal.ops:
+            if run_journal.is_done(op["id"]):
+                self.echoes.expect(op["key"], "duedate", op["duedate"])
+                self.count("due_date_updates")
+
+    def sync_mirrors(self, entries):
+        # An event's copy of the issue can predate a mirror created for an earlier
+        # batch, or a later edit, so mirrors are created and updated from the
+        # sources as they are now
+        stale = [entry["key"] for entry in entries
+                 if entry["key"] not in self.mirrors or MIRROR_FIELDS_CHANGED in entry["actions"]]
+        sources = jira_client.get_issues_by_keys(stale, create_mirror.MIRROR_FIELDS) if stale else {}
+
+        to_create, to_update = [], []
+        for entry in entries:
+            key = entry["key"]
+            mirror_key = self.mirrors.get(key)
+            if key in stale:
+                if key not in sources:
+                    print(f"Could not read {key}; skipping its mirror", file=sys.stderr)
+                    continue
+                mirror_key = mirror_key or create_mirror.find_existing_mirror(sources[key], self.mirror_to)
+            if not mirror_key:
+                to_create.append(key)
+            elif MIRROR_FIELDS_CHANGED in entry["actions"]:
+                to_update.append((sources[key], mirror_key))
+
+        if to_create:
+            # Plan the new mirrors from the fresh copies, not from the events'
+            for key in to_create:
+                issue_cache.invalidate(key)
+            issue_cache.remember([sources[key] for key in to_create])
+            for key, mirror_key in create_mirror.process_tickets_bulk(to_create, self.mirror_to, self.labels):
+                if mirror_key:
+                    self.mirrors[key] = mirror_key
+                    self.echoes.expect_link(key, mirror_key)
+                    self.count("mirrors_created")
+        for source_issue, mirror_key in to_update:
+            fields = create_mirror.update_mirror_issue(mirror_key, source_issue)
+            if fields:
+                for name, value in fields.items():
+                    self.echoes.expect(mirror_key, name, value)
+                self.count("mirrors_updated")
+
+    def run(self):
+        """Process batches until the queue is closed and drained."""
+        while True:
+            batch = self.queue.take()
+            if batch is None:
+                return
+            try:
+                self.process(batch)
+            except Exception as e:
+                print(f"Failed to process {len(batch)} issues: {e}", file=sys.stderr)
+            finally:
+                self.queue.done()
+
+def make_handler(receiver, secret=None, record=None):
+    record_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/status":
+                self._reply(404, {"error": "not found"})
+                return
+            self._reply(200, receiver.status())
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret and not verify_signature(secret, body, self.headers.get("X-Hub-Signature")):
+                self._reply(401, {"error": "bad signature"})
+                return
+            try:
+                event = json.loads(body)
+            except ValueError:
+                self._reply(400, {"error": "body is not JSON"})
+                return
+            if record:
+                with record_lock:
+                    record.write(json.dumps(event) + "\n")
+                    record.flush()
+            receiver.handle(event)
+            self._reply(202, None)
+
+        def _reply(self, status, data):
+            payload = json.dumps(data).encode() if data is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Receive Jira webhooks and sync due dates and mirrors as issues change.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default {DEFAULT_PORT})')
+    parser.add_argument('--mirror-to', metavar='BOARD', help='Keep mirrors of changed issues in this board/project')
+    parser.add_argument('--mirror-from', nargs='+', default=[], metavar='PROJECT',
+                        help='Projects whose issues are mirrored (with --mirror-to)')
+    parser.add_argument('-l', '--labels', nargs='+', help='Labels to add to new mirror tickets')
+    parser.add_argument('--no-due-dates', action='store_true', help='Do not sync due dates')
+    parser.add_argument('--depth', type=int, default=sync_due_dates.DEFAULT_DEPTH,
+                        help=f'Follow links up to this many hops when syncing due dates (default {sync_due_dates.DEFAULT_DEPTH})')
+    parser.add_argument('--link-types', nargs='+', default=sync_due_dates.LINK_TYPES, metavar='TYPE',
+                        help=f'Link types due dates are synced over (default {" ".join(sync_due_dates.LINK_TYPES)})')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE,
+                        help=f'Seconds an issue must be quiet before it is processed (default {DEBOUNCE:g})')
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT,
+                        help=f'Longest an issue waits after its first event (default {MAX_WAIT:g})')
+    parser.add_argument('--secret', help='Reject events without a matching X-Hub-Signature (the webhook secret)')
+    parser.add_argument('--record', metavar='FILE', help='Append every received event to FILE, for replaying later')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup(args)
+    if args.mirror_to and not args.mirror_from:
+        parser.error('--mirror-to needs --mirror-from')
+
+    receiver = Receiver(
+        mirror_to=args.mirror_to.upper() if args.mirror_to else None,
+        mirror_from=[project.upper() for project in args.mirror_from],
+        labels=args.labels, due_dates=not args.no_due_dates, link_types=args.link_types, depth=args.depth,
+        debounce=args.debounce, max_wait=args.max_wait,
+    )
+    record = open(args.record, "a") if args.record else None
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(receiver, args.secret, record))
+    worker = threading.Thread(target=receiver.run)
+    worker.start()
+    print(f"Listening for Jira webhooks on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        # Apply what is still queued before exiting
+        receiver.queue.close()
+        worker.join()
+        if record:
+            record.close()
+
+if __name__ == "__main__":
+    main()